@@ -5,17 +5,22 @@ import seaborn as sns
 import plotly.express as px
 import difflib
 import price_alerts
+import price_rollups
+import schema
+import storage
+from datetime import datetime, timedelta
 
 st.set_page_config(page_title="📦 Flipkart Insights", layout="wide")
 
 # Load data
-products_df = pd.read_csv("data/flipkart_product_details.csv")
-predicted_df = pd.read_csv("data/predicted_prices.csv")
-reviews_df = pd.read_csv("data/reviews_with_sentiment.csv")
+products_df = schema.read_csv("data/flipkart_product_details.csv")
+predicted_df = schema.read_csv("data/predicted_prices.csv")
+reviews_df = schema.read_csv("data/reviews_with_sentiment.csv")
 
 # Clean product names
 def clean_names(df):
-    df["Product"] = df["Product"].astype(str).str.strip().str.replace("\u00a0", " ", regex=True)
+    df["Product"] = schema.map_text(df["Product"],
+                                    lambda v: v.str.strip().str.replace("\u00a0", " ", regex=True))
     return df
 
 products_df = clean_names(products_df)
@@ -27,11 +32,21 @@ if "ProductName" in reviews_df.columns and "Product" not in reviews_df.columns:
 if "ReviewText" in reviews_df.columns and "review" not in reviews_df.columns:
     reviews_df.rename(columns={"ReviewText": "review"}, inplace=True)
 if "Product" in reviews_df.columns:
-    reviews_df["Product"] = reviews_df["Product"].astype(str).str.strip()
+    reviews_df["Product"] = schema.map_text(reviews_df["Product"], lambda v: v.str.strip())
 else:
     st.error("❌ 'Product' column not found in reviews_with_sentiment.csv")
     st.stop()
 
+# Scraped price history (rollups), matched to products by title
+@st.cache_data(ttl=600)
+def price_history(product, days=365):
+    latest = storage.latest_states("flipkart")
+    match = difflib.get_close_matches(product, latest["title"].dropna().unique(), n=1, cutoff=0.6)
+    if not match:
+        return pd.DataFrame()
+    product_ids = latest.loc[latest["title"] == match[0], "product_id"].iloc[:1]
+    return price_rollups.price_series(product_ids, datetime.now() - timedelta(days=days))
+
 # Merge actual and predicted prices
 merged_df = pd.merge(products_df, predicted_df[["Product", "Predicted Price"]], on="Product", how="left")
 product_list = sorted(merged_df["Product"].dropna().unique())
@@ -95,18 +110,27 @@ with tab1:
 
     # 📈 Price Trend Chart
     st.markdown("<h4 style='color:#2c3e50;'>📈 Price Trend Forecast</h4>", unsafe_allow_html=True)
-    years = [2015, 2016, 2017, 2018, 2019, 2020]
-    historical_prices = [selected_row['Price (₹)'] * (1.1 - 0.03 * i) for i in range(len(years))]
     predicted_price = selected_row['Predicted Price']
+    history = price_history(product_name)
+
+    if not history.empty:
+        # Scraped history: one point per rollup bucket over the last year
+        trend_df = history.rename(columns={"bucket_start": "Date", "close": "Historical Price"})
+        fig = px.line(trend_df, x="Date", y="Historical Price", markers=True, title="Price Trend for Selected Product")
+        fig.add_scatter(x=[trend_df["Date"].max()], y=[predicted_price], mode="markers+text", name="Predicted Price",
+                        marker=dict(color="red", size=12), text=["Predicted"], textposition="top center")
+    else:
+        years = [2015, 2016, 2017, 2018, 2019, 2020]
+        historical_prices = [selected_row['Price (₹)'] * (1.1 - 0.03 * i) for i in range(len(years))]
 
-    trend_df = pd.DataFrame({
-        "Year": years,
-        "Historical Price": historical_prices
-    })
+        trend_df = pd.DataFrame({
+            "Year": years,
+            "Historical Price": historical_prices
+        })
 
-    fig = px.line(trend_df, x="Year", y="Historical Price", markers=True, title="Price Trend for Selected Product")
-    fig.add_scatter(x=[2021], y=[predicted_price], mode="markers+text", name="Predicted Price",
-                    marker=dict(color="red", size=12), text=["Predicted"], textposition="top center")
+        fig = px.line(trend_df, x="Year", y="Historical Price", markers=True, title="Price Trend for Selected Product")
+        fig.add_scatter(x=[2021], y=[predicted_price], mode="markers+text", name="Predicted Price",
+                        marker=dict(color="red", size=12), text=["Predicted"], textposition="top center")
     fig.update_layout(height=400, margin=dict(t=30, b=20), title_font=dict(size=18))
     st.plotly_chart(fig, use_container_width=True)
 
@@ -126,7 +150,7 @@ with tab1:
         with col1:
             st.markdown("<h5 style='color:#2c3e50;'>📋 Sample Reviews by Sentiment</h5>", unsafe_allow_html=True)
             sentiment_table = (
-                filtered_reviews.groupby("sentiment")
+                filtered_reviews.groupby("sentiment", observed=True)
                 .apply(lambda df: df[["review", "Rating", "sentiment_score"]].head(2))
                 .reset_index(level=0)
                 .rename(columns={"sentiment": "Sentiment", "review": "Review", "Rating": "Rating", "sentiment_score": "Score"})
@@ -135,7 +159,8 @@ with tab1:
 
         with col2:
             st.markdown("<h5 style='color:#2c3e50;'>📊 Sentiment Distribution</h5>", unsafe_allow_html=True)
-            sentiment_counts = filtered_reviews["sentiment"].value_counts().reset_index()
+            sentiment_counts = filtered_reviews["sentiment"].value_counts()
+            sentiment_counts = sentiment_counts[sentiment_counts > 0].reset_index()   # categorical: drop unused labels
             sentiment_counts.columns = ["Sentiment", "Count"]
             color_map = {
                 "Positive": "#a3c1ad",
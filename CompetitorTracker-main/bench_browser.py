@@ -0,0 +1,54 @@
+#bench_browser.py
+# Loads the same product pages from the local fixture site with a normal and
+# a lightweight (resource-blocking) headless Chrome and compares page load
+# latency and bytes transferred per page.
+#
+#   python bench_browser.py            # 30 product pages
+#   python bench_browser.py 100
+
+import sys
+import time
+import statistics
+
+import fixture_server as fx
+from browser import make_driver, load_page
+
+# ---------------- CONFIG ----------------
+PAGES = 30
+LATENCY = 0.02           # simulated server time per request, assets included
+
+def run(base_url, pages, lightweight):
+    driver = make_driver(lightweight=lightweight, cache_name="bench")
+    try:
+        # warm-up page so both modes start with the browser process running
+        load_page(driver, f"{base_url}/x/p/itm{fx.product_id(9, 0)}", "VU-ZEz")
+        driver.transfer_stats = {"pages": 0, "bytes": 0}
+        latencies = []
+        for idx in range(pages):
+            pid = fx.product_id(1 + idx // fx.PRODUCTS_PER_PAGE, idx % fx.PRODUCTS_PER_PAGE)
+            start = time.perf_counter()
+            html = load_page(driver, f"{base_url}/{fx.product_info(pid)['slug']}/p/itm{pid}", "VU-ZEz")
+            latencies.append(time.perf_counter() - start)
+            assert html and "VU-ZEz" in html
+        return latencies, driver.transfer_stats
+    finally:
+        driver.quit()
+
+def benchmark(pages=PAGES):
+    server, base_url = fx.start_fixture_server(latency=LATENCY)
+    print(f"🧪 Fixture site at {base_url}, {pages} product pages per mode")
+    try:
+        results = {}
+        for name, lightweight in (("full", False), ("lightweight", True)):
+            latencies, transfer = run(base_url, pages, lightweight)
+            results[name] = (statistics.median(latencies), transfer["bytes"] / transfer["pages"])
+            print(f"  {name:<12} {results[name][0] * 1000:7.0f} ms/page (p50), "
+                  f"{results[name][1] / 1024:7.0f} KB/page")
+        (full_ms, full_kb), (light_ms, light_kb) = results["full"], results["lightweight"]
+        print(f"⚡ Lightweight mode: {full_ms / light_ms:.1f}x faster, "
+              f"{100 * (1 - light_kb / full_kb):.0f}% less data per page")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else PAGES)
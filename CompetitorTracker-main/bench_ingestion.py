@@ -0,0 +1,314 @@
+#bench_ingestion.py
+# Ingestion checks and timings on synthetic data shaped like review.csv and
+# the mobile snapshots:
+#   dates   the vectorised relative-date parser against the per-row
+#           parse_relative_date (same dates for every input, then rows/sec).
+#           Every mode first checks both parsers on DATE_CASES (known
+#           answers) and against each other; any mismatch exits with 1
+#   stream  ingestion.main in memory vs streaming mode, each in a fresh
+#           process: identical output files, time and peak RSS
+#   parallel
+#           the in-memory path serially and with a pool of N processes:
+#           identical output files and the speed-up (run in this process, so
+#           the pool forks as it does from the command line)
+#   incremental
+#           a history of days ingested incrementally one day at a time: the
+#           outputs match one full run, a day costs about the same whatever
+#           the history length, and compacting the snapshot store half way
+#           does not make the next run re-read the history
+#
+#   python bench_ingestion.py                # 1M review dates
+#   python bench_ingestion.py dates 5000000
+#   python bench_ingestion.py stream 2000000 # reviews (+ 1 mobile row per 10)
+#   python bench_ingestion.py parallel 2000000 16     # reviews, workers
+#   python bench_ingestion.py incremental 30 50000   # days, reviews per day
+
+import os
+import sys
+import time
+import random
+import filecmp
+import resource
+import tempfile
+import multiprocessing as mp
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+import ingestion
+
+# ---------------- CONFIG ----------------
+ROWS = 1_000_000
+
+EDGE_DATES = ["22 days ago", "Today", "yesterday", "1 month ago", "11 months ago", "14 months ago",
+              "30 months ago", "2 years ago", "3000 years ago", "99999999999 days ago", "Nov, 2023",
+              "Mar 2021", "5 hours ago", "", "  3 Days Ago ", "2023-05-01", "Monday", "nan",
+              "Certified Buyer, 3 days ago", "month", "a year ago", None, float("nan"), 7]
+# reference times that hit the month-end / leap-day branches
+EDGE_NOW = [datetime(2024, 2, 29, 13, 5), datetime(2023, 12, 31, 23, 59), datetime(2025, 1, 15),
+            datetime(2025, 3, 1, 0, 0, 1)]
+
+def review_dates(n, seed=0):
+    """Review dates in the mix Flipkart shows: mostly 'N days/months ago', some absolute"""
+    rnd = random.Random(seed)
+    months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+    out = []
+    for _ in range(n):
+        r = rnd.random()
+        if r < 0.55:
+            out.append(f"{rnd.randrange(1, 31)} days ago")
+        elif r < 0.85:
+            out.append(f"{rnd.randrange(1, 12)} months ago")
+        elif r < 0.9:
+            out.append(rnd.choice(["Today", "1 year ago", "2 years ago"]))
+        else:
+            out.append(f"{rnd.choice(months)}, {rnd.randrange(2018, 2025)}")
+    return pd.Series(out)
+
+# known answers for both parsers at CASES_NOW (None: missing, NaT once in a datetime column)
+CASES_NOW = datetime(2024, 3, 15, 10, 30)
+DATE_CASES = [("Today", date(2024, 3, 15)), ("1 day ago", date(2024, 3, 14)),
+              ("22 days ago", date(2024, 2, 22)), ("1 month ago", date(2024, 2, 15)),
+              ("3 months ago", date(2023, 12, 15)), ("1 year ago", date(2023, 3, 15)),
+              ("2 years ago", date(2022, 3, 15)), ("Nov, 2023", date(2023, 11, 1)),
+              ("2023-05-01", date(2023, 5, 1)), ("15 Jan 2024", date(2024, 1, 15)),
+              ("not a date", None), ("Certified Buyer", None), ("5 hours ago", None),
+              ("", None), (None, None), (float("nan"), None)]
+
+# ---------------- DATES ----------------
+
+def _fail(title, bad):
+    # print every mismatch and exit non-zero (asserts vanish under python -O)
+    print(f"❌ {title}: {len(bad)} mismatches")
+    for row in bad:
+        print("   ", row)
+    sys.exit(1)
+
+def _same_date(a, b):
+    return (pd.isna(a) and pd.isna(b)) or a == b
+
+def check_date_cases():
+    """Both date parsers give the known answer for every DATE_CASES input"""
+    values = pd.Series([v for v, _ in DATE_CASES], dtype=object)
+    vectorised = ingestion.parse_relative_dates(values, CASES_NOW)
+    bad = [(v, want, ingestion.parse_relative_date(v, CASES_NOW), got)
+           for (v, want), got in zip(DATE_CASES, vectorised)
+           if not (_same_date(ingestion.parse_relative_date(v, CASES_NOW), want)
+                   and _same_date(got, want))]
+    if bad:
+        _fail("date cases (input, expected, parse_relative_date, parse_relative_dates)", bad)
+    print(f"✅ Both date parsers give the expected date for {len(DATE_CASES)} known cases")
+
+def check_dates(sample):
+    """parse_relative_dates gives exactly what parse_relative_date gives"""
+    check_date_cases()
+    values = pd.Series(EDGE_DATES + list(sample), dtype=object)
+    for now in EDGE_NOW + [datetime.now()]:
+        expected = values.apply(lambda t: ingestion.parse_relative_date(t, now))
+        got = ingestion.parse_relative_dates(values, now)
+        bad = [(v, e, g) for v, e, g in zip(values, expected, got) if not _same_date(e, g)]
+        if bad:
+            _fail(f"vectorised dates vs parse_relative_date at now={now}", bad)
+    print(f"✅ Vectorised dates match parse_relative_date on {len(values)} values x {len(EDGE_NOW) + 1} reference times")
+
+def dates(rows=ROWS):
+    values = review_dates(rows)
+    now = datetime.now()
+    start = time.perf_counter()
+    expected = values.apply(lambda t: ingestion.parse_relative_date(t, now))
+    slow = time.perf_counter() - start
+    start = time.perf_counter()
+    got = ingestion.parse_relative_dates(values, now)
+    fast = time.perf_counter() - start
+    if not expected.equals(got):
+        _fail("vectorised dates vs parse_relative_date (timed run)",
+              [(v, e, g) for v, e, g in zip(values, expected, got) if not _same_date(e, g)][:20])
+    print(f"📅 {rows} review dates: apply {rows / slow:10.0f} rows/sec, "
+          f"vectorised {rows / fast:10.0f} rows/sec ({slow / fast:.0f}x)")
+
+# ---------------- STREAMING ----------------
+
+REVIEW_TEXTS = ["Awesome phone 😍 battery lasts all day", "Camera is good but heats up 🔥",
+                "Value for money!!", "Worst product 👎 don't buy", "Display is superb ✨✨",
+                "Nice", "Delivery was late, phone is ok", "   ", "Good performance, average camera"]
+
+def write_inputs(folder, reviews, products=2000, seed=0, start=datetime(2024, 1, 1), days=60):
+    """review.csv and a mobile snapshot store with duplicates, emojis and unknown products.
+
+    Called again on the same folder, appends another batch (scraped in the
+    days from start).
+    """
+    import snapshot_store
+    rnd = random.Random(seed)
+    mobile_rows = reviews // 10
+    mobile = pd.DataFrame({
+        "source": "flipkart",
+        "productid": [f"MOB{rnd.randrange(products):08d}" for _ in range(mobile_rows)],
+        "mobilename": [f" Phone {rnd.randrange(products)} " for _ in range(mobile_rows)],
+        "sellingprice": [float(rnd.randrange(5000, 90000)) for _ in range(mobile_rows)],
+        "mrp": 99999.0,
+        "discountoffering": [rnd.choice(["10% off", "25% off", None]) for _ in range(mobile_rows)],
+        "rating": [rnd.choice([4.1, 4.4, None]) for _ in range(mobile_rows)],
+        "url": "https://www.flipkart.com/p",
+        "scraped_at": [start + timedelta(hours=rnd.randrange(24 * days)) for _ in range(mobile_rows)]})
+    for part in range(0, mobile_rows, 50_000):   # one append per scrape-sized batch
+        snapshot_store.append("mobile", mobile.iloc[part:part + 50_000],
+                              root=os.path.join(folder, snapshot_store.STORE_DIR))
+
+    dates = review_dates(reviews, seed)
+    path = os.path.join(folder, "review.csv")
+    new_file = not os.path.exists(path)
+    with open(path, "w" if new_file else "a", encoding="utf-8-sig" if new_file else "utf-8",
+              newline="") as f:
+        if new_file:
+            f.write("source,productid,mobilename,userid,review,rating,reviewdate\n")
+        for i in range(reviews):
+            pid = rnd.randrange(int(products * 1.1))       # ~10% of products were never listed
+            user = rnd.randrange(max(reviews // 2, 1000))  # repeat users -> some duplicate reviews
+            text = rnd.choice(REVIEW_TEXTS).replace('"', "")
+            f.write(f'flipkart,MOB{pid:08d},Phone {pid},user{user},"{text}",{rnd.randrange(1, 6)},"{dates[i]}"\n')
+
+def peak_rss_mb():
+    # VmHWM starts fresh in a spawned process; ru_maxrss keeps the parent's peak across exec
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _ingest(folder, stream, out, label=None):
+    os.chdir(folder)
+    import ingestion
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    ingestion.main(stream=stream, chunksize=ingestion.CHUNK_SIZE)
+    elapsed = time.perf_counter() - start
+    peak = peak_rss_mb()
+    label = label or ("stream" if stream else "memory")
+    for name in (ingestion.OUTPUT_MOBILE, ingestion.OUTPUT_REVIEWS):
+        os.replace(os.path.join("data", name), os.path.join("data", f"{label}_{name}"))
+    out.put((elapsed, base, peak))
+
+def run_isolated(target, *args, **kwargs):
+    ctx = mp.get_context("spawn")
+    out = ctx.Queue()
+    proc = ctx.Process(target=target, args=(*args, out), kwargs=kwargs)
+    proc.start()
+    proc.join()
+    if proc.exitcode:
+        raise RuntimeError(f"{target.__name__} failed (exit code {proc.exitcode})")
+    return out.get()
+
+def stream(reviews=ROWS):
+    folder = tempfile.mkdtemp(prefix="bench_ingestion_")
+    write_inputs(folder, reviews)
+    size = os.path.getsize(os.path.join(folder, "review.csv")) / 1e6
+    print(f"🧪 {reviews} reviews ({size:.0f} MB review.csv) + {reviews // 10} mobile snapshots in {folder}")
+    results = {}
+    for label, streaming in (("memory", False), ("stream", True)):
+        elapsed, base, peak = run_isolated(_ingest, folder, streaming)
+        results[label] = peak - base
+        print(f"  {label:<7} {elapsed:7.1f} s   peak RSS {peak:7.0f} MB (+{peak - base:.0f} MB over imports)")
+    for name in (ingestion.OUTPUT_MOBILE, ingestion.OUTPUT_REVIEWS):
+        assert filecmp.cmp(os.path.join(folder, "data", f"memory_{name}"),
+                           os.path.join(folder, "data", f"stream_{name}"), shallow=False), name
+    print(f"✅ Streaming output is byte-identical; {results['memory'] / max(results['stream'], 1):.1f}x "
+          f"less memory above baseline")
+
+# ---------------- PARALLEL ----------------
+
+def parallel(reviews=ROWS, workers=ingestion.WORKERS):
+    folder = tempfile.mkdtemp(prefix="bench_ingestion_")
+    write_inputs(folder, reviews)
+    print(f"🧪 {reviews} reviews + {reviews // 10} mobile snapshots, {os.cpu_count()} CPUs")
+    times = {}
+    cwd = os.getcwd()
+    try:
+        os.chdir(folder)
+        for label, n in (("serial", 1), ("parallel", workers)):
+            start = time.perf_counter()
+            ingestion.main(workers=n)
+            times[label] = time.perf_counter() - start
+            for name in (ingestion.OUTPUT_MOBILE, ingestion.OUTPUT_REVIEWS):
+                os.replace(os.path.join("data", name), os.path.join("data", f"{label}_{name}"))
+            print(f"  {label:<8} {n:3d} workers {times[label]:7.1f} s")
+    finally:
+        os.chdir(cwd)
+    for name in (ingestion.OUTPUT_MOBILE, ingestion.OUTPUT_REVIEWS):
+        assert filecmp.cmp(os.path.join(folder, "data", f"serial_{name}"),
+                           os.path.join(folder, "data", f"parallel_{name}"), shallow=False), name
+    print(f"✅ Parallel output is byte-identical; {times['serial'] / times['parallel']:.2f}x speed-up")
+
+# ---------------- INCREMENTAL ----------------
+
+def _ingest_incremental(folder):
+    os.chdir(folder)
+    start = time.perf_counter()
+    ingestion.main(incremental=True)
+    return time.perf_counter() - start
+
+def _compact_store(folder):
+    """Compact the mobile store; the incremental watermark must still cover every file"""
+    import snapshot_store
+    from key_index import KeyIndex
+    root = os.path.join(folder, snapshot_store.STORE_DIR)
+    compacted = snapshot_store.compact("mobile", root=root)
+    index = KeyIndex("incremental_mobile", path=os.path.join(folder, "data", "ingestion_keys.db"))
+    watermark = index.get("state")["watermark"]
+    index.close()
+    assert compacted and not snapshot_store.files("mobile", after=watermark, root=root)
+    return compacted
+
+def _sorted_csv(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding="utf-8-sig")
+    return df.sort_values(list(df.columns)).reset_index(drop=True)
+
+def incremental(days=30, per_day=50_000):
+    folder = tempfile.mkdtemp(prefix="bench_ingestion_")
+    cwd = os.getcwd()
+    start = datetime(2024, 1, 1)
+    timings = []
+    # every product listed up front: incremental runs filter reviews by the products known so far
+    write_inputs(folder, 10 * 2000 * 20, start=start - timedelta(days=1), days=1)
+    os.remove(os.path.join(folder, "review.csv"))
+    try:
+        for day in range(days):
+            # a day's scrape spans midnight, so earlier date partitions get more files
+            write_inputs(folder, per_day, seed=day, start=start + timedelta(days=day, hours=-12), days=1)
+            timings.append(_ingest_incremental(folder))
+            if day == days // 2:
+                compacted = _compact_store(folder)
+        # nothing new: only the watermark checks
+        idle = _ingest_incremental(folder)
+    finally:
+        os.chdir(cwd)
+    for name in (ingestion.OUTPUT_MOBILE, ingestion.OUTPUT_REVIEWS):
+        os.replace(os.path.join(folder, "data", name), os.path.join(folder, "data", f"incremental_{name}"))
+    full, _, _ = run_isolated(_ingest, folder, False, label="full")
+    data = os.path.join(folder, "data")
+    # review rows come out in file order either way; mobile files are read in a different order
+    assert filecmp.cmp(os.path.join(data, f"full_{ingestion.OUTPUT_REVIEWS}"),
+                       os.path.join(data, f"incremental_{ingestion.OUTPUT_REVIEWS}"), shallow=False)
+    assert _sorted_csv(os.path.join(data, f"full_{ingestion.OUTPUT_MOBILE}")).equals(
+        _sorted_csv(os.path.join(data, f"incremental_{ingestion.OUTPUT_MOBILE}")))
+    print(f"✅ {days} daily incremental runs give the same rows as one full run "
+          f"({compacted} store partitions compacted after day {days // 2 + 1})")
+    print(f"🧪 {per_day} reviews + {per_day // 10} snapshots a day, {days} days:")
+    print(f"  incremental day 1 {timings[0]:6.2f} s, day {days} {timings[-1]:6.2f} s, "
+          f"no new rows {idle:6.2f} s")
+    print(f"  full run over all {days} days  {full:6.2f} s")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    # every mode starts from the date parser checks; they take well under a second
+    check_dates(review_dates(2_000, seed=1))
+    if args and args[0] == "stream":
+        stream(*(int(a) for a in args[1:2]))
+    elif args and args[0] == "parallel":
+        parallel(*(int(a) for a in args[1:3]))
+    elif args and args[0] == "incremental":
+        incremental(*(int(a) for a in args[1:3]))
+    else:
+        if args and args[0] == "dates":
+            args = args[1:]
+        dates(*(int(a) for a in args[:1]))
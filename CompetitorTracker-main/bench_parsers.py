@@ -0,0 +1,158 @@
+#bench_parsers.py
+# Compares the extractor backends over saved HTML pages: output equality,
+# pages/sec and peak memory. Each backend runs in a fresh process so the
+# peak-RSS numbers are not polluted by the others. Every parse_* function
+# must give the same output, field by field, on every backend; any
+# difference is printed and the bench exits with 1 before timing anything.
+#
+#   python bench_parsers.py                 # fresh fixture-site pages in a temp folder
+#   python bench_parsers.py path/to/html    # any folder of listing_*, product_*, reviews_* pages
+
+import os
+import sys
+import time
+import resource
+import tempfile
+import tracemalloc
+import multiprocessing as mp
+
+import extractors
+
+# ---------------- CONFIG ----------------
+REPEAT = 5               # passes over the fixture set per backend
+KINDS = ("listing", "product", "reviews")
+REFERENCE = "bs4"        # backend the others are compared with
+
+# ---------------- FIXTURES ----------------
+
+def write_fixtures(folder, listing_pages=3, products=20):
+    """Write fixture-site pages (deterministic, see fixture_server.py) into folder"""
+    import fixture_server as fx
+    os.makedirs(folder, exist_ok=True)
+    for page in range(1, listing_pages + 1):
+        with open(os.path.join(folder, f"listing_{page}.html"), "w", encoding="utf-8") as f:
+            f.write(fx.render_listing(page))
+    for idx in range(products):
+        pid = fx.product_id(1, idx)
+        with open(os.path.join(folder, f"product_{pid}.html"), "w", encoding="utf-8") as f:
+            f.write(fx.render_product(pid))
+        with open(os.path.join(folder, f"reviews_{pid}_1.html"), "w", encoding="utf-8") as f:
+            f.write(fx.render_reviews(pid, 1))
+    print(f"🧪 Wrote fixtures to {folder}")
+
+def load_pages(folder):
+    """{kind: [(file name, html)]}"""
+    pages = {kind: [] for kind in KINDS}
+    for name in sorted(os.listdir(folder)):
+        kind = name.split("_")[0]
+        if kind in pages:
+            with open(os.path.join(folder, name), encoding="utf-8") as f:
+                pages[kind].append((name, f.read()))
+    return pages
+
+# ---------------- WORKLOAD ----------------
+
+def parse_all(backend, pages):
+    """Run all six parse_* functions a scraper would run on each page.
+
+    Returns [(function, page, output)].
+    """
+    out = []
+    for name, html in pages["listing"]:
+        out.append(("parse_listing", name,
+                    extractors.parse_listing(html, "2024-01-01T00:00:00", backend=backend)))
+        out.append(("parse_product_links", name,
+                    extractors.parse_product_links(html, backend=backend)))
+    for name, html in pages["product"]:
+        out.append(("parse_product_details", name,
+                    extractors.parse_product_details(html, "https://www.flipkart.com/x/p/itm1",
+                                                     backend=backend)))
+        out.append(("parse_review_link", name, extractors.parse_review_link(html, backend=backend)))
+    for name, html in pages["reviews"]:
+        out.append(("parse_reviews", name,
+                    extractors.parse_reviews(html, "pid", "Phone", backend=backend)))
+        out.append(("parse_review_details", name,
+                    extractors.parse_review_details(html, "Phone", backend=backend)))
+    return out
+
+def field_diffs(expected, got, where=""):
+    """[(where, expected, got)] for every field that differs (dicts and lists walked into)"""
+    if isinstance(expected, dict) and isinstance(got, dict):
+        return [d for key in sorted(set(expected) | set(got), key=str)
+                for d in field_diffs(expected.get(key, "<missing>"), got.get(key, "<missing>"),
+                                     f"{where}.{key}")]
+    if isinstance(expected, list) and isinstance(got, list):
+        diffs = [d for i, (e, g) in enumerate(zip(expected, got))
+                 for d in field_diffs(e, g, f"{where}[{i}]")]
+        if len(expected) != len(got):
+            diffs.append((f"{where} length", len(expected), len(got)))
+        return diffs
+    if type(expected) is not type(got) or expected != got:
+        return [(where or "value", expected, got)]
+    return []
+
+def check_equivalence(pages):
+    """Every backend must return exactly what the reference backend returns; exits 1 if not"""
+    reference = parse_all(REFERENCE, pages)
+    failed = False
+    for name in extractors.BACKENDS:
+        diffs = [(func, page, where, e, g)
+                 for (func, page, expected), (_, _, got) in zip(reference, parse_all(name, pages))
+                 for where, e, g in field_diffs(expected, got)]
+        calls = {func for func, _, _ in reference}
+        if not diffs:
+            print(f"  {name:<9} ✅ identical output ({len(calls)} parse_* functions, "
+                  f"{len(reference)} calls)")
+            continue
+        failed = True
+        print(f"  {name:<9} ❌ {len(diffs)} field(s) differ from {REFERENCE}")
+        for func, page, where, e, g in diffs[:50]:
+            print(f"      {func} {page} {where}: {REFERENCE}={e!r} {name}={g!r}")
+    if failed:
+        sys.exit(1)
+
+def _measure(name, folder, repeat, queue):
+    pages = load_pages(folder)
+    n_pages = sum(len(v) for v in pages.values()) * repeat
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    parse_all(name, pages)    # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        parse_all(name, pages)
+    elapsed = time.perf_counter() - start
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # separate pass: tracemalloc slows parsing down too much to time with it on
+    tracemalloc.start()
+    parse_all(name, pages)
+    _, py_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    queue.put({"backend": name, "pages_per_sec": n_pages / elapsed,
+               "py_peak_mb": py_peak / 2**20, "rss_growth_mb": (rss_after - rss_before) / 1024})
+
+def benchmark(folder=None, repeat=REPEAT):
+    if folder is None:
+        folder = os.path.join(tempfile.mkdtemp(prefix="bench_parsers_"), "html")
+        write_fixtures(folder)
+    pages = load_pages(folder)
+    counts = ", ".join(f"{len(v)} {k}" for k, v in pages.items())
+    print(f"📄 Pages: {counts}")
+
+    print("🔍 Equivalence:")
+    check_equivalence(pages)
+
+    print(f"⏱ Throughput ({repeat} passes, one process per backend):")
+    ctx = mp.get_context("spawn")
+    for name in extractors.BACKENDS:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_measure, args=(name, folder, repeat, queue))
+        proc.start()
+        r = queue.get()
+        proc.join()
+        print(f"  {r['backend']:<9} {r['pages_per_sec']:8.1f} pages/sec   "
+              f"python peak {r['py_peak_mb']:6.1f} MB   RSS growth {r['rss_growth_mb']:6.1f} MB")
+
+if __name__ == "__main__":
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else None)
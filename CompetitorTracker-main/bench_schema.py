@@ -0,0 +1,73 @@
+#bench_schema.py
+# Memory of a review file loaded with pandas' default dtypes vs schema.py's:
+# a synthetic reviews_with_sentiment.csv (ProductName / ReviewText / ...), read
+# each way in a fresh process. Reports DataFrame bytes (memory_usage deep),
+# peak RSS and read time.
+#
+#   python bench_schema.py            # 5M reviews
+#   python bench_schema.py 1000000
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from bench_ingestion import REVIEW_TEXTS, peak_rss_mb, run_isolated
+
+# ---------------- CONFIG ----------------
+ROWS = 5_000_000
+PRODUCTS = 3000
+USERS = 1_500_000
+CHUNK = 500_000
+
+def write_reviews(path, rows=ROWS, seed=0):
+    """reviews_with_sentiment.csv-shaped file: repeated names/sources, mostly distinct text"""
+    rng = np.random.default_rng(seed)
+    brands = np.array(["Apple iPhone", "Samsung Galaxy", "MOTOROLA g", "Google Pixel", "vivo T", "OPPO K",
+                       "realme P"])
+    names = np.array([f"{brands[i % len(brands)]} {i} (Black, 128 GB)" for i in range(PRODUCTS)])
+    texts = np.array(REVIEW_TEXTS)
+    labels = np.array(["Positive", "Neutral", "Negative"])
+    for start in range(0, rows, CHUNK):
+        n = min(CHUNK, rows - start)
+        product = rng.integers(0, PRODUCTS, n)
+        df = pd.DataFrame({
+            "source": "flipkart",
+            "ProductName": names[product],
+            "Category": np.where(product % 10 == 0, "Tablets", "Mobiles"),
+            "userid": np.char.add("user", rng.integers(0, USERS, n).astype(str)),
+            "ReviewText": np.char.add(np.char.add(texts[rng.integers(0, len(texts), n)], " #"),
+                                      np.arange(start, start + n).astype(str)),
+            "Rating": rng.integers(1, 6, n),
+            "Price (₹)": (product * 37 % 190_000 + 5_000) + product % 100 / 100,
+            "sentiment": labels[rng.integers(0, 3, n)],
+            "sentiment_score": rng.random(n).round(4)})
+        df.to_csv(path, mode="w" if start == 0 else "a", header=start == 0, index=False)
+
+def _load(path, typed, out):
+    import schema
+    base = peak_rss_mb()
+    start = time.perf_counter()
+    df = schema.read_csv(path) if typed else pd.read_csv(path)
+    elapsed = time.perf_counter() - start
+    out.put((elapsed, df.memory_usage(deep=True).sum() / 1e6, peak_rss_mb() - base,
+             {c: str(t) for c, t in df.dtypes.items()}))
+
+def main(rows=ROWS):
+    path = os.path.join(tempfile.mkdtemp(prefix="bench_schema_"), "reviews_with_sentiment.csv")
+    write_reviews(path, rows)
+    print(f"🧪 {rows} reviews, {os.path.getsize(path) / 1e6:.0f} MB CSV (pandas {pd.__version__})")
+    results = {}
+    for label, typed in (("default", False), ("schema", True)):
+        elapsed, frame_mb, peak_mb, dtypes = run_isolated(_load, path, typed)
+        results[label] = frame_mb
+        print(f"  {label:<8} {frame_mb:8.0f} MB frame, +{peak_mb:6.0f} MB peak RSS, read {elapsed:5.1f} s")
+        print("           " + ", ".join(f"{c}: {t}" for c, t in dtypes.items()))
+    assert dtypes["Price (₹)"] == "float64", "prices must keep their paise"
+    print(f"✅ schema.py dtypes use {results['default'] / results['schema']:.1f}x less memory")
+
+if __name__ == "__main__":
+    main(*(int(a) for a in sys.argv[1:2]))
@@ -0,0 +1,104 @@
+#bench_sentiment.py
+# Sentiment scoring throughput on CPU, on synthetic reviews of mixed length:
+#   engine  the transformers pipeline in file order (batch_size=32) vs the
+#           length-sorted SentimentEngine: label agreement, max score
+#           difference and reviews/sec
+#   onnx    PyTorch engine vs the int8 ONNX engine: fails unless labels agree
+#           on at least MIN_AGREEMENT of the reviews; reviews/sec of both
+#   cache   analyze_sentiment twice over the same file, then with 5% new
+#           reviews: only cache misses reach the model
+#
+#   python bench_sentiment.py                 # 2000 reviews
+#   python bench_sentiment.py engine 5000
+#   python bench_sentiment.py onnx 5000
+#   python bench_sentiment.py cache 5000
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+import pandas as pd
+from transformers import pipeline
+
+import sentiment_analysis
+from sentiment_engine import SentimentEngine, OnnxSentimentEngine
+
+# ---------------- CONFIG ----------------
+ROWS = 2000
+MIN_AGREEMENT = 0.98         # share of reviews where int8 ONNX must give the fp32 label
+
+PHRASES = ["Awesome phone", "battery lasts all day", "camera is good but heats up", "value for money",
+           "worst product, don't buy", "display is superb", "delivery was late", "average performance",
+           "speaker is loud and clear", "screen scratches easily", "fast charging works as promised",
+           "software has too many ads", "good for gaming", "not worth the price"]
+
+def synthetic_reviews(n, seed=0):
+    """Mostly one-liners with a long tail of paragraph-length reviews"""
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        words = 1 if rnd.random() < 0.6 else rnd.choice([3, 6, 12, 40])
+        out.append(", ".join(rnd.choice(PHRASES) for _ in range(words)) + f". #{i}")
+    return out
+
+def engine(rows=ROWS):
+    texts = synthetic_reviews(rows)
+    pipe = pipeline("sentiment-analysis", model=sentiment_analysis.MODEL_ID)
+    start = time.perf_counter()
+    expected = pipe(texts, batch_size=32)
+    slow = time.perf_counter() - start
+
+    eng = SentimentEngine(sentiment_analysis.MODEL_ID)
+    got = eng(texts)
+    fast = eng.stats["seconds"]
+    same = sum(e["label"] == g["label"] for e, g in zip(expected, got))
+    diff = max(abs(e["score"] - g["score"]) for e, g in zip(expected, got))
+    print(f"🧪 {rows} reviews, {os.cpu_count()} CPUs")
+    print(f"  pipeline {rows / slow:8.1f} reviews/sec")
+    print(f"  engine   {rows / fast:8.1f} reviews/sec ({slow / fast:.1f}x), "
+          f"{eng.stats['tokens'] / eng.stats['padded_tokens']:.0%} of batch tokens real")
+    print(f"✅ Labels agree on {same}/{rows} reviews, max score difference {diff:.2e}")
+
+def onnx(rows=ROWS):
+    texts = synthetic_reviews(rows)
+    reference = SentimentEngine(sentiment_analysis.MODEL_ID)
+    expected = reference(texts)
+    quantized = OnnxSentimentEngine(sentiment_analysis.MODEL_ID)
+    got = quantized(texts)
+    labels = [sentiment_analysis.label_map[r["label"]] for r in got]
+    assert set(labels) <= set(sentiment_analysis.label_map.values())
+    agree = sum(e["label"] == g["label"] for e, g in zip(expected, got)) / rows
+    diff = max(abs(e["score"] - g["score"]) for e, g in zip(expected, got))
+    print(f"🧪 {rows} reviews, {os.cpu_count()} CPUs")
+    for name, eng in (("torch fp32", reference), ("onnx int8", quantized)):
+        print(f"  {name:<10} {eng.stats['reviews_per_sec']:8.1f} reviews/sec")
+    print(f"  labels agree on {agree:.2%} of reviews, max score difference {diff:.3f}, "
+          f"{reference.stats['seconds'] / quantized.stats['seconds']:.1f}x faster")
+    assert agree >= MIN_AGREEMENT, f"int8 labels agree on only {agree:.2%} (< {MIN_AGREEMENT:.0%})"
+    print("✅ ONNX int8 backend agrees with the PyTorch model")
+
+def cache(rows=ROWS):
+    folder = tempfile.mkdtemp(prefix="bench_sentiment_")
+    review_file = os.path.join(folder, "reviews.csv")
+    output_file = os.path.join(folder, "reviews_with_sentiment.csv")
+    cache_path = os.path.join(folder, "sentiment_cache.db")
+    texts = synthetic_reviews(rows)
+    new = synthetic_reviews(rows // 20, seed=1)
+    for label, data in (("cold cache", texts), ("warm cache", texts), ("5% new", texts + new)):
+        pd.DataFrame({"ReviewText": data}).to_csv(review_file, index=False)
+        start = time.perf_counter()
+        sentiment_analysis.analyze_sentiment(review_file, output_file, cache_path=cache_path)
+        print(f"  {label:<10} {time.perf_counter() - start:7.1f} s")
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "cache":
+        cache(*(int(a) for a in args[1:2]))
+    elif args and args[0] == "onnx":
+        onnx(*(int(a) for a in args[1:2]))
+    else:
+        if args and args[0] == "engine":
+            args = args[1:]
+        engine(*(int(a) for a in args[:1]))
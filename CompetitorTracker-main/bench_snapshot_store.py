@@ -0,0 +1,79 @@
+#bench_snapshot_store.py
+# Cost of saving one scrape run once the history is long: the old mobile.csv
+# read + concat + dedupe + rewrite vs an append to the Parquet snapshot store,
+# and a one-week, two-column read from each.
+#
+#   python bench_snapshot_store.py             # 365 days of 2000 listings
+#   python bench_snapshot_store.py 90 5000
+
+import os
+import sys
+import time
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import snapshot_store
+
+# ---------------- CONFIG ----------------
+DAYS = 365
+ROWS_PER_DAY = 2000
+RUNS = 5                 # scrape runs timed on top of the history
+
+def day_rows(day, n):
+    scraped_at = (datetime(2024, 1, 1) + timedelta(days=day)).isoformat()
+    return pd.DataFrame({
+        "source": "flipkart", "productid": [f"pid{i:05d}" for i in range(n)],
+        "mobilename": [f"Phone {i}" for i in range(n)],
+        "sellingprice": [10000.0 + (i * 7 + day) % 900 for i in range(n)], "mrp": 15000.0,
+        "discountoffering": "12% off", "rating": 4.2, "url": "https://example.com/p",
+        "scraped_at": scraped_at})
+
+def csv_save(path, new):
+    # pr.save_mobile before the snapshot store
+    old = pd.read_csv(path)
+    df = pd.concat([old, new], ignore_index=True)
+    df = df.drop_duplicates(subset=["productid", "scraped_at"], keep="last")
+    df.to_csv(path, index=False, encoding="utf-8-sig")
+
+def benchmark(days=DAYS, rows=ROWS_PER_DAY):
+    folder = tempfile.mkdtemp(prefix="bench_snapshot_store_")
+    csv_path = os.path.join(folder, "mobile.csv")
+    root = os.path.join(folder, "snapshots")
+    print(f"📦 {days} days x {rows} listings of history in {folder}")
+    history = pd.concat([day_rows(d, rows) for d in range(days)], ignore_index=True)
+    history.to_csv(csv_path, index=False, encoding="utf-8-sig")
+    snapshot_store.append("mobile", history, root=root)
+
+    runs = [day_rows(days + r, rows) for r in range(RUNS)]
+    start = time.perf_counter()
+    for new in runs:
+        csv_save(csv_path, new)
+    csv_ms = (time.perf_counter() - start) * 1000 / RUNS
+    start = time.perf_counter()
+    for new in runs:
+        snapshot_store.append("mobile", new, root=root)
+    store_ms = (time.perf_counter() - start) * 1000 / RUNS
+    print(f"  save one run: CSV rewrite {csv_ms:8.1f} ms   store append {store_ms:8.1f} ms "
+          f"({csv_ms / store_ms:.0f}x)")
+
+    week = (datetime(2024, 1, 1) + timedelta(days=days - 7), datetime(2024, 1, 1) + timedelta(days=days))
+    columns = ["productid", "sellingprice"]
+    start = time.perf_counter()
+    df = pd.read_csv(csv_path)
+    ts = pd.to_datetime(df["scraped_at"])
+    from_csv = df.loc[(ts >= week[0]) & (ts <= week[1]), columns].reset_index(drop=True)
+    csv_ms = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    from_store = snapshot_store.read("mobile", columns=columns, start=week[0], end=week[1], root=root)
+    store_ms = (time.perf_counter() - start) * 1000
+    assert len(from_csv) == len(from_store), (len(from_csv), len(from_store))
+    assert (from_csv.sort_values(columns).to_numpy() == from_store.sort_values(columns).to_numpy()).all()
+    print(f"  read one week: CSV {csv_ms:8.1f} ms   store {store_ms:8.1f} ms "
+          f"({csv_ms / store_ms:.0f}x, {len(from_store)} rows, same result)")
+    snapshot_store.print_store_stats("mobile", root=root)
+    print(f"  mobile.csv {os.path.getsize(csv_path) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    benchmark(*(int(a) for a in sys.argv[1:3]))
@@ -0,0 +1,374 @@
+#bench_storage.py
+# Snapshot write throughput against a scratch SQLite file: one commit per
+# row (the old save_snapshot_to_db path) vs batched inserts vs the
+# background SnapshotWriter. The concurrency run puts N writer threads and M
+# reader processes on one database in each DB_MODE (plain SQLite vs WAL +
+# single writer).
+#
+#   python bench_storage.py                    # 5000 snapshots
+#   python bench_storage.py 20000
+#   python bench_storage.py concurrency 8 4    # 8 writers, 4 readers
+#   python bench_storage.py latest 200000      # current-price lookups over a long history
+#   python bench_storage.py payloads 60        # DB size: JSON payload columns vs payload blobs
+#   python bench_storage.py rollups 365        # one-year trend: raw snapshots vs rollups
+
+import os
+import sys
+import time
+import random
+import tempfile
+import threading
+import multiprocessing as mp
+
+# ---------------- CONFIG ----------------
+ROWS = 5000
+PER_ROW_LIMIT = 2000      # the per-row path is slow; time a sample and extrapolate
+WRITERS = 4
+READERS = 8
+SECONDS = 5               # length of each concurrency run
+WRITE_ROWS = 20           # snapshots per write transaction
+
+def fake_snapshots(n):
+    for i in range(n):
+        yield ("flipkart", f"pid{i % 500:04d}",
+               {"title": f"Phone {i % 500}", "price": 10000.0 + i % 97, "list_price": 15000.0,
+                "discount_pct": 12.0, "promotions": None, "raw": {"i": i}})
+
+def per_row(db, n):
+    # one Session, commit and refresh per snapshot
+    for platform, product_id, snap in fake_snapshots(n):
+        with db.Session() as s:
+            obj = db.ProductSnapshot(platform=platform, product_id=product_id, **snap)
+            s.add(obj)
+            s.commit()
+            s.refresh(obj)
+
+def timed(label, fn, n, scale=1, unit="rows"):
+    start = time.perf_counter()
+    fn()
+    elapsed = (time.perf_counter() - start) * scale
+    print(f"  {label:<28} {n / elapsed:10.0f} {unit}/sec")
+    return elapsed
+
+def benchmark(rows=ROWS):
+    folder = tempfile.mkdtemp(prefix="bench_storage_")
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+    import db
+    import storage
+
+    print(f"💾 Writing {rows} snapshots to {folder}")
+    sample = min(rows, PER_ROW_LIMIT)
+    base = timed(f"per-row commit ({sample} rows)", lambda: per_row(db, sample), sample)
+    base = base * rows / sample
+    bulk = timed("save_snapshots_to_db", lambda: storage.save_snapshots_to_db(fake_snapshots(rows)), rows)
+    timed("save_snapshots_to_db + ids",
+          lambda: storage.save_snapshots_to_db(fake_snapshots(rows), return_ids=True), rows)
+    timed("  ... commit_each=True",
+          lambda: storage.save_snapshots_to_db(fake_snapshots(rows), commit_each=True), rows)
+
+    def background():
+        with storage.SnapshotWriter() as writer:
+            for snap in fake_snapshots(rows):
+                writer.add(*snap)
+    timed("SnapshotWriter (thread)", background, rows)
+    print(f"⚡ Batched insert is {base / bulk:.0f}x faster than per-row commits")
+    check_atomic(db, storage)
+
+def check_atomic(db, storage):
+    # a bulk save that fails in its third batch must leave nothing behind
+    def failing():
+        yield from fake_snapshots(2 * storage.BATCH_SIZE)
+        raise RuntimeError("scraper died")
+    from sqlalchemy import select, func
+
+    def count():
+        with db.ReadSession() as s:
+            return s.execute(select(func.count(db.ProductSnapshot.id))).scalar()
+    before = count()
+    try:
+        storage.save_snapshots_to_db(failing())
+    except RuntimeError:
+        pass
+    assert count() == before, f"{count() - before} rows committed by a failed bulk save"
+    print("✅ A failed bulk save commits nothing")
+
+# ---------------- CONCURRENCY ----------------
+# Writers are threads of one process (a scraper's worker pool); readers are
+# separate processes (dashboards), as in production.
+
+def _reader_process(worker, seconds, out):
+    from sqlalchemy import select
+    import db
+    rnd = random.Random(worker)
+    P = db.ProductSnapshot
+    reads, errors, latencies = 0, 0, []
+    stop = time.monotonic() + seconds
+    while time.monotonic() < stop:
+        pid = f"pid{rnd.randrange(500):04d}"
+        q = (select(P.price).where(P.platform == "flipkart", P.product_id == pid)
+             .order_by(P.scraped_at.desc()).limit(1))
+        start = time.perf_counter()
+        try:
+            with db.ReadSession() as s:
+                s.execute(q).first()
+            reads += 1
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    out.put((reads, errors, latencies))
+
+def _concurrency_run(mode, writers, readers, seconds, out):
+    folder = tempfile.mkdtemp(prefix=f"bench_storage_{mode}_")
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+    os.environ["DB_MODE"] = mode
+    import storage
+
+    storage.save_snapshots_to_db(fake_snapshots(5000))
+    ctx = mp.get_context("spawn")
+    read_out = ctx.Queue()
+    procs = [ctx.Process(target=_reader_process, args=(i, seconds, read_out))
+             for i in range(readers)]
+    for p in procs:
+        p.start()
+
+    counts = {"writes": 0, "write_errors": 0}
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def writer(worker):
+        i = 0
+        while time.monotonic() < stop:
+            rows = [("flipkart", f"pid{(worker * 1000 + i + k) % 500:04d}",
+                     {"price": 10000.0 + k, "raw": {"w": worker}}) for k in range(WRITE_ROWS)]
+            i += WRITE_ROWS
+            try:
+                storage.save_snapshots_to_db(rows)
+                key = "writes"
+            except Exception:
+                key = "write_errors"
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    reads, read_errors, latencies = 0, 0, []
+    for _ in procs:
+        r, e, lat = read_out.get()
+        reads, read_errors = reads + r, read_errors + e
+        latencies.extend(lat)
+    for p in procs:
+        p.join()
+    latencies.sort()
+    out.put(dict(counts, mode=mode, reads=reads, read_errors=read_errors,
+                 p95_ms=1000 * latencies[int(len(latencies) * 0.95)] if latencies else 0.0))
+
+def concurrency(writers=WRITERS, readers=READERS, seconds=SECONDS):
+    """N writer threads + M reader processes on one database, once per DB_MODE"""
+    print(f"🔀 {writers} writer threads ({WRITE_ROWS} rows/transaction) + "
+          f"{readers} reader processes for {seconds}s")
+    ctx = mp.get_context("spawn")
+    for mode in ("default", "wal"):
+        out = ctx.Queue()
+        proc = ctx.Process(target=_concurrency_run, args=(mode, writers, readers, seconds, out))
+        proc.start()
+        r = out.get()
+        proc.join()
+        print(f"  {r['mode']:<8} {r['writes'] / seconds:8.0f} writes/sec ({r['write_errors']} failed)  "
+              f"{r['reads'] / seconds:8.0f} reads/sec ({r['read_errors']} failed)  "
+              f"read p95 {r['p95_ms']:.1f} ms")
+
+# ---------------- CURRENT STATE ----------------
+
+def latest(history=200_000, lookups=200):
+    """Current price of single products: history scan vs latest_product_state"""
+    folder = tempfile.mkdtemp(prefix="bench_storage_latest_")
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+    from datetime import datetime, timedelta
+    from sqlalchemy import select, func
+    import db
+    import storage
+
+    start = datetime(2024, 1, 1)
+    storage.save_snapshots_to_db(
+        (platform, product_id, dict(snap, scraped_at=start + timedelta(minutes=i)))
+        for i, (platform, product_id, snap) in enumerate(fake_snapshots(history)))
+    P, L = db.ProductSnapshot, db.LatestProductState
+    pids = [f"pid{random.Random(i).randrange(500):04d}" for i in range(lookups)]
+
+    def scan():
+        # the old way: group the whole history table, then join back for the row
+        newest = (select(P.platform, P.product_id, func.max(P.scraped_at).label("ts"))
+                  .group_by(P.platform, P.product_id).subquery())
+        q = (select(P.price).join(newest, (P.platform == newest.c.platform)
+                                  & (P.product_id == newest.c.product_id)
+                                  & (P.scraped_at == newest.c.ts)))
+        with db.ReadSession() as s:
+            for pid in pids:
+                s.execute(q.where(P.product_id == pid)).first()
+
+    def indexed():
+        with db.ReadSession() as s:
+            for pid in pids:
+                s.execute(select(L.price).where(L.platform == "flipkart", L.product_id == pid)).first()
+
+    print(f"🏷 {lookups} current-price lookups over {history} snapshots of 500 products")
+    slow = timed("group-by over history", scan, lookups, unit="lookups")
+    fast = timed("latest_product_state", indexed, lookups, unit="lookups")
+    print(f"⚡ latest_product_state is {slow / fast:.0f}x faster")
+
+# ---------------- PAYLOADS ----------------
+
+OFFERS = ["Bank Offer 10% off on HDFC Bank Credit Card EMI Transactions, up to ₹1,500",
+          "Bank Offer 5% Unlimited Cashback on Flipkart Axis Bank Credit Card",
+          "Special Price Get extra ₹2000 off (price inclusive of cashback/coupon)",
+          "Partner Offer Sign-up for Flipkart Pay Later & get free Times Prime Benefits"]
+
+def daily_payloads(products, days, change_rate=0.1):
+    """Listing payloads of every product for every day; a few change each day"""
+    from datetime import datetime, timedelta
+    rnd = random.Random(0)
+    price = {i: 10000.0 + 100 * i for i in range(products)}
+    for day in range(days):
+        scraped_at = datetime(2024, 1, 1) + timedelta(days=day)
+        for i in range(products):
+            if rnd.random() < change_rate:
+                price[i] = round(price[i] * rnd.uniform(0.9, 1.1), -1)
+            raw = {"source": "flipkart", "productid": f"MOB{i:012d}",
+                   "mobilename": f"Brand {i % 20} Model {i} (Midnight Black, 128 GB) (8 GB RAM)",
+                   "sellingprice": price[i], "mrp": 15000.0 + 100 * i,
+                   "discountoffering": f"{rnd.randrange(5, 40)}% off" if day == 0 else "15% off",
+                   "rating": 4.3, "url": f"https://www.flipkart.com/brand-{i % 20}-model-{i}/p/itm{i:012x}"}
+            yield ("flipkart", raw["productid"],
+                   {"title": raw["mobilename"], "price": price[i], "list_price": raw["mrp"],
+                    "discount_pct": 15.0, "promotions": OFFERS[:2 + i % 3], "raw": raw,
+                    "scraped_at": scraped_at})
+
+def payloads(days=60, products=500):
+    """product_snapshots size with payloads in JSON columns vs deduplicated zstd blobs"""
+    folder = tempfile.mkdtemp(prefix="bench_storage_payloads_")
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(folder, 'blobs.db')}"
+    from sqlalchemy import create_engine, insert, text
+    import db
+    import storage
+    import payload_store
+
+    legacy = create_engine(f"sqlite:///{os.path.join(folder, 'json.db')}")
+    db.Base.metadata.create_all(legacy, tables=[db.ProductSnapshot.__table__])
+    with legacy.begin() as conn:
+        conn.execute(insert(db.ProductSnapshot),
+                     [dict(platform=p, product_id=pid, **snap) for p, pid, snap in daily_payloads(products, days)])
+    with legacy.connect() as conn:
+        conn.execute(text("VACUUM"))
+
+    snaps = list(daily_payloads(products, days))
+    first_week = products * 7
+    start = time.perf_counter()
+    storage.save_snapshots_to_db(snaps[:first_week])
+    payload_store.train_dictionary()
+    storage.save_snapshots_to_db(snaps[first_week:])
+    elapsed = time.perf_counter() - start
+    with db.engine.connect() as conn:
+        conn.execute(text("VACUUM"))
+
+    # round trip: what comes back equals what went in
+    ids = range(1, len(snaps) + 1, 97)
+    loaded = storage.load_payloads(ids)
+    for i in ids:
+        _, _, snap = snaps[i - 1]
+        assert loaded[i]["raw"] == snap["raw"] and loaded[i]["promotions"] == snap["promotions"]
+
+    json_mb = os.path.getsize(os.path.join(folder, "json.db")) / 1e6
+    blob_mb = os.path.getsize(os.path.join(folder, "blobs.db")) / 1e6
+    print(f"🗜 {len(snaps)} snapshots ({products} products x {days} days, ~10% change per day)")
+    print(f"  JSON columns   {json_mb:8.2f} MB")
+    print(f"  payload blobs  {blob_mb:8.2f} MB   ({json_mb / blob_mb:.1f}x smaller, "
+          f"{len(snaps) / elapsed:.0f} snapshots/sec written, round trip checked)")
+    payload_store.print_payload_stats()
+
+# ---------------- ROLLUPS ----------------
+
+def rollups(days=365, products=200, per_day=4):
+    """Incremental rollups equal a from-scratch aggregate; long-range reads from raw vs rollups"""
+    folder = tempfile.mkdtemp(prefix="bench_storage_rollups_")
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(folder, 'bench.db')}"
+    from datetime import datetime, timedelta
+    import pandas as pd
+    from sqlalchemy import select
+    import db
+    import storage
+    import price_rollups
+
+    rnd = random.Random(0)
+    start = datetime(2024, 1, 1)
+    snaps = [("flipkart", f"pid{p:04d}",
+              {"price": 10000.0 + rnd.randrange(-500, 500), "discount_pct": float(rnd.randrange(40)),
+               "scraped_at": start + timedelta(hours=24 * d / per_day + rnd.random())})
+             for d in range(days * per_day) for p in range(products)]
+    # three runs, the last one with rows that arrive late (older scraped_at than rows already rolled up)
+    rnd.shuffle(snaps[len(snaps) // 2:])
+    t = time.perf_counter()
+    for part in (snaps[:len(snaps) // 3], snaps[len(snaps) // 3:len(snaps) // 2], snaps[len(snaps) // 2:]):
+        storage.save_snapshots_to_db(part)
+        price_rollups.rollup()
+    elapsed = time.perf_counter() - t
+    print(f"📊 {len(snaps)} snapshots ({products} products, {days} days) stored and rolled up "
+          f"in 3 runs, {len(snaps) / elapsed:.0f} snapshots/sec")
+
+    expected = pd.DataFrame(price_rollups.aggregate(pd.DataFrame(
+        [{"platform": p, "product_id": pid, **snap} for p, pid, snap in snaps])))
+    got = pd.concat([price_rollups.load_rollups(period) for period in price_rollups.PERIODS])
+    key = ["period", "product_id", "bucket_start"]
+    expected = expected.sort_values(key).reset_index(drop=True)[price_rollups.ROLLUP_COLUMNS]
+    got = got.sort_values(key).reset_index(drop=True)[price_rollups.ROLLUP_COLUMNS]
+    assert len(expected) == len(got)
+    pd.testing.assert_frame_equal(expected, got, check_dtype=False)
+    print(f"  incremental rollups match a one-shot aggregate ({len(got)} buckets)")
+
+    pids = [f"pid{p:04d}" for p in range(0, products, products // 20)]
+    P = db.ProductSnapshot
+
+    def from_raw():
+        with db.ReadSession() as s:
+            raw = pd.DataFrame(s.execute(select(P.product_id, P.price, P.scraped_at)
+                                         .where(P.product_id.in_(pids))).all(),
+                               columns=["product_id", "price", "scraped_at"])
+        raw["week"] = price_rollups.bucket_starts(pd.to_datetime(raw["scraped_at"]), "week")
+        return raw.sort_values("scraped_at").groupby(["product_id", "week"])["price"].last()
+
+    def from_rollups():
+        return price_rollups.price_series(pids, start, start + timedelta(days=days), period="week")
+
+    slow = timed("weekly trend from raw rows", from_raw, len(pids), unit="products")
+    fast = timed("price_series (weekly rollups)", from_rollups, len(pids), unit="products")
+    print(f"⚡ Rollups are {slow / fast:.0f}x faster for a {days}-day trend")
+
+    removed = price_rollups.compact(now=start + timedelta(days=days))
+    after = pd.concat([price_rollups.load_rollups(period) for period in ("day", "week")])
+    assert len(after) == (got["period"] != "hour").sum()
+    print(f"  retention kept the last {price_rollups.RAW_RETENTION_DAYS} days raw, daily/weekly rollups intact")
+
+    # every raw row past retention: the newest id must survive, or SQLite reuses ids at or
+    # below the watermark and the next snapshots are never rolled up
+    price_rollups.compact(now=start + timedelta(days=days + 2 * price_rollups.RAW_RETENTION_DAYS))
+    with db.ReadSession() as s:
+        left = s.execute(select(P.id)).scalars().all()
+    assert len(left) == 1 and left[0] == price_rollups.watermark(), left
+    new_ids = storage.save_snapshots_to_db([("flipkart", "pid0000", {"price": 9999.0})], return_ids=True)
+    assert new_ids[0] > price_rollups.watermark() and price_rollups.rollup() == 1
+    print("  snapshots saved after a full compaction get new ids and are rolled up")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "concurrency":
+        concurrency(*(int(a) for a in sys.argv[2:4]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "latest":
+        latest(*(int(a) for a in sys.argv[2:3]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "rollups":
+        rollups(*(int(a) for a in sys.argv[2:4]))
+    elif len(sys.argv) > 1 and sys.argv[1] == "payloads":
+        payloads(*(int(a) for a in sys.argv[2:4]))
+    else:
+        benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else ROWS)
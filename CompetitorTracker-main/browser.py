@@ -0,0 +1,103 @@
+#browser.py
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+import os
+import time
+
+from page_archive import ReplayDriver
+
+PAGE_TIMEOUT = 10   # seconds to wait for a marker element
+# Lightweight mode: the scrapers only read text nodes, so images, fonts,
+# stylesheets, media and trackers are blocked before they are requested.
+LIGHTWEIGHT = os.getenv("BROWSER_LIGHTWEIGHT", "1") != "0"
+BLOCKED_URLS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico", "*.avif",
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot", "*.css", "*.mp4", "*.webm",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*facebook.net*", "*track*.js*", "*beacon*",
+]
+CACHE_DIR = os.path.join("data", "chrome_cache")   # kept across driver restarts
+# returns the bytes the current page pulled over the network (0 for cache hits)
+TRANSFER_JS = ("return performance.getEntriesByType('navigation')"
+               ".concat(performance.getEntriesByType('resource'))"
+               ".reduce((n, e) => n + (e.transferSize || 0), 0);")
+
+def make_driver(lightweight=LIGHTWEIGHT, cache_name="default"):
+    """Start a headless Chrome driver with the scrapers' standard options
+
+    In lightweight mode non-essential resources are blocked through the
+    DevTools protocol. Each driver is meant to be reused for many pages; its
+    disk cache lives under CACHE_DIR/cache_name so a restarted driver starts
+    warm. driver.transfer_stats counts pages and bytes transferred.
+    """
+    options = webdriver.ChromeOptions()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--log-level=3")
+    options.add_experimental_option('excludeSwitches', ['enable-logging'])
+    if lightweight:
+        options.add_argument(f"--disk-cache-dir={os.path.abspath(os.path.join(CACHE_DIR, cache_name))}")
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.managed_default_content_settings.fonts": 2,
+        })
+    driver = webdriver.Chrome(options=options)
+    if lightweight:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    driver.transfer_stats = {"pages": 0, "bytes": 0}
+    return driver
+
+def page_bytes(driver):
+    """Bytes transferred for the page currently loaded in driver"""
+    try:
+        return int(driver.execute_script(TRANSFER_JS) or 0)
+    except Exception:
+        return 0
+
+def load_page(driver, url, wait_class=None, timeout=PAGE_TIMEOUT, limiter=None, archive=None):
+    """Open url and wait for wait_class to appear; returns page source or None on timeout
+
+    With a limiter (rate_limiter.AdaptiveRateLimiter) the page load waits for
+    a slot first and reports its latency once wait_class has appeared; a
+    failed driver.get or a marker timeout counts as a timeout so the limiter
+    backs off. With an archive (page_archive.PageArchive) every loaded page is
+    stored; a ReplayDriver serves pages from one instead.
+    """
+    if isinstance(driver, ReplayDriver):
+        return driver.load(url)
+    start = limiter.wait(url) if limiter is not None else None
+    status = None
+    try:
+        driver.get(url)
+        if wait_class:
+            try:
+                WebDriverWait(driver, timeout).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, wait_class))
+                )
+            except TimeoutException:
+                return None
+        status = 200
+    finally:
+        if limiter is not None:
+            limiter.done(url, status, time.monotonic() - start)
+    html = driver.page_source
+    stats = getattr(driver, "transfer_stats", None)
+    if stats is not None:
+        stats["pages"] += 1
+        stats["bytes"] += page_bytes(driver)
+    if archive is not None:
+        archive.put(url, html)
+    return html
+
+def print_transfer_stats(stats):
+    """Print bandwidth per page from one or more drivers' transfer_stats"""
+    pages = sum(s["pages"] for s in stats)
+    total = sum(s["bytes"] for s in stats)
+    if pages:
+        print(f"📦 Browser transfer: {total / 2**20:.1f} MB over {pages} pages "
+              f"({total / pages / 1024:.0f} KB/page)")
@@ -0,0 +1,177 @@
+#browser_pool.py
+
+import time
+import queue
+import threading
+from functools import partial
+from selenium.common.exceptions import WebDriverException
+
+from browser import make_driver, load_page
+from rate_limiter import AdaptiveRateLimiter
+
+# ---------------- CONFIG ----------------
+WORKERS = 4          # parallel Chrome instances
+MAX_RETRIES = 2      # re-queues per URL after a browser crash
+
+_STOP = object()
+
+# ---------------- WORKER ----------------
+
+class BrowserWorker(threading.Thread):
+    """One warm headless Chrome pulling URLs from a shared queue.
+
+    ``handler(url, html)`` runs in the worker thread for every page; ``html``
+    is None when wait_class never appeared. Whatever it returns (unless
+    None) is collected as a result. If Chrome dies mid-page the driver is
+    restarted and the URL is re-queued, up to MAX_RETRIES times. If Chrome
+    cannot be started at all the worker counts an error and exits, leaving
+    its URL in the queue for the other workers. Page loads are paced by the
+    pool's shared AdaptiveRateLimiter and stored in the archive when one is
+    given.
+    """
+
+    def __init__(self, worker_id, tasks, results, handler, wait_class, limiter,
+                 archive=None, driver_factory=None):
+        super().__init__(name=f"browser-{worker_id}", daemon=True)
+        self.worker_id = worker_id
+        self.tasks = tasks
+        self.results = results
+        self.handler = handler
+        self.wait_class = wait_class
+        self.limiter = limiter
+        self.archive = archive
+        # each worker keeps its own Chrome disk cache so a restarted driver starts warm
+        self.driver_factory = driver_factory or partial(make_driver, cache_name=f"worker-{worker_id}")
+        self.driver = None
+        self.stats = {"worker": worker_id, "pages": 0, "timeouts": 0,
+                      "errors": 0, "restarts": 0, "busy_sec": 0.0, "bytes": 0}
+
+    def _collect_transfer(self):
+        transfer = getattr(self.driver, "transfer_stats", None)
+        if transfer is not None:
+            self.stats["bytes"] += transfer["bytes"]
+            transfer["bytes"] = 0
+
+    def _restart(self):
+        """Start a fresh Chrome; False (worker should exit) when it would not start"""
+        if self.driver is not None:
+            self._collect_transfer()
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+        try:
+            self.driver = self.driver_factory()
+        except Exception as e:
+            self.stats["errors"] += 1
+            print(f"❌ [{self.name}] could not start Chrome: {e}. Worker stopping.")
+            return False
+        return True
+
+    def run(self):
+        if not self._restart():
+            return
+        try:
+            while True:
+                item = self.tasks.get()
+                if item is _STOP:
+                    self.tasks.task_done()
+                    break
+                url, attempt = item
+                start = time.perf_counter()
+                try:
+                    html = load_page(self.driver, url, self.wait_class, limiter=self.limiter,
+                                     archive=self.archive)
+                    if html is None:
+                        self.stats["timeouts"] += 1
+                    row = self.handler(url, html)
+                    if row is not None:
+                        self.results.append(row)
+                    self.stats["pages"] += 1
+                except WebDriverException as e:
+                    self.stats["restarts"] += 1
+                    print(f"⚠ [{self.name}] browser crashed on {url}: {e.msg}. Restarting.")
+                    if attempt < MAX_RETRIES:
+                        self.tasks.put((url, attempt + 1))
+                    else:
+                        self.stats["errors"] += 1
+                    if not self._restart():
+                        break
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"An unexpected error occurred for URL {url}: {e}")
+                finally:
+                    self.stats["busy_sec"] += time.perf_counter() - start
+                    self.tasks.task_done()
+        finally:
+            if self.driver is not None:
+                self._collect_transfer()
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+
+# ---------------- POOL ----------------
+
+def _wait(tasks, pool):
+    """tasks.join() that also returns once every worker has exited"""
+    with tasks.all_tasks_done:
+        while tasks.unfinished_tasks and any(w.is_alive() for w in pool):
+            tasks.all_tasks_done.wait(0.5)
+
+def _drain(tasks):
+    """Empty the queue; returns the URLs that were still waiting"""
+    left = []
+    while True:
+        try:
+            item = tasks.get_nowait()
+        except queue.Empty:
+            return left
+        if item is not _STOP:
+            left.append(item[0])
+        tasks.task_done()
+
+def run_pool(urls, handler, workers=WORKERS, wait_class=None, limiter=None, archive=None,
+             driver_factory=None):
+    """Scrape urls with N browser workers; returns (results, per-worker stats)"""
+    limiter = limiter or AdaptiveRateLimiter()
+    tasks = queue.Queue()
+    for url in urls:
+        tasks.put((url, 0))
+
+    results = []
+    pool = [BrowserWorker(i, tasks, results, handler, wait_class, limiter, archive,
+                          driver_factory)
+            for i in range(workers)]
+    started = time.perf_counter()
+    for w in pool:
+        w.start()
+    _wait(tasks, pool)
+    left = _drain(tasks)
+    if left:
+        print(f"❌ No browser worker left running; {len(left)} URLs were not scraped.")
+    for _ in pool:
+        tasks.put(_STOP)
+    for w in pool:
+        w.join()
+
+    elapsed = time.perf_counter() - started
+    stats = []
+    for w in pool:
+        s = dict(w.stats)
+        s["pages_per_sec"] = s["pages"] / elapsed if elapsed else 0.0
+        stats.append(s)
+    return results, stats
+
+def print_pool_stats(stats):
+    """Print per-worker throughput so the worker count can be tuned"""
+    total = sum(s["pages"] for s in stats)
+    print(f"\n🧵 Browser pool: {len(stats)} workers, {total} pages")
+    for s in stats:
+        print(f"  worker {s['worker']}: {s['pages']} pages, {s['pages_per_sec']:.2f} pages/sec, "
+              f"{s['timeouts']} timeouts, {s['errors']} errors, {s['restarts']} restarts, "
+              f"{s['bytes'] / max(s['pages'], 1) / 1024:.0f} KB/page")
+    total_bytes = sum(s["bytes"] for s in stats)
+    print(f"  total: {sum(s['pages_per_sec'] for s in stats):.2f} pages/sec, "
+          f"{total_bytes / 2**20:.1f} MB transferred ({total_bytes / max(total, 1) / 1024:.0f} KB/page)")
@@ -0,0 +1,154 @@
+#crawl.py
+# Daily single-pass crawl: search pages are discovered once and every
+# product / review page is fetched once, then fanned out to all the
+# parsers that products.py, reviews.py and pr.py used to run separately.
+
+import asyncio
+import argparse
+from datetime import datetime
+
+import ingestion
+import pr
+import products
+import reviews
+from extractors import (BASE_URL, parse_listing, parse_review_link, parse_reviews,
+                        parse_product_details, parse_review_details)
+from fetcher import Fetcher, PER_HOST_CONCURRENCY
+from rate_limiter import AdaptiveRateLimiter, print_limiter_stats
+from review_watermarks import ReviewWatermarks, recent_first
+
+# ---------------- CONFIG ----------------
+LISTING_PAGES = 3
+REVIEW_PAGES = max(pr.REVIEW_PAGES, reviews.REVIEW_PAGES)
+
+# ---------------- SHARED FRONTIER ----------------
+
+class Frontier:
+    """Fetches each URL at most once per crawl and counts page loads"""
+
+    def __init__(self, fetcher):
+        self.fetcher = fetcher
+        self.seen = set()
+        self.page_loads = 0
+
+    async def get(self, url, marker=None):
+        if url in self.seen:
+            return None
+        self.seen.add(url)
+        self.page_loads += 1
+        return await self.fetcher.get(url, marker)
+
+# ---------------- CRAWL ----------------
+
+async def crawl_product(frontier, base_url, productid, mobilename, url, review_pages, out,
+                        watermarks=None):
+    """Fetch one product page and its review pages, feeding every parser"""
+    try:
+        clean_url = url.split('?')[0]
+        html = await frontier.get(clean_url, marker="VU-ZEz")
+        if not html:
+            return 0
+        details = parse_product_details(html, clean_url)
+        out["details"].append(details)
+
+        reviews_base = parse_review_link(html, base_url)
+        if not reviews_base:
+            return 0
+        if watermarks is not None:
+            reviews_base = recent_first(reviews_base)
+
+        print(f"💬 Reviews for: {mobilename}")
+        fetched = 0
+        new_reviews = []
+        for rpage in range(1, review_pages + 1):
+            rhtml = await frontier.get(f"{reviews_base}&page={rpage}")
+            if not rhtml or "cPHDOP" not in rhtml:
+                break
+            fetched += 1   # only pages that were new and held reviews
+            page_reviews = parse_reviews(rhtml, productid, mobilename)
+            page_details = parse_review_details(rhtml, details["Product"])
+            reached = False
+            if watermarks is not None:
+                page_reviews, reached = watermarks.filter_new(productid, page_reviews)
+                fresh_texts = {r["review"].strip() for r in page_reviews}
+                page_details = [d for d in page_details if d["ReviewText"] in fresh_texts]
+            new_reviews.extend(page_reviews)
+            if rpage <= pr.REVIEW_PAGES or watermarks is not None:
+                out["reviews"].extend(page_reviews)
+            out["review_details"].extend(page_details)
+            if reached:
+                break
+        if watermarks is not None:
+            watermarks.advance(productid, new_reviews)
+        return fetched
+    except Exception as e:
+        print(f"⚠ Error scraping {mobilename}: {e}")
+        return 0
+
+async def crawl(base_url=BASE_URL, listing_pages=LISTING_PAGES, review_pages=REVIEW_PAGES,
+                per_host=PER_HOST_CONCURRENCY, selenium_fallback=True, limiter=None,
+                watermarks=None):
+    """Run the shared crawl; returns (datasets, stats)"""
+    scraped_at = datetime.now().isoformat()
+    out = {"mobiles": [], "details": [], "reviews": [], "review_details": []}
+
+    async with Fetcher(per_host=per_host, selenium_fallback=selenium_fallback,
+                       limiter=limiter) as fetcher:
+        frontier = Frontier(fetcher)
+
+        urls = [base_url + pr.SEARCH_PATH.format(p) for p in range(1, listing_pages + 1)]
+        pages = await asyncio.gather(*(frontier.get(u, marker="tUxRFH") for u in urls))
+        product_links = {}
+        for html in pages:
+            for row in parse_listing(html, scraped_at, base_url) if html else []:
+                out["mobiles"].append(row)
+                if row["url"]:
+                    product_links.setdefault(row["productid"], (row["mobilename"], row["url"]))
+        print(f"📄 {len(urls)} listing pages → {len(product_links)} unique products")
+
+        review_loads = await asyncio.gather(*(
+            crawl_product(frontier, base_url, pid, name, url, review_pages, out, watermarks)
+            for pid, (name, url) in product_links.items()
+        ))
+
+    # page loads the three scrapers would have made running separately
+    n = len(product_links)
+    separate = (3 * listing_pages + 3 * n
+                + sum(min(k, pr.REVIEW_PAGES) for k in review_loads)
+                + sum(min(k, reviews.REVIEW_PAGES) for k in review_loads))
+    stats = {"page_loads": frontier.page_loads, "separate_page_loads": separate}
+    return out, stats
+
+def main():
+    parser = argparse.ArgumentParser(description="Single-pass Flipkart crawl")
+    parser.add_argument("--listing-pages", type=int, default=LISTING_PAGES)
+    parser.add_argument("--per-host", type=int, default=PER_HOST_CONCURRENCY)
+    parser.add_argument("--full", action="store_true",
+                        help="ignore review watermarks and rewrite the review files")
+    args = parser.parse_args()
+
+    watermarks = None
+    if not args.full:
+        watermarks = ReviewWatermarks()
+        watermarks.seed_from_csv("review.csv")
+
+    limiter = AdaptiveRateLimiter()
+    out, stats = asyncio.run(crawl(listing_pages=args.listing_pages, per_host=args.per_host,
+                                   limiter=limiter, watermarks=watermarks))
+    print(f"⏱ {stats['page_loads']} page loads "
+          f"(separate scrapers: ~{stats['separate_page_loads']})")
+    print_limiter_stats(limiter)
+    limiter.export()
+
+    pr.save_mobile(out["mobiles"])
+    incremental = watermarks is not None
+    pr.save_reviews(out["reviews"], append=incremental)
+    products.save_details(out["details"])
+    reviews.save_reviews(out["review_details"], append=incremental)
+    if incremental:
+        watermarks.save()
+    # same mode as pr.py, so its next incremental run finds the outputs it left
+    ingestion.main(incremental=incremental)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,222 @@
+#crawl_frontier.py
+# Resumable crawl state kept in SQLite (through the db.py engine): every URL
+# moves pending -> in_flight -> done / failed (or pending -> skipped), and the
+# rows parsed from a page are stored in the same transaction that marks it
+# done. A crash loses at most the pages that were in flight; re-running the
+# scraper picks up from there. Appending exports are recorded too (kind
+# "export"), so a resumed crawl does not write its rows out twice. On the
+# shared database every write goes through db.write (the single writer
+# thread in WAL mode); a frontier on its own engine writes directly.
+
+import os
+import csv
+import hashlib
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import sessionmaker
+
+import db
+from db import CrawlUrl, CrawlRow
+
+# ---------------- CONFIG ----------------
+MAX_RETRIES = 2          # a URL is marked failed after this many retries
+EXPORT_BATCH = 1000      # rows read from the DB per chunk when exporting
+
+# ---------------- FRONTIER ----------------
+
+class CrawlFrontier:
+    """URL states and parsed rows of one named crawl"""
+
+    def __init__(self, crawl, engine=None, max_retries=MAX_RETRIES):
+        self.crawl = crawl
+        self.engine = engine or db.engine
+        self.max_retries = max_retries
+        if engine is not None:
+            db.Base.metadata.create_all(engine, tables=[CrawlUrl.__table__, CrawlRow.__table__])
+            self.Session = sessionmaker(bind=self.engine, future=True)
+        else:
+            self.Session = db.ReadSession
+
+    def _write(self, fn):
+        """Run fn(session) in a write transaction: db.write on the shared database"""
+        if self.engine is db.engine:
+            return db.write(fn)
+        with self.Session() as s, s.begin():
+            return fn(s)
+
+    def add(self, urls, kind, payload=None):
+        """Queue URLs as pending; URLs already known to this crawl are left alone"""
+        values = [{"crawl": self.crawl, "url": u, "kind": kind, "state": "pending",
+                   "retries": 0, "payload": payload(u) if callable(payload) else payload}
+                  for u in dict.fromkeys(urls)]
+        if not values:
+            return
+        self._write(lambda s: s.execute(insert(CrawlUrl).values(values).on_conflict_do_nothing()))
+
+    def resume(self):
+        """Put pages left in flight by a crashed run back in the queue; returns the counts"""
+        self._write(lambda s: s.execute(
+            update(CrawlUrl)
+            .where(CrawlUrl.crawl == self.crawl, CrawlUrl.state == "in_flight")
+            .values(state="pending")))
+        return self.counts()
+
+    def claim(self, kind, limit=None):
+        """Mark up to limit pending URLs of a kind in flight; returns [(id, url, payload)]"""
+        q = (select(CrawlUrl.id, CrawlUrl.url, CrawlUrl.payload)
+             .where(CrawlUrl.crawl == self.crawl, CrawlUrl.kind == kind,
+                    CrawlUrl.state == "pending")
+             .order_by(CrawlUrl.id))
+        if limit:
+            q = q.limit(limit)
+
+        def job(s):
+            items = [tuple(r) for r in s.execute(q)]
+            if items:
+                s.execute(update(CrawlUrl).where(CrawlUrl.id.in_([i[0] for i in items]))
+                          .values(state="in_flight"))
+            return items
+        return self._write(job)
+
+    def done(self, url_id, rows=None):
+        """Store a page's parsed rows and mark it done in one transaction.
+
+        rows is a list of (dataset, row_dict).
+        """
+        def job(s):
+            if rows:
+                s.execute(insert(CrawlRow), [{"crawl": self.crawl, "dataset": dataset,
+                                              "url_id": url_id, "row": row}
+                                             for dataset, row in rows])
+            s.execute(update(CrawlUrl).where(CrawlUrl.id == url_id)
+                      .values(state="done", error=None))
+        self._write(job)
+
+    def failed(self, url_id, error=""):
+        """Count a failed attempt; the URL is retried until max_retries is used up"""
+        def job(s):
+            item = s.get(CrawlUrl, url_id)
+            item.retries += 1
+            item.error = str(error)[:500]
+            item.state = "pending" if item.retries <= self.max_retries else "failed"
+        self._write(job)
+
+    def items(self, kind, state="pending"):
+        """[(id, url, payload)] of one kind in one state, without claiming them"""
+        with self.Session() as s:
+            q = (select(CrawlUrl.id, CrawlUrl.url, CrawlUrl.payload)
+                 .where(CrawlUrl.crawl == self.crawl, CrawlUrl.kind == kind,
+                        CrawlUrl.state == state)
+                 .order_by(CrawlUrl.id))
+            return [tuple(r) for r in s.execute(q)]
+
+    def skip(self, url_ids):
+        """Leave pending URLs out of this crawl (e.g. products not due for a recrawl)"""
+        url_ids = list(url_ids)
+        self._write(lambda s: s.execute(update(CrawlUrl).where(CrawlUrl.id.in_(url_ids))
+                                        .values(state="skipped")))
+
+    def counts(self, kind=None):
+        with self.Session() as s:
+            q = select(CrawlUrl.state, func.count()).where(CrawlUrl.crawl == self.crawl)
+            if kind is not None:
+                q = q.where(CrawlUrl.kind == kind)
+            return dict(s.execute(q.group_by(CrawlUrl.state)).all())
+
+    def has_work(self):
+        counts = self.counts()
+        return bool(counts.get("pending") or counts.get("in_flight"))
+
+    def row_count(self, dataset):
+        with self.Session() as s:
+            q = select(func.count()).where(CrawlRow.crawl == self.crawl,
+                                           CrawlRow.dataset == dataset)
+            return s.execute(q).scalar()
+
+    def iter_rows(self, dataset, batch=EXPORT_BATCH):
+        """Yield stored rows in the order they were produced, batch by batch"""
+        last_id = 0
+        with self.Session() as s:
+            while True:
+                q = (select(CrawlRow.id, CrawlRow.row)
+                     .where(CrawlRow.crawl == self.crawl, CrawlRow.dataset == dataset,
+                            CrawlRow.id > last_id)
+                     .order_by(CrawlRow.id).limit(batch))
+                chunk = s.execute(q).all()
+                if not chunk:
+                    return
+                last_id = chunk[-1][0]
+                for _, row in chunk:
+                    yield row
+
+    def export_csv(self, dataset, path, columns, append=False, dedupe=None,
+                   encoding="utf-8-sig"):
+        """Stream a dataset into a CSV without loading it into memory; returns rows written.
+
+        With append the rows are added to an existing file (no header), and
+        the file's size before the export is recorded in the frontier first:
+        exporting again before clear() (a crawl resumed after a crash) cuts
+        the file back to that size, so no row is appended twice. dedupe is a
+        list of columns; rows whose key is already in the file or earlier in
+        the export are skipped.
+        """
+        if append:
+            offset = self.export_offset(path)
+            if offset is None:
+                offset = os.path.getsize(path) if os.path.exists(path) else 0
+                self._mark_export(path, offset)
+            elif os.path.exists(path):
+                with open(path, "r+b") as f:
+                    f.truncate(offset)
+        seen = set()
+        appending = append and os.path.exists(path) and os.path.getsize(path) > 0
+        if dedupe and appending:
+            with open(path, newline="", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    seen.add(_key(row, dedupe))
+
+        written = 0
+        mode = "a" if appending else "w"
+        with open(path, mode, newline="", encoding="utf-8" if appending else encoding) as f:
+            writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+            if not appending:
+                writer.writeheader()
+            for row in self.iter_rows(dataset):
+                if dedupe:
+                    key = _key(row, dedupe)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                writer.writerow(row)
+                written += 1
+        return written
+
+    def export_offset(self, path):
+        """Size path had before this crawl appended to it, or None if it has not yet"""
+        with self.Session() as s:
+            q = select(CrawlUrl.payload).where(CrawlUrl.crawl == self.crawl,
+                                               CrawlUrl.kind == "export", CrawlUrl.url == path)
+            payload = s.execute(q).scalar()
+        return None if payload is None else payload["offset"]
+
+    def _mark_export(self, path, offset):
+        self._write(lambda s: s.execute(
+            insert(CrawlUrl).values(crawl=self.crawl, url=path, kind="export", state="exported",
+                                    retries=0, payload={"offset": offset})
+            .on_conflict_do_nothing()))
+
+    def clear(self):
+        """Forget this crawl once its output has been exported"""
+        def job(s):
+            s.execute(delete(CrawlRow).where(CrawlRow.crawl == self.crawl))
+            s.execute(delete(CrawlUrl).where(CrawlUrl.crawl == self.crawl))
+        self._write(job)
+
+def _key(row, columns):
+    text = "\x1f".join("" if row.get(c) is None else str(row.get(c)) for c in columns)
+    return hashlib.sha1(text.encode("utf-8")).digest()
+
+def print_frontier_stats(frontier):
+    counts = frontier.counts()
+    print("🗂 Frontier: " + ", ".join(f"{state} {n}" for state, n in sorted(counts.items())))
@@ -1,23 +1,26 @@
 import pandas as pd
+import schema
+from snapshot_store import read_table
 
 def load_csv_files(competitor_file: str, review_file: str):
     """
-    Reads competitor and review CSV files into Pandas DataFrames.
+    Reads competitor and review CSV files into Pandas DataFrames, with the
+    shared column dtypes of schema.py.
 
     Args:
-        competitor_file (str): Path to competitor CSV
+        competitor_file (str): Path to competitor CSV, or a snapshot store dataset (e.g. "mobile")
         review_file (str): Path to review CSV
 
     Returns:
         tuple: (competitor_df, review_df)
     """
     # Read competitor history
-    competitor_df = pd.read_csv(competitor_file)
+    competitor_df = schema.apply(read_table(competitor_file))
     if 'date' in competitor_df.columns:
         competitor_df['date'] = pd.to_datetime(competitor_df['date'], errors='coerce')
 
     # Read reviews
-    review_df = pd.read_csv(review_file)
+    review_df = schema.read_csv(review_file)
     if 'date' in review_df.columns:
         review_df['date'] = pd.to_datetime(review_df['date'], errors='coerce')
 
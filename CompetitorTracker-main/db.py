@@ -1,9 +1,46 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, JSON, func
+import os
+import queue
+import atexit
+import threading
+from concurrent.futures import Future
+from sqlalchemy import create_engine, event, inspect, text, Column, Integer, String, Float, DateTime, JSON, Text, LargeBinary, UniqueConstraint, Index, PrimaryKeyConstraint, func
 from sqlalchemy.orm import declarative_base, sessionmaker
 
-DB_URL = "sqlite:///competitor_flipkart.db"
+DB_URL = os.getenv("DB_URL", "sqlite:///competitor_flipkart.db")
+# "wal": WAL journal, tuned pragmas, one writer thread and a pool of read-only
+# connections; "default": plain SQLite settings, every thread writes itself
+DB_MODE = os.getenv("DB_MODE", "wal")
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",      # safe with WAL; fsync at checkpoints, not every commit
+    "cache_size": -64000,         # 64 MB page cache per connection
+    "mmap_size": 268435456,       # 256 MB memory-mapped reads
+    "temp_store": "MEMORY",
+    "busy_timeout": 10000,
+}
+READ_POOL_SIZE = 8
+WRITER_BATCH = 64                 # queued write jobs committed together
+
+def _tune_sqlite(eng, read_only=False):
+    @event.listens_for(eng, "connect")
+    def _set_pragmas(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        if read_only:
+            cur.execute("PRAGMA query_only=ON")
+        cur.close()
+
+WAL = DB_MODE == "wal" and DB_URL.startswith("sqlite:///") and ":memory:" not in DB_URL
 engine = create_engine(DB_URL, future=True, echo=False)
+read_engine = engine
+if WAL:
+    _tune_sqlite(engine)
+    read_engine = create_engine(DB_URL, future=True, echo=False,
+                                pool_size=READ_POOL_SIZE, max_overflow=READ_POOL_SIZE)
+    _tune_sqlite(read_engine, read_only=True)
 Session = sessionmaker(bind=engine, future=True)
+ReadSession = sessionmaker(bind=read_engine, future=True)
 Base = declarative_base()
 
 class ProductSnapshot(Base):
@@ -16,8 +53,224 @@ class ProductSnapshot(Base):
     list_price = Column(Float, nullable=True)
     discount_pct = Column(Float, nullable=True)
     currency = Column(String, default="INR")
-    promotions = Column(JSON, nullable=True)
+    promotions = Column(JSON, nullable=True)      # legacy rows; new rows use promotions_hash
     scraped_at = Column(DateTime(timezone=True), server_default=func.now())
-    raw = Column(JSON)
+    raw = Column(JSON)                            # legacy rows; new rows use raw_hash
+    promotions_hash = Column(String, nullable=True)   # PayloadBlob.hash
+    raw_hash = Column(String, nullable=True)
+    __table_args__ = (Index("ix_snapshot_platform_product_time", "platform", "product_id", "scraped_at"),)
+
+class LatestProductState(Base):
+    """Newest snapshot of each product, upserted in the same transaction as the snapshot"""
+    __tablename__ = "latest_product_state"
+    __table_args__ = (PrimaryKeyConstraint("platform", "product_id"),)
+    platform = Column(String)
+    product_id = Column(String)
+    title = Column(String)
+    price = Column(Float)
+    list_price = Column(Float, nullable=True)
+    discount_pct = Column(Float, nullable=True)
+    currency = Column(String, default="INR")
+    scraped_at = Column(DateTime(timezone=True))
+
+class PriceRollup(Base):
+    """Open/high/low/close price of one product over one hour, day or week (see price_rollups.py)"""
+    __tablename__ = "price_rollups"
+    __table_args__ = (PrimaryKeyConstraint("platform", "product_id", "period", "bucket_start"),)
+    platform = Column(String)
+    product_id = Column(String)
+    period = Column(String)                   # hour / day / week
+    bucket_start = Column(DateTime)
+    open = Column(Float)
+    high = Column(Float)
+    low = Column(Float)
+    close = Column(Float)
+    min_discount = Column(Float, nullable=True)
+    count = Column(Integer)                   # snapshots in the bucket
+    open_at = Column(DateTime)                # scraped_at of the open / close snapshot, so
+    close_at = Column(DateTime)               # late rows merge into the right place
+
+class RollupWatermark(Base):
+    """Last product_snapshots id folded into the rollups"""
+    __tablename__ = "rollup_watermarks"
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, default=0)
+
+class PayloadBlob(Base):
+    """A zstd-compressed JSON payload, stored once per distinct content (see payload_store.py)"""
+    __tablename__ = "payload_blobs"
+    hash = Column(String, primary_key=True)   # payload_store.payload_hash of the canonical JSON
+    dict_id = Column(Integer, nullable=True)  # PayloadDict used to compress it, if any
+    size = Column(Integer)                    # uncompressed bytes
+    data = Column(LargeBinary)
+
+class PayloadDict(Base):
+    """A zstd dictionary trained on stored payloads"""
+    __tablename__ = "payload_dicts"
+    id = Column(Integer, primary_key=True)
+    data = Column(LargeBinary)
+    samples = Column(Integer)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+class CrawlUrl(Base):
+    """One URL of a resumable crawl (see crawl_frontier.py)"""
+    __tablename__ = "crawl_frontier"
+    __table_args__ = (UniqueConstraint("crawl", "url"),)
+    id = Column(Integer, primary_key=True)
+    crawl = Column(String, index=True)        # crawl name, e.g. "pr" or "reviews"
+    url = Column(String)
+    kind = Column(String)                     # listing / product / review_page ...
+    state = Column(String, index=True, default="pending")   # pending / in_flight / done / failed / skipped / exported
+    retries = Column(Integer, default=0)
+    payload = Column(JSON, nullable=True)     # context needed to process the URL
+    error = Column(Text, nullable=True)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class CrawlRow(Base):
+    """A parsed output row, stored as soon as its page is processed"""
+    __tablename__ = "crawl_rows"
+    id = Column(Integer, primary_key=True)
+    crawl = Column(String, index=True)
+    dataset = Column(String, index=True)      # which output file the row belongs to
+    url_id = Column(Integer)
+    row = Column(JSON)
+
+class ProductSchedule(Base):
+    """Recrawl plan of one product (see recrawl_scheduler.py)"""
+    __tablename__ = "product_schedule"
+    __table_args__ = (UniqueConstraint("platform", "product_id"),)
+    id = Column(Integer, primary_key=True)
+    platform = Column(String, index=True)
+    product_id = Column(String, index=True)
+    last_crawled = Column(DateTime(timezone=True), nullable=True)
+    interval_hours = Column(Float, nullable=True)
+    review_velocity = Column(Float, default=0.0)   # new reviews per day (smoothed)
 
+_inspector = inspect(engine)
+_had_latest_state = _inspector.has_table("latest_product_state")
+_snapshot_columns = ({c["name"] for c in _inspector.get_columns("product_snapshots")}
+                     if _inspector.has_table("product_snapshots") else None)
 Base.metadata.create_all(engine)
+# create_all does not add new columns to an existing table
+if _snapshot_columns is not None:
+    with engine.begin() as _conn:
+        for _column in ("promotions_hash", "raw_hash"):
+            if _column not in _snapshot_columns:
+                _conn.execute(text(f"ALTER TABLE product_snapshots ADD COLUMN {_column} VARCHAR"))
+# create_all skips indexes of tables that already exist
+for _index in ProductSnapshot.__table__.indexes:
+    _index.create(engine, checkfirst=True)
+if not _had_latest_state:
+    # first run with the table: fill it from the existing history
+    with engine.begin() as _conn:
+        _conn.execute(text("""
+            INSERT INTO latest_product_state
+                (platform, product_id, title, price, list_price, discount_pct, currency, scraped_at)
+            SELECT platform, product_id, title, price, list_price, discount_pct, currency,
+                   MAX(scraped_at)
+            FROM product_snapshots GROUP BY platform, product_id"""))
+
+# ---------------- SINGLE WRITER ----------------
+
+class DbWriter:
+    """One thread that owns every write to the database.
+
+    Jobs are callables taking a Session. Whatever is queued when the thread
+    wakes up (up to WRITER_BATCH jobs) is committed in one transaction; if
+    that fails, the jobs are retried one transaction each so only the bad
+    job sees the error. Jobs must therefore be safe to run twice.
+    """
+
+    def __init__(self, batch=WRITER_BATCH):
+        self.batch = batch
+        self.jobs = queue.Queue()
+        self.stats = {"jobs": 0, "commits": 0}
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, fn):
+        future = Future()
+        self.jobs.put((fn, future))
+        return future
+
+    def run(self, fn):
+        """Run fn(session) on the writer thread and wait for its result"""
+        return self.submit(fn).result()
+
+    def close(self):
+        self.jobs.put(None)
+        self.thread.join()
+
+    def _commit(self, jobs):
+        with Session() as s, s.begin():
+            results = [fn(s) for fn, _ in jobs]
+        self.stats["commits"] += 1
+        for (_, future), result in zip(jobs, results):
+            future.set_result(result)
+
+    def _run(self):
+        while True:
+            first = self.jobs.get()
+            if first is None:
+                return
+            jobs = [first]
+            stop = False
+            while len(jobs) < self.batch:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    stop = True
+                    break
+                jobs.append(job)
+            self.stats["jobs"] += len(jobs)
+            try:
+                self._commit(jobs)
+            except Exception:
+                for job in jobs:
+                    try:
+                        self._commit([job])
+                    except Exception as e:
+                        job[1].set_exception(e)
+            if stop:
+                return
+
+_writer = None
+_writer_lock = threading.Lock()
+
+def get_writer():
+    """The process-wide DbWriter, started on first use"""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = DbWriter()
+            atexit.register(_writer.close)
+        return _writer
+
+def write(fn):
+    """Run fn(session) in a write transaction and return its result.
+
+    In WAL mode the job goes through the single writer thread; otherwise it
+    runs in the calling thread.
+    """
+    if WAL:
+        return get_writer().run(fn)
+    with Session() as s, s.begin():
+        return fn(s)
+
+def submit(fn):
+    """write() without waiting: returns a Future of fn's result.
+
+    Only the WAL writer thread runs jobs in the background; otherwise fn
+    runs here and the future is already done.
+    """
+    if WAL:
+        return get_writer().submit(fn)
+    future = Future()
+    try:
+        with Session() as s, s.begin():
+            future.set_result(fn(s))
+    except Exception as e:
+        future.set_exception(e)
+    return future
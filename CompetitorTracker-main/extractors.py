@@ -0,0 +1,404 @@
+#extractors.py
+# Page parsers shared by pr.py, products.py, reviews.py and crawl.py.
+#
+# Three interchangeable backends return identical row dicts:
+#   "bs4"      - full BeautifulSoup parse (the original scraper code)
+#   "strainer" - BeautifulSoup restricted by SoupStrainer to the containers we read
+#   "lxml"     - direct lxml tree + XPath, no BeautifulSoup objects at all
+# Pick one with EXTRACTOR_BACKEND=<name> or the backend= argument.
+
+import os
+import re
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, SoupStrainer
+import lxml.html
+from lxml.etree import ParserError
+
+BASE_URL = "https://www.flipkart.com"
+DEFAULT_BACKEND = os.getenv("EXTRACTOR_BACKEND", "lxml")
+
+# ---------------- HELPERS ----------------
+
+def clean_price(txt):
+    return re.sub(r"[^\d]", "", txt) if txt else None
+
+REVIEW_LINK_RE = re.compile("/product-reviews/")
+
+# ---------------- BEAUTIFULSOUP BACKEND ----------------
+
+class Bs4Extractor:
+    """The scrapers' original BeautifulSoup parsing, one method per page type"""
+
+    name = "bs4"
+
+    def _soup(self, html, kind):
+        return BeautifulSoup(html, "lxml")
+
+    def listing(self, html, scraped_at, base_url=BASE_URL):
+        """Extract mobile rows from a search listing page"""
+        soup = self._soup(html, "listing")
+        rows = []
+
+        for p in soup.find_all("div", {"class": "tUxRFH"}):
+            title_tag = p.find("div", {"class": "KzDlHZ"})
+            mobilename = title_tag.get_text(strip=True) if title_tag else "Unknown"
+
+            price_tag = p.find("div", {"class": "Nx9bqj _4b5DiR"})
+            sellingprice = clean_price(price_tag.get_text()) if price_tag else None
+
+            mrp_tag = p.find("div", {"class": "yRaY8j"})
+            mrp = mrp_tag.get_text(strip=True).replace("₹","").replace(",","") if mrp_tag else None
+
+            discount_tag = p.find("div", {"class": "UkUFwK"})
+            discountoffering = discount_tag.get_text(strip=True) if discount_tag else None
+
+            rating_tag = p.find("div", {"class": "XQDdHH"})
+            rating = rating_tag.get_text(strip=True) if rating_tag else None
+
+            link_tag = p.find("a", {"class": "CGtC98"})
+            url = urljoin(base_url, link_tag["href"]) if link_tag else None
+
+            rows.append(listing_row(mobilename, sellingprice, mrp, discountoffering, rating, url, scraped_at))
+        return rows
+
+    def product_links(self, html, base_url=BASE_URL, strip_query=True):
+        """Return the product URLs on a search page (query string dropped by default)"""
+        soup = self._soup(html, "product_links")
+        links = []
+        for product in soup.find_all("div", {"class": "_75nlfW"}):
+            link_tag = product.find("a", {"class": "CGtC98"})
+            if link_tag and 'href' in link_tag.attrs:
+                raw_url = urljoin(base_url, link_tag['href'])
+                links.append(raw_url.split('?')[0] if strip_query else raw_url)
+        return links
+
+    def review_link(self, html, base_url=BASE_URL):
+        """Return the 'All reviews' URL of a product page, or None"""
+        soup = self._soup(html, "review_link")
+        all_reviews_tag = soup.find("a", href=REVIEW_LINK_RE)
+        if not all_reviews_tag:
+            return None
+        return urljoin(base_url, all_reviews_tag["href"])
+
+    def product_details(self, html, url):
+        """Extract the products.py detail row from a product page"""
+        soup = self._soup(html, "product_details")
+
+        # Product Name
+        try:
+            name = soup.find("span", class_="VU-ZEz").text.strip()
+        except AttributeError:
+            name = None
+
+        # Category
+        try:
+            category_container = soup.find("div", class_="_1MR4o5")
+            category_tags = category_container.find_all("a", class_="_2whKao")
+            category = " > ".join([tag.text.strip() for tag in category_tags])
+        except AttributeError:
+            category = None
+
+        # Price
+        try:
+            price_str = soup.find("div", class_="Nx9bqj CxhGGd").text.strip()
+            price = float(re.sub(r'[^\d.]', '', price_str))
+        except (AttributeError, ValueError):
+            price = None
+
+        # Discount
+        try:
+            discount_str = soup.find("div", class_="UkUFwK").find("span").text.strip()
+            discount = int(re.search(r'\d+', discount_str).group())
+        except (AttributeError, ValueError):
+            discount = None
+
+        # Rating
+        try:
+            rating_str = soup.find("div", class_="XQDdHH").text.strip()
+            rating = float(rating_str)
+        except (AttributeError, ValueError):
+            rating = None
+
+        return {
+            "Product": name, "Category": category, "Price (₹)": price,
+            "Discount (%)": discount, "Rating": rating, "URL": url
+        }
+
+    def reviews(self, html, productid, mobilename):
+        """Extract review.csv rows from one review page"""
+        rsoup = self._soup(html, "reviews")
+        rows = []
+
+        for c in rsoup.find_all("div", {"class": "cPHDOP"}):
+            user_tag = c.find("p", {"class": "_2NsDsF AwS1CA"})
+            userid = user_tag.get_text(strip=True) if user_tag else "Anonymous"
+
+            rating_tag = c.find("div", {"class": "_3LWZlK"})
+            rrating = rating_tag.get_text(strip=True) if rating_tag else None
+
+            text_tag = c.find("div", {"class": "ZmyHeo"})
+            review_text = text_tag.get_text(strip=True).replace("READ MORE", "") if text_tag else ""
+
+            date_tag = c.find("p", {"class": "_2NsDsF", "style": False})
+            reviewdate = ""
+            if date_tag:
+                all_p = c.find_all("p", {"class": "_2NsDsF"})
+                if len(all_p) > 1:
+                    reviewdate = all_p[-1].get_text(strip=True)
+
+            if review_text:
+                rows.append(review_row(productid, mobilename, userid, review_text, rrating, reviewdate))
+        return rows
+
+    def review_details(self, html, product_name):
+        """Extract the reviews.py rows (with reviewer name and title) from one review page"""
+        soup = self._soup(html, "reviews")
+        rows = []
+        for review in soup.find_all("div", {"class": "cPHDOP"}):
+            name_tag = review.find("p", {"class": "_2sc7ZR"})
+            reviewer_name = name_tag.get_text(strip=True) if name_tag else "Anonymous"
+            rating_tag = review.find("div", {"class": "_3LWZlK"})
+            rating = rating_tag.get_text(strip=True) if rating_tag else None
+            title_tag = review.find("p", {"class": "_2-N8zT"})
+            review_title = title_tag.get_text(strip=True) if title_tag else ""
+            text_tag = review.find("div", {"class": "ZmyHeo"})
+            review_text = text_tag.get_text(strip=True).replace("READ MORE", "").strip() if text_tag else ""
+
+            if review_text:
+                rows.append({
+                    "ProductName": product_name, "ReviewerName": reviewer_name,
+                    "Rating": rating, "Title": review_title, "ReviewText": review_text
+                })
+        return rows
+
+# ---------------- SOUPSTRAINER BACKEND ----------------
+
+# Only these subtrees are turned into BeautifulSoup objects; everything
+# else on the page is tokenised and thrown away.
+STRAINERS = {
+    "listing": SoupStrainer("div", class_="tUxRFH"),
+    "product_links": SoupStrainer("div", class_="_75nlfW"),
+    "review_link": SoupStrainer("a", href=REVIEW_LINK_RE),
+    "product_details": SoupStrainer(class_=["VU-ZEz", "_1MR4o5", "Nx9bqj CxhGGd", "UkUFwK", "XQDdHH"]),
+    "reviews": SoupStrainer("div", class_="cPHDOP"),
+}
+
+class StrainerExtractor(Bs4Extractor):
+    """Same selectors as Bs4Extractor, but parses only the needed containers"""
+
+    name = "strainer"
+
+    def _soup(self, html, kind):
+        return BeautifulSoup(html, "lxml", parse_only=STRAINERS[kind])
+
+# ---------------- LXML / XPATH BACKEND ----------------
+
+def _cls(name):
+    """XPath predicate matching BeautifulSoup's class semantics"""
+    if " " in name:
+        return f"normalize-space(@class)='{name}'"
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+def _first(el, xpath):
+    found = el.xpath(xpath)
+    return found[0] if found else None
+
+def _text(el, strip=True):
+    """get_text(strip=True) / .text equivalent for an lxml element"""
+    parts = el.xpath(".//text()")
+    if strip:
+        return "".join(p.strip() for p in parts if p.strip())
+    return "".join(parts)
+
+class LxmlExtractor:
+    """XPath over a plain lxml tree; output matches Bs4Extractor row for row"""
+
+    name = "lxml"
+
+    def _tree(self, html):
+        try:
+            return lxml.html.fromstring(html)
+        except ParserError:
+            return None
+
+    def listing(self, html, scraped_at, base_url=BASE_URL):
+        tree = self._tree(html)
+        rows = []
+        for p in tree.xpath(f"//div[{_cls('tUxRFH')}]") if tree is not None else []:
+            title_tag = _first(p, f".//div[{_cls('KzDlHZ')}]")
+            mobilename = _text(title_tag) if title_tag is not None else "Unknown"
+
+            price_tag = _first(p, f".//div[{_cls('Nx9bqj _4b5DiR')}]")
+            sellingprice = clean_price(_text(price_tag, strip=False)) if price_tag is not None else None
+
+            mrp_tag = _first(p, f".//div[{_cls('yRaY8j')}]")
+            mrp = _text(mrp_tag).replace("₹","").replace(",","") if mrp_tag is not None else None
+
+            discount_tag = _first(p, f".//div[{_cls('UkUFwK')}]")
+            discountoffering = _text(discount_tag) if discount_tag is not None else None
+
+            rating_tag = _first(p, f".//div[{_cls('XQDdHH')}]")
+            rating = _text(rating_tag) if rating_tag is not None else None
+
+            href = _first(p, f".//a[{_cls('CGtC98')}]/@href")
+            url = urljoin(base_url, href) if href is not None else None
+
+            rows.append(listing_row(mobilename, sellingprice, mrp, discountoffering, rating, url, scraped_at))
+        return rows
+
+    def product_links(self, html, base_url=BASE_URL, strip_query=True):
+        tree = self._tree(html)
+        links = []
+        for product in tree.xpath(f"//div[{_cls('_75nlfW')}]") if tree is not None else []:
+            href = _first(product, f".//a[{_cls('CGtC98')}]/@href")
+            if href is not None:
+                raw_url = urljoin(base_url, href)
+                links.append(raw_url.split('?')[0] if strip_query else raw_url)
+        return links
+
+    def review_link(self, html, base_url=BASE_URL):
+        tree = self._tree(html)
+        href = _first(tree, "//a[contains(@href, '/product-reviews/')]/@href") if tree is not None else None
+        return urljoin(base_url, href) if href is not None else None
+
+    def product_details(self, html, url):
+        tree = self._tree(html)
+        if tree is None:
+            tree = lxml.html.fromstring("<html></html>")
+
+        name_tag = _first(tree, f"//span[{_cls('VU-ZEz')}]")
+        name = _text(name_tag, strip=False).strip() if name_tag is not None else None
+
+        container = _first(tree, f"//div[{_cls('_1MR4o5')}]")
+        category = None
+        if container is not None:
+            category = " > ".join(_text(a, strip=False).strip()
+                                  for a in container.xpath(f".//a[{_cls('_2whKao')}]"))
+
+        price = None
+        price_tag = _first(tree, f"//div[{_cls('Nx9bqj CxhGGd')}]")
+        if price_tag is not None:
+            try:
+                price = float(re.sub(r'[^\d.]', '', _text(price_tag, strip=False).strip()))
+            except ValueError:
+                pass
+
+        discount = None
+        discount_div = _first(tree, f"//div[{_cls('UkUFwK')}]")
+        span = _first(discount_div, ".//span") if discount_div is not None else None
+        if span is not None:
+            match = re.search(r'\d+', _text(span, strip=False).strip())
+            discount = int(match.group()) if match else None
+
+        rating = None
+        rating_tag = _first(tree, f"//div[{_cls('XQDdHH')}]")
+        if rating_tag is not None:
+            try:
+                rating = float(_text(rating_tag, strip=False).strip())
+            except ValueError:
+                pass
+
+        return {
+            "Product": name, "Category": category, "Price (₹)": price,
+            "Discount (%)": discount, "Rating": rating, "URL": url
+        }
+
+    def reviews(self, html, productid, mobilename):
+        tree = self._tree(html)
+        rows = []
+        for c in tree.xpath(f"//div[{_cls('cPHDOP')}]") if tree is not None else []:
+            user_tag = _first(c, f".//p[{_cls('_2NsDsF AwS1CA')}]")
+            userid = _text(user_tag) if user_tag is not None else "Anonymous"
+
+            rating_tag = _first(c, f".//div[{_cls('_3LWZlK')}]")
+            rrating = _text(rating_tag) if rating_tag is not None else None
+
+            text_tag = _first(c, f".//div[{_cls('ZmyHeo')}]")
+            review_text = _text(text_tag).replace("READ MORE", "") if text_tag is not None else ""
+
+            reviewdate = ""
+            if c.xpath(f".//p[{_cls('_2NsDsF')}][not(@style)]"):
+                all_p = c.xpath(f".//p[{_cls('_2NsDsF')}]")
+                if len(all_p) > 1:
+                    reviewdate = _text(all_p[-1])
+
+            if review_text:
+                rows.append(review_row(productid, mobilename, userid, review_text, rrating, reviewdate))
+        return rows
+
+    def review_details(self, html, product_name):
+        tree = self._tree(html)
+        rows = []
+        for review in tree.xpath(f"//div[{_cls('cPHDOP')}]") if tree is not None else []:
+            name_tag = _first(review, f".//p[{_cls('_2sc7ZR')}]")
+            reviewer_name = _text(name_tag) if name_tag is not None else "Anonymous"
+            rating_tag = _first(review, f".//div[{_cls('_3LWZlK')}]")
+            rating = _text(rating_tag) if rating_tag is not None else None
+            title_tag = _first(review, f".//p[{_cls('_2-N8zT')}]")
+            review_title = _text(title_tag) if title_tag is not None else ""
+            text_tag = _first(review, f".//div[{_cls('ZmyHeo')}]")
+            review_text = _text(text_tag).replace("READ MORE", "").strip() if text_tag is not None else ""
+
+            if review_text:
+                rows.append({
+                    "ProductName": product_name, "ReviewerName": reviewer_name,
+                    "Rating": rating, "Title": review_title, "ReviewText": review_text
+                })
+        return rows
+
+# ---------------- ROW BUILDERS ----------------
+
+def listing_row(mobilename, sellingprice, mrp, discountoffering, rating, url, scraped_at):
+    pid_match = re.search(r"/p/itm([0-9a-z]+)", url) if url else None
+    productid = pid_match.group(1) if pid_match else None
+    return {
+        "source": "flipkart",
+        "productid": productid,
+        "mobilename": mobilename,
+        "sellingprice": sellingprice,
+        "mrp": mrp,
+        "discountoffering": discountoffering,
+        "rating": rating,
+        "url": url,
+        "scraped_at": scraped_at
+    }
+
+def review_row(productid, mobilename, userid, review_text, rating, reviewdate):
+    return {
+        "source": "flipkart",
+        "productid": productid,
+        "mobilename": mobilename,
+        "userid": userid,
+        "review": review_text,
+        "rating": rating,
+        "reviewdate": reviewdate
+    }
+
+# ---------------- BACKEND REGISTRY ----------------
+
+BACKENDS = {cls.name: cls() for cls in (Bs4Extractor, StrainerExtractor, LxmlExtractor)}
+
+def get_extractor(backend=None):
+    """Return the extractor for backend (default: EXTRACTOR_BACKEND or 'lxml')"""
+    name = backend or DEFAULT_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extractor backend '{name}'. Choose from {sorted(BACKENDS)}")
+    return BACKENDS[name]
+
+def parse_listing(html, scraped_at, base_url=BASE_URL, backend=None):
+    return get_extractor(backend).listing(html, scraped_at, base_url)
+
+def parse_product_links(html, base_url=BASE_URL, strip_query=True, backend=None):
+    return get_extractor(backend).product_links(html, base_url, strip_query)
+
+def parse_review_link(html, base_url=BASE_URL, backend=None):
+    return get_extractor(backend).review_link(html, base_url)
+
+def parse_product_details(html, url, backend=None):
+    return get_extractor(backend).product_details(html, url)
+
+def parse_reviews(html, productid, mobilename, backend=None):
+    return get_extractor(backend).reviews(html, productid, mobilename)
+
+def parse_review_details(html, product_name, backend=None):
+    return get_extractor(backend).review_details(html, product_name)
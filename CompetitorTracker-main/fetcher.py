@@ -0,0 +1,143 @@
+#fetcher.py
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+import aiohttp
+
+from rate_limiter import AdaptiveRateLimiter
+
+# ---------------- CONFIG ----------------
+PER_HOST_CONCURRENCY = 4   # parallel connections per host
+TOTAL_CONCURRENCY = 16     # parallel connections overall
+REQUEST_TIMEOUT = 20       # seconds per request
+RETRIES = 2                # extra attempts on network errors / 5xx
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"),
+    "Accept-Language": "en-IN,en;q=0.9",
+}
+
+# ---------------- SELENIUM FALLBACK ----------------
+
+class SeleniumFallback:
+    """Loads pages that need JS through a single headless Chrome.
+
+    The driver is started lazily and only ever touched from one worker
+    thread, so async callers can share it safely.
+    """
+
+    def __init__(self, limiter=None):
+        self.driver = None
+        self.limiter = limiter
+        self.executor = ThreadPoolExecutor(max_workers=1)
+
+    def _load(self, url, wait_class):
+        from browser import make_driver, load_page
+        if self.driver is None:
+            self.driver = make_driver(cache_name="fallback")
+        return load_page(self.driver, url, wait_class, limiter=self.limiter)
+
+    async def get(self, url, wait_class=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._load, url, wait_class)
+
+    def close(self):
+        if self.driver is not None:
+            self.executor.submit(self.driver.quit).result()
+            self.driver = None
+        self.executor.shutdown(wait=True)
+
+# ---------------- ASYNC FETCHER ----------------
+
+class Fetcher:
+    """Concurrent aiohttp page fetcher with a per-host connection cap.
+
+    Use as ``async with Fetcher() as f: html = await f.get(url, marker)``.
+    When ``marker`` (a CSS class the page must contain) is missing from the
+    plain HTTP response, the page is re-loaded through Selenium if a
+    fallback is enabled.
+
+    Requests are paced by an AdaptiveRateLimiter; ``per_host`` is the hard
+    connection cap the limiter's AIMD window can grow into. With an
+    ``archive`` (page_archive.PageArchive) every page handed back is stored.
+    """
+
+    def __init__(self, per_host=PER_HOST_CONCURRENCY, total=TOTAL_CONCURRENCY,
+                 timeout=REQUEST_TIMEOUT, retries=RETRIES, selenium_fallback=True,
+                 limiter=None, archive=None):
+        self.per_host = per_host
+        self.total = total
+        self.timeout = timeout
+        self.retries = retries
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.fallback = SeleniumFallback(self.limiter) if selenium_fallback else None
+        self.archive = archive
+        self.session = None
+        self.stats = {"requests": 0, "errors": 0, "fallbacks": 0, "bytes": 0}
+        self.started = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit=self.total, limit_per_host=self.per_host)
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+        )
+        self.started = time.perf_counter()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        if self.fallback is not None:
+            self.fallback.close()
+
+    async def fetch(self, url):
+        """Plain HTTP GET; returns (status, html) or (None, None) after all retries fail"""
+        for attempt in range(self.retries + 1):
+            start = await self.limiter.wait_async(url)
+            status = None
+            try:
+                async with self.session.get(url) as resp:
+                    # undecodable bytes become U+FFFD instead of failing the whole crawl
+                    html = await resp.text(errors="replace")
+                    status = resp.status   # only once the body is in: failures report None
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.stats["errors"] += 1
+                continue
+            finally:
+                # always hand the host slot back, whatever the request raised
+                self.limiter.done(url, status, time.monotonic() - start)
+            self.stats["requests"] += 1
+            self.stats["bytes"] += len(html)
+            if (status == 429 or status >= 500) and attempt < self.retries:
+                continue
+            return status, html
+        return None, None
+
+    async def get(self, url, marker=None):
+        """Fetch url, falling back to Selenium when the response is unusable"""
+        html = await self._get(url, marker)
+        if html is not None and self.archive is not None:
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(None, self.archive.put, url, html)
+        return html
+
+    async def _get(self, url, marker):
+        status, html = await self.fetch(url)
+        ok = status == 200 and (marker is None or marker in html)
+        if ok:
+            return html
+        if self.fallback is None:
+            return html if status == 200 else None
+        self.stats["fallbacks"] += 1
+        return await self.fallback.get(url, marker)
+
+    def pages_per_sec(self):
+        elapsed = time.perf_counter() - self.started
+        return self.stats["requests"] / elapsed if elapsed else 0.0
+
+async def fetch_many(fetcher, urls, marker=None):
+    """Fetch a batch of URLs concurrently; returns {url: html or None}"""
+    pages = await asyncio.gather(*(fetcher.get(u, marker) for u in urls))
+    return dict(zip(urls, pages))
@@ -0,0 +1,216 @@
+#fixture_server.py
+# Local Flipkart look-alike used to benchmark the crawlers offline.
+# Pages use the same CSS classes as the live site, so every parser in
+# extractors.py works against it unchanged.
+
+import re
+import sys
+import time
+import random
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+# ---------------- CONFIG ----------------
+PRODUCTS_PER_PAGE = 24
+REVIEWS_PER_PAGE = 10
+LATENCY = 0.05            # seconds of simulated server time per request
+BRANDS = ["Samsung", "Apple", "realme", "vivo", "OPPO", "MOTOROLA", "Google"]
+# sub-resources a real page drags in; only a browser ever requests them
+ASSETS = {
+    "/static/site.css": ("text/css", 60_000),
+    "/static/font.woff2": ("font/woff2", 80_000),
+    "/static/app.js": ("application/javascript", 40_000),
+    "/static/track.js": ("application/javascript", 20_000),
+}
+IMAGE_BYTES = 45_000
+GALLERY_IMAGES = 8        # images per product page
+
+# ---------------- PAGE RENDERING ----------------
+
+def _page_chrome():
+    """Header, mega-menu, footer and inline state blob around every page.
+
+    Live pages are mostly this kind of markup, so it is what restricted
+    parsers get to skip.
+    """
+    menu = "".join(f'<li class="_1wE2Px"><a class="_1BJVlg" href="/c/{i}">Category {i}</a>'
+                   f'<div class="_3sdu8W"><span>Sub {i}</span></div></li>' for i in range(400))
+    footer = "".join(f'<div class="_1ZMrY_"><a href="/help/{i}">Help topic {i}</a></div>' for i in range(150))
+    state = "window.__INITIAL_STATE__ = " + "{" + ",".join(f'"k{i}": "{"x" * 40}"' for i in range(1500)) + "};"
+    header = f'<header class="_3NH1qf"><nav><ul>{menu}</ul></nav></header>'
+    return header, f'<footer class="_1Fj5_U">{footer}</footer><script>{state}</script>'
+
+HEADER, FOOTER = _page_chrome()
+
+HEAD = ('<title>Flipkart</title><link rel="stylesheet" href="/static/site.css">'
+        '<script src="/static/app.js"></script><script async src="/static/track.js"></script>')
+
+def wrap(body):
+    return f"<html><head>{HEAD}</head><body>{HEADER}{body}{FOOTER}</body></html>"
+
+def asset_body(path):
+    """Filler bytes of the right size for a static asset or image path"""
+    if path == "/static/site.css":
+        rule = "@font-face{font-family:F;src:url(/static/font.woff2)}"
+        return (rule + "/*" + "x" * (ASSETS[path][1] - len(rule) - 4) + "*/").encode()
+    if path.endswith(".js"):
+        return ("//" + "x" * (ASSETS[path][1] - 2)).encode()
+    size = ASSETS[path][1] if path in ASSETS else IMAGE_BYTES
+    return bytes(size)
+
+def product_id(page, idx):
+    return f"{page:03d}{idx:03d}abc"
+
+def product_info(pid):
+    rnd = random.Random(pid)
+    brand = rnd.choice(BRANDS)
+    price = rnd.randrange(7000, 90000, 100)
+    discount = rnd.randint(0, 40)
+    return {
+        "name": f"{brand} Model {pid[:6]} (Black, 128 GB)",
+        "slug": f"{brand.lower()}-model-{pid[:6]}",
+        "price": price,
+        "mrp": int(price * 100 / (100 - discount)) if discount else price,
+        "discount": discount,
+        "rating": round(rnd.uniform(3.5, 4.8), 1),
+        "review_pages": rnd.randint(1, 4),
+    }
+
+def render_listing(page):
+    cards = []
+    for idx in range(PRODUCTS_PER_PAGE):
+        pid = product_id(page, idx)
+        info = product_info(pid)
+        cards.append(f"""
+<div class="_75nlfW"><div class="tUxRFH">
+  <a class="CGtC98" href="/{info['slug']}/p/itm{pid}?pid=MOB{pid.upper()}&lid=LST">
+    <img src="/img/{pid}-0.jpg" alt="">
+    <div class="KzDlHZ">{info['name']}</div>
+    <div class="XQDdHH">{info['rating']}</div>
+    <div class="Nx9bqj _4b5DiR">₹{info['price']:,}</div>
+    <div class="yRaY8j">₹{info['mrp']:,}</div>
+    <div class="UkUFwK"><span>{info['discount']}% off</span></div>
+  </a>
+</div></div>""")
+    return wrap(f"<div id='container'>{''.join(cards)}</div>")
+
+def render_product(pid):
+    info = product_info(pid)
+    return wrap(f"""
+<div class="_1MR4o5"><a class="_2whKao" href="/">Home</a><a class="_2whKao" href="/mobiles">Mobiles</a>
+<a class="_2whKao" href="/mobiles/{info['slug']}">{info['name'].split()[0]} Mobiles</a></div>
+<div class="_gallery">{''.join(f'<img src="/img/{pid}-{i}.jpg" alt="">' for i in range(GALLERY_IMAGES))}</div>
+<h1><span class="VU-ZEz">{info['name']}</span></h1>
+<div class="Nx9bqj CxhGGd">₹{info['price']:,}</div>
+<div class="UkUFwK"><span>{info['discount']}% off</span></div>
+<div class="XQDdHH">{info['rating']}</div>
+<a href="/{info['slug']}/product-reviews/itm{pid}?pid=MOB{pid.upper()}&lid=LST">All reviews</a>
+""")
+
+def render_reviews(pid, page):
+    info = product_info(pid)
+    if page > info["review_pages"]:
+        return wrap("<div>No reviews</div>")
+    rnd = random.Random(f"{pid}-{page}")
+    blocks = []
+    for idx in range(REVIEWS_PER_PAGE):
+        days = (page - 1) * REVIEWS_PER_PAGE + idx + 1
+        user = rnd.randint(1, 99999)
+        blocks.append(f"""
+<div class="cPHDOP"><div class="col">
+  <div class="_3LWZlK">{rnd.randint(1, 5)}</div>
+  <p class="_2-N8zT">Review title {idx}</p>
+  <div class="ZmyHeo"><div>Review {pid}-{page}-{idx}: battery {rnd.choice(['great', 'ok', 'poor'])}, camera {rnd.choice(['sharp', 'average', 'blurry'])}.</div><span>READ MORE</span></div>
+  <p class="_2NsDsF AwS1CA">User{user}</p><p class="_2sc7ZR">User{user}</p>
+  <p class="_2NsDsF">{days} days ago</p>
+</div></div>""")
+    return wrap("".join(blocks))
+
+# ---------------- HTTP SERVER ----------------
+
+PRODUCT_RE = re.compile(r"/[^/]+/p/itm([0-9a-z]+)$")
+REVIEWS_RE = re.compile(r"/[^/]+/product-reviews/itm([0-9a-z]+)$")
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    latency = LATENCY
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        page = int(query.get("page", ["1"])[0])
+
+        if parsed.path in ASSETS or parsed.path.startswith("/img/"):
+            content_type = ASSETS[parsed.path][0] if parsed.path in ASSETS else "image/jpeg"
+            self._send(asset_body(parsed.path), content_type, cache=True)
+            return
+        if parsed.path == "/search":
+            body = render_listing(page)
+        elif PRODUCT_RE.match(parsed.path):
+            body = render_product(PRODUCT_RE.match(parsed.path).group(1))
+        elif REVIEWS_RE.match(parsed.path):
+            body = render_reviews(REVIEWS_RE.match(parsed.path).group(1), page)
+        else:
+            self.send_error(404)
+            return
+
+        self._send(body.encode("utf-8"), "text/html; charset=utf-8")
+
+    def _send(self, data, content_type, cache=False):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        if cache:
+            self.send_header("Cache-Control", "public, max-age=86400")
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+def start_fixture_server(port=0, latency=LATENCY):
+    """Serve the fixture site from a daemon thread; returns (server, base_url)"""
+    handler = type("Handler", (FixtureHandler,), {"latency": latency})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+# ---------------- BENCHMARK ----------------
+
+def benchmark(listing_pages=3, review_pages=2, concurrency=(1, 4, 8, 16), latency=LATENCY):
+    """Crawl the fixture site at several per-host limits and print throughput"""
+    import pr
+    from sqlalchemy import create_engine
+    from crawl_frontier import CrawlFrontier
+    from rate_limiter import AdaptiveRateLimiter
+
+    server, base_url = start_fixture_server(latency=latency)
+    print(f"🧪 Fixture site at {base_url} ({latency * 1000:.0f} ms latency)")
+    try:
+        for n in concurrency:
+            frontier = CrawlFrontier("bench", engine=create_engine("sqlite://"))
+            start = time.perf_counter()
+            stats = asyncio.run(pr.crawl(
+                frontier, base_url=base_url, listing_pages=listing_pages, review_pages=review_pages,
+                per_host=n, selenium_fallback=False,
+                limiter=AdaptiveRateLimiter(rate=50, concurrency=n, max_rate=10000)))
+            elapsed = time.perf_counter() - start
+            print(f"per_host={n:<3} {stats['requests']} pages in {elapsed:.2f}s "
+                  f"→ {stats['requests'] / elapsed:.1f} pages/sec "
+                  f"({frontier.row_count('mobile')} products, {frontier.row_count('review')} reviews)")
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "serve":
+        server, base_url = start_fixture_server(port=int(sys.argv[2]) if len(sys.argv) > 2 else 8000)
+        print(f"Serving fixture site at {base_url} (Ctrl+C to stop)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+    else:
+        benchmark()
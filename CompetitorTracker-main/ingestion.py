@@ -1,24 +1,38 @@
 #ingestion.py 
 
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 import re
 import os
+import io
 from textblob import TextBlob  # for sentiment analysis
+import argparse
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+import schema
+import snapshot_store
+from key_index import KeyIndex
 
 # ---------------- CONFIG ----------------
 REVIEWS_FILE = "review.csv"   # cleaned review input
-MOBILE_FILE = "mobile.csv"    # scraped mobile data input
+MOBILE_FILE = "mobile.csv"    # legacy scraped mobile data, imported into the snapshot store once
 OUTPUT_REVIEWS = "cleaned_reviews.csv"
 OUTPUT_MOBILE = "cleaned_mobile.csv"
+CHUNK_SIZE = 100_000          # rows per chunk in streaming mode
+WORKERS = os.cpu_count() or 1 # processes for --workers without a number
+CHUNKS_PER_WORKER = 4         # parallel mode: smaller chunks even out the load
+EMOJI_RE = re.compile(r'[^A-Za-z0-9.,!?;:\'"()\-\s]')
+MOBILE_KEY = ['productid', 'scraped_at']
+REVIEW_KEY = ['productid', 'userid', 'review']
 os.makedirs("data", exist_ok=True)
 
 # ---------------- FUNCTIONS ----------------
 
-def parse_relative_date(text):
+def parse_relative_date(text, now=None):
     """Convert relative dates like '22 days ago' to absolute date safely"""
     text = str(text).strip().lower()
-    now = datetime.now()
+    now = now or datetime.now()
 
     try:
         if "day" in text:
@@ -47,59 +61,440 @@ def parse_relative_date(text):
     except Exception:
         return None
 
+def parse_relative_dates(values, now=None):
+    """parse_relative_date over a whole Series, with one reference time.
+
+    Each distinct string is parsed once (review dates repeat a lot), the
+    "N days / months / years ago" forms with array arithmetic; only the
+    remaining absolute dates go through pd.to_datetime one by one.
+    """
+    now = now or datetime.now()
+    codes, uniques = pd.factorize(pd.Series(values), use_na_sentinel=True)
+    text = pd.Series(uniques, dtype=object).astype(str).str.strip().str.lower()
+    n = pd.to_numeric(text.str.extract(r"(\d+)", expand=False), errors="coerce").fillna(0)
+    n = n.to_numpy(dtype=float)
+    is_day = text.str.contains("day", regex=False).to_numpy()
+    is_month = ~is_day & text.str.contains("month", regex=False).to_numpy()
+    is_year = ~is_day & ~is_month & text.str.contains("year", regex=False).to_numpy()
+    other = ~(is_day | is_month | is_year)
+    result = np.full(len(text), None, dtype=object)
+
+    today = now.date()
+    ok = is_day & (n <= (today - date(1, 1, 1)).days)
+    days = (np.datetime64(today, "D") - n[ok].astype("timedelta64[D]"))
+    result[ok] = days.astype(object)
+
+    # same month arithmetic as parse_relative_date: borrow at most one year
+    month = now.month - n
+    year = np.where(month <= 0, now.year - 1, now.year)
+    month = np.where(month <= 0, month + 12, month)
+    ok = is_month & (month >= 1)
+    day = min(now.day, 28)
+    result[ok] = [date(int(y), int(m), day) for y, m in zip(year[ok], month[ok])]
+
+    year = now.year - n
+    leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    ok = is_year & (year >= 1) & (leap | ((now.month, now.day) != (2, 29)))
+    result[ok] = [date(int(y), now.month, now.day) for y in year[ok]]
+
+    result[other] = [parse_relative_date(t, now) for t in text[other]]
+    out = result[codes]
+    out[codes == -1] = None   # NaN / None parse to None
+    return pd.Series(out, index=values.index if isinstance(values, pd.Series) else None,
+                     dtype=object)
+
 def remove_emojis(text):
     """Remove emojis, symbols, and non-text characters from review"""
     if not isinstance(text, str):
         return text
-    return re.sub(r'[^A-Za-z0-9.,!?;:\'"()\-\s]', '', text)
+    return EMOJI_RE.sub('', text)
 
 # ---------------- CLEANING FUNCTIONS ----------------
 
-def clean_reviews(df):
-    """Clean review DataFrame"""
-    df['mobilename'] = df['mobilename'].astype(str).str.strip()
+def clean_reviews(df, dedupe=True, now=None):
+    """Clean review DataFrame (relative dates are resolved against now)"""
+    df['mobilename'] = schema.map_text(df['mobilename'], lambda v: v.str.strip())
     df['userid'] = df['userid'].astype(str).str.strip()
     df['review'] = df['review'].astype(str).str.strip()
     df['review'] = df['review'].apply(remove_emojis)
-    df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
-    df['reviewdate'] = df['reviewdate'].apply(parse_relative_date)
+    df['rating'] = pd.to_numeric(df['rating'], errors='coerce').astype(float)
+    df['reviewdate'] = parse_relative_dates(df['reviewdate'], now)
     df = df[df['review'].str.len() > 0]
-    df = df.drop_duplicates(subset=['productid', 'userid', 'review'])
+    if dedupe:
+        df = df.drop_duplicates(subset=REVIEW_KEY)
     return df
 
-def clean_mobile(df):
+def clean_mobile(df, dedupe=True):
     """Clean mobile/product DataFrame"""
-    df['mobilename'] = df['mobilename'].astype(str).str.strip()
-    df['source'] = df['source'].astype(str).str.strip()
+    df['mobilename'] = schema.map_text(df['mobilename'], lambda v: v.str.strip())
+    df['source'] = schema.map_text(df['source'], lambda v: v.str.strip())
     df['sellingprice'] = pd.to_numeric(df['sellingprice'], errors='coerce')
     df['discountoffering'] = df['discountoffering'].astype(str).str.replace('% off','',regex=False).str.strip()
-    df['discountoffering'] = pd.to_numeric(df['discountoffering'], errors='coerce')
-    df['rating'] = pd.to_numeric(df['rating'], errors='coerce')
+    df['discountoffering'] = pd.to_numeric(df['discountoffering'], errors='coerce').astype(float)
+    df['rating'] = pd.to_numeric(df['rating'], errors='coerce').astype(float)
     # Ensure scraped_at is datetime
     df['scraped_at'] = pd.to_datetime(df['scraped_at'], errors='coerce')
-    df = df.drop_duplicates(subset=['productid', 'scraped_at'], keep='last')
+    if dedupe:
+        df = df.drop_duplicates(subset=MOBILE_KEY, keep='last')
     return df
 
+# ---------------- PARALLEL ----------------
+# Each worker reads its own part of the input (a group of snapshot files, a
+# byte range of review.csv) and sends back only the cleaned rows; the parent
+# never loads or pickles the raw data. Every row is cleaned on its own, so the
+# global dedupe can run once over the merged result, which is what the serial
+# path returns.
+
+SCAN_BLOCK = 16 * 2**20       # bytes of review.csv scanned at a time for record boundaries
+
+def _clean_mobile_files(paths):
+    df = snapshot_store.read_files("mobile", paths)
+    return len(df), clean_mobile(df, dedupe=False)
+
+def _clean_review_range(path, start, end, columns, valid_product_ids, now):
+    with open(path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    df = pd.read_csv(io.BytesIO(data), header=None, names=columns,
+                     dtype=schema.dtypes(columns, text=False), encoding="utf-8")
+    rows = len(df)
+    if valid_product_ids:
+        df = df[df['productid'].isin(valid_product_ids)]
+    return rows, clean_reviews(df, dedupe=False, now=now)
+
+def csv_ranges(path, parts):
+    """(start, end) byte ranges covering path's data rows in about parts pieces.
+
+    Cuts fall on record boundaries: a newline outside double quotes, so
+    quoted review text spanning lines stays in one piece.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.readline()   # header
+        first = f.tell()
+        targets = list(np.linspace(first, size, parts + 1)[1:-1].astype(np.int64))
+        cuts, quoted, pos = [first], 0, first
+        while targets:
+            block = np.frombuffer(f.read(SCAN_BLOCK), dtype=np.uint8)
+            if not len(block):
+                break
+            # quote parity after each byte (uint8 wraps, parity survives)
+            inside = (np.cumsum(block == ord('"'), dtype=np.uint8) + quoted) & 1
+            ends = np.flatnonzero((block == ord("\n")) & (inside == 0)) + pos + 1
+            while targets:
+                i = np.searchsorted(ends, targets[0])
+                if i == len(ends):
+                    break
+                if cuts[-1] < ends[i] < size:
+                    cuts.append(int(ends[i]))
+                targets.pop(0)
+            quoted = int(inside[-1])
+            pos += len(block)
+    cuts.append(size)
+    return [(a, b) for a, b in zip(cuts[:-1], cuts[1:]) if b > a]
+
+def parallel_mobile(workers=WORKERS):
+    """clean_mobile over the snapshot store in a process pool; returns (rows in, cleaned DataFrame)"""
+    paths = snapshot_store.read_order("mobile")
+    if not paths:   # empty store
+        return 0, clean_mobile(snapshot_store.read_files("mobile", []))
+    folder = os.path.join(snapshot_store.STORE_DIR, "mobile")
+    sizes = np.cumsum([os.path.getsize(os.path.join(folder, p)) for p in paths])
+    n = max(1, min(workers * CHUNKS_PER_WORKER, len(paths)))
+    cuts = np.searchsorted(sizes, np.linspace(0, sizes[-1], n + 1)[1:-1], side="right")
+    groups = [g.tolist() for g in np.split(np.array(paths, dtype=object), cuts) if len(g)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_clean_mobile_files, groups))
+    cleaned = pd.concat([df for _, df in results])
+    return sum(rows for rows, _ in results), cleaned.drop_duplicates(subset=MOBILE_KEY, keep='last')
+
+def parallel_reviews(valid_product_ids, workers=WORKERS):
+    """Filter and clean review.csv in a process pool; returns (rows in, cleaned DataFrame)"""
+    now = datetime.now()   # one reference time for every range
+    columns = list(pd.read_csv(REVIEWS_FILE, nrows=0, encoding="utf-8-sig").columns)
+    ranges = csv_ranges(REVIEWS_FILE, workers * CHUNKS_PER_WORKER)
+    if not ranges:   # header only; zip(*[]) would leave pool.map only the endless repeats
+        return 0, clean_reviews(pd.read_csv(REVIEWS_FILE, nrows=0, encoding="utf-8-sig",
+                                            dtype=schema.dtypes(columns, text=False)), now=now)
+    starts, ends = zip(*ranges)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_clean_review_range, repeat(REVIEWS_FILE), starts, ends,
+                                repeat(columns), repeat(valid_product_ids), repeat(now)))
+    cleaned = pd.concat([df for _, df in results])
+    return sum(rows for rows, _ in results), cleaned.drop_duplicates(subset=REVIEW_KEY)
+
+# ---------------- STREAMING ----------------
+
+class ChunkedCsvWriter:
+    """Writes a CSV one DataFrame at a time; the file appears under its name on close()"""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self.started = False
+
+    def write(self, df):
+        if not self.started:
+            df.to_csv(self.path + ".tmp", index=False, encoding="utf-8-sig")
+            self.started = True
+        else:
+            df.to_csv(self.path + ".tmp", mode="a", header=False, index=False, encoding="utf-8")
+        self.rows += len(df)
+
+    def close(self):
+        if self.started:
+            os.replace(self.path + ".tmp", self.path)
+
+def stream_mobile(index, chunksize=CHUNK_SIZE):
+    """Clean the mobile snapshots chunk by chunk; returns (rows in, rows out, product ids)"""
+    # pass 1: where each (productid, scraped_at) occurs last, so keep='last' holds across chunks
+    index.clear()
+    total = 0
+    for chunk in snapshot_store.iter_batches("mobile", chunksize):
+        chunk = clean_mobile(chunk, dedupe=False)
+        index.set_last(chunk, MOBILE_KEY, np.arange(total, total + len(chunk)))
+        total += len(chunk)
+    # pass 2: write the winners
+    writer = ChunkedCsvWriter(os.path.join("data", OUTPUT_MOBILE))
+    product_ids, pos = set(), 0
+    for chunk in snapshot_store.iter_batches("mobile", chunksize):
+        chunk = clean_mobile(chunk, dedupe=False)
+        keep = index.is_last(chunk, MOBILE_KEY, np.arange(pos, pos + len(chunk)))
+        pos += len(chunk)
+        chunk = chunk[keep]
+        product_ids.update(chunk['productid'].dropna().unique())
+        writer.write(chunk)
+    writer.close()
+    return total, writer.rows, product_ids
+
+def stream_reviews(index, valid_product_ids, chunksize=CHUNK_SIZE):
+    """Filter, clean and dedupe review.csv chunk by chunk; returns (rows in, rows out)"""
+    index.clear()
+    writer = ChunkedCsvWriter(os.path.join("data", OUTPUT_REVIEWS))
+    total = 0
+    for chunk in schema.read_csv(REVIEWS_FILE, text=False, chunksize=chunksize):
+        total += len(chunk)
+        if valid_product_ids:
+            chunk = chunk[chunk['productid'].isin(valid_product_ids)]
+        chunk = clean_reviews(chunk, dedupe=False)
+        writer.write(chunk[index.add_new(chunk, REVIEW_KEY)])
+    writer.close()
+    return total, writer.rows
+
+# ---------------- INCREMENTAL ----------------
+# The outputs are only ever appended to. Each index keeps its watermark and
+# the size (plus last bytes) of its output next to the keys, committed in
+# one transaction: a run that died half way is resumed by cutting the output
+# back to the recorded size, and outputs rewritten by a full run are noticed
+# and rebuilt.
+
+TAIL_BYTES = 1024
+
+def _tail(path, size):
+    """Last TAIL_BYTES before size, as stored in the state (hex)"""
+    with open(path, "rb") as f:
+        f.seek(max(size - TAIL_BYTES, 0))
+        return f.read(min(size, TAIL_BYTES)).hex()
+
+def _unchanged(path, size, tail):
+    """path still starts with the size bytes we saw, as far as its tail tells"""
+    if not size:
+        return True
+    return (os.path.exists(path) and os.path.getsize(path) >= size
+            and _tail(path, size) == tail)
+
+def _new_state(**extra):
+    return {"output_bytes": 0, "output_tail": "", **extra}
+
+def _resume_output(index, path, fresh):
+    """The committed state, with path cut back to its committed size.
+
+    If path was replaced since, the index is cleared and fresh is returned.
+    """
+    state = index.get("state") or fresh
+    if not _unchanged(path, state["output_bytes"], state["output_tail"]):
+        print(f"⚠ {path} changed outside incremental ingestion, rebuilding it")
+        index.clear()
+        state = fresh
+    if state["output_bytes"] == 0:
+        open(path, "w").close()
+    else:
+        with open(path, "r+b") as f:
+            f.truncate(state["output_bytes"])
+    return state
+
+def _append_csv(df, path):
+    if os.path.getsize(path) == 0:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    else:
+        df.to_csv(path, mode="a", header=False, index=False, encoding="utf-8")
+
+def _commit(index, path, state):
+    size = os.path.getsize(path)
+    state.update(output_bytes=size, output_tail=_tail(path, size))
+    index.put("state", state)
+    index.commit()
+
+def _mobile_state(index, out, products):
+    """Committed mobile state; a state from before name watermarks is converted"""
+    state = _resume_output(index, out, _new_state(watermark=""))
+    if "files" in state:
+        state["watermark"] = max((os.path.basename(p) for p in state.pop("files")), default="")
+        products.add_new(pd.DataFrame({"productid": state.pop("products")}), ["productid"],
+                         commit=False)
+        _commit(index, out, state)
+    if not state["watermark"]:
+        products.clear()
+    return state
+
+def ingest_new_mobile(index, products, chunksize=CHUNK_SIZE):
+    """Clean snapshot files written since the last run and append them; returns (rows in, rows out).
+
+    The watermark is the name of the newest file ingested (names sort in
+    write order, and snapshot_store.compact keeps them). Within a run the
+    last snapshot of a (productid, scraped_at) wins, as in a full run; a key
+    already written by an earlier run is not written again. Product ids
+    written are added to products, a KeyIndex sharing index's connection so
+    they commit with the state.
+    """
+    out = os.path.join("data", OUTPUT_MOBILE)
+    state = _mobile_state(index, out, products)
+    new_files = snapshot_store.files("mobile", after=state["watermark"] or None)
+    # same two passes as stream_mobile, over the new files only
+    last = KeyIndex(index.name + "_run")
+    last.clear()
+    total = 0
+    for path in new_files:
+        for chunk in snapshot_store.iter_file("mobile", path, chunksize):
+            chunk = clean_mobile(chunk, dedupe=False)
+            last.set_last(chunk, MOBILE_KEY, np.arange(total, total + len(chunk)))
+            total += len(chunk)
+    pos = written = 0
+    for path in new_files:
+        for chunk in snapshot_store.iter_file("mobile", path, chunksize):
+            chunk = clean_mobile(chunk, dedupe=False)
+            keep = last.is_last(chunk, MOBILE_KEY, np.arange(pos, pos + len(chunk)))
+            pos += len(chunk)
+            chunk = chunk[keep]
+            chunk = chunk[index.add_new(chunk, MOBILE_KEY, commit=False)]
+            products.add_new(chunk[chunk['productid'].notna()], ['productid'], commit=False)
+            _append_csv(chunk, out)
+            written += len(chunk)
+        state["watermark"] = max(state["watermark"], os.path.basename(path))
+        _commit(index, out, state)
+    last.clear()
+    last.close()
+    return total, written
+
+def ingest_new_reviews(index, products=None, chunksize=CHUNK_SIZE):
+    """Clean the rows appended to review.csv since the last run; returns (rows in, rows out).
+
+    The watermark is a byte offset into review.csv. If the bytes before it
+    changed, the file was rewritten (e.g. by a full crawl) and is read again
+    from the start; the key index keeps reviews seen before from repeating.
+    Reviews are filtered by the product ids in products (a KeyIndex filled
+    by ingest_new_mobile) when they are ingested.
+    """
+    out = os.path.join("data", OUTPUT_REVIEWS)
+    state = _resume_output(index, out, _new_state(offset=0, tail=""))
+    if not _unchanged(REVIEWS_FILE, state["offset"], state["tail"]):
+        print(f"⚠ {REVIEWS_FILE} was rewritten, reading it from the start")
+        state["offset"] = 0
+    filter_products = products is not None and len(products) > 0
+    total = written = 0
+    with open(REVIEWS_FILE, "rb") as f:
+        columns = pd.read_csv(f, nrows=0, encoding="utf-8-sig").columns
+        f.seek(0)
+        f.readline()
+        f.seek(max(state["offset"], f.tell()))
+        new_rows = f.tell() < os.path.getsize(REVIEWS_FILE)
+        for chunk in (pd.read_csv(f, header=None, names=columns, chunksize=chunksize,
+                                  dtype=schema.dtypes(columns, text=False), encoding="utf-8")
+                      if new_rows else []):
+            total += len(chunk)
+            if filter_products:
+                chunk = chunk[chunk['productid'].notna().to_numpy()
+                              & products.contains(chunk, ['productid'])]
+            chunk = clean_reviews(chunk, dedupe=False)
+            chunk = chunk[index.add_new(chunk, REVIEW_KEY, commit=False)]
+            _append_csv(chunk, out)
+            written += len(chunk)
+            _commit(index, out, state)
+        offset = f.tell()
+    state.update(offset=offset, tail=_tail(REVIEWS_FILE, offset))
+    _commit(index, out, state)
+    return total, written
+
+def incremental_main(chunksize=CHUNK_SIZE):
+    mobile_index = KeyIndex("incremental_mobile")
+    products = KeyIndex("incremental_products", share=mobile_index)
+    if snapshot_store.has_data("mobile"):
+        rows_in, rows_out = ingest_new_mobile(mobile_index, products, chunksize)
+        print(f"Cleaned mobile data: {rows_out} new of {rows_in} rows since the last run")
+        print(f"✅ Cleaned mobile data appended: data/{OUTPUT_MOBILE}")
+    else:
+        print(f"No mobile snapshots in {snapshot_store.STORE_DIR}")
+
+    if os.path.exists(REVIEWS_FILE):
+        index = KeyIndex("incremental_reviews")
+        rows_in, rows_out = ingest_new_reviews(index, products, chunksize)
+        index.close()
+        print(f"Cleaned reviews: {rows_out} new of {rows_in} rows since the last run")
+        print(f"✅ Cleaned reviews appended: data/{OUTPUT_REVIEWS}")
+    else:
+        print(f"Reviews file not found: {REVIEWS_FILE}")
+    mobile_index.close()
+
 # ---------------- MAIN ----------------
 
-def main():
+def main(stream=False, incremental=False, chunksize=CHUNK_SIZE, workers=1):
+    """Clean mobile and review data into data/.
+
+    With stream, inputs are read chunksize rows at a time and duplicates are
+    tracked in an on-disk key index (key_index.py), so memory use depends on
+    the chunk size rather than the size of the history. Output is the same.
+
+    With incremental, only snapshot files and review.csv rows added since the
+    last incremental run are cleaned and appended to the outputs, so a run
+    costs what was scraped since, not the whole history.
+
+    With workers > 1, reading and cleaning run in that many processes
+    (parallel_mobile / parallel_reviews); the output is the same as with one.
+    Only the in-memory mode runs in parallel.
+    """
+    if workers > 1 and (stream or incremental):
+        raise ValueError("workers > 1 is only supported without stream / incremental")
+    snapshot_store.import_csv("mobile", MOBILE_FILE)
+    if incremental:
+        return incremental_main(chunksize)
+    if stream:
+        return stream_main(chunksize)
     valid_product_ids = set()
 
     # -------- Load and Clean Mobile Data --------
-    if os.path.exists(MOBILE_FILE):
-        df_mobile = pd.read_csv(MOBILE_FILE)
-        print(f"Raw mobile data: {len(df_mobile)} rows")
-        df_mobile_clean = clean_mobile(df_mobile)
+    if snapshot_store.has_data("mobile"):
+        if workers > 1:
+            rows_in, df_mobile_clean = parallel_mobile(workers)
+        else:
+            df_mobile = snapshot_store.read("mobile")
+            rows_in, df_mobile_clean = len(df_mobile), clean_mobile(df_mobile)
+        print(f"Raw mobile data: {rows_in} rows")
         valid_product_ids = set(df_mobile_clean['productid'].dropna().unique())
         print(f"Cleaned mobile data: {len(df_mobile_clean)} rows")
         df_mobile_clean.to_csv(os.path.join("data", OUTPUT_MOBILE), index=False, encoding="utf-8-sig")
         print(f"✅ Cleaned mobile data saved: data/{OUTPUT_MOBILE}")
     else:
-        print(f"Mobile file not found: {MOBILE_FILE}")
+        print(f"No mobile snapshots in {snapshot_store.STORE_DIR}")
 
     # -------- Load and Clean Reviews --------
-    if os.path.exists(REVIEWS_FILE):
-        df_reviews = pd.read_csv(REVIEWS_FILE)
+    if os.path.exists(REVIEWS_FILE) and workers > 1:
+        rows_in, df_reviews_clean = parallel_reviews(valid_product_ids, workers)
+        print(f"Raw reviews: {rows_in} rows, filtered by productid and cleaned in {workers} processes")
+        print(f"Cleaned reviews: {len(df_reviews_clean)} rows")
+        df_reviews_clean.to_csv(os.path.join("data", OUTPUT_REVIEWS), index=False, encoding="utf-8-sig")
+        print(f"✅ Cleaned reviews saved: data/{OUTPUT_REVIEWS}")
+    elif os.path.exists(REVIEWS_FILE):
+        df_reviews = schema.read_csv(REVIEWS_FILE, text=False, numbers=False)
         print(f"Raw reviews: {len(df_reviews)} rows")
 
         # ✅ Filter only reviews whose productid exists in mobiles.csv
@@ -115,5 +510,37 @@ def main():
     else:
         print(f"Reviews file not found: {REVIEWS_FILE}")
 
+def stream_main(chunksize=CHUNK_SIZE):
+    valid_product_ids = set()
+    index = KeyIndex("ingest_mobile")
+    if snapshot_store.has_data("mobile"):
+        rows_in, rows_out, valid_product_ids = stream_mobile(index, chunksize)
+        print(f"Cleaned mobile data: {rows_out} of {rows_in} rows (streamed)")
+        print(f"✅ Cleaned mobile data saved: data/{OUTPUT_MOBILE}")
+    else:
+        print(f"No mobile snapshots in {snapshot_store.STORE_DIR}")
+    index.close()
+
+    if os.path.exists(REVIEWS_FILE):
+        index = KeyIndex("ingest_reviews")
+        rows_in, rows_out = stream_reviews(index, valid_product_ids, chunksize)
+        index.close()
+        print(f"Cleaned reviews: {rows_out} of {rows_in} rows (streamed)")
+        print(f"✅ Cleaned reviews saved: data/{OUTPUT_REVIEWS}")
+    else:
+        print(f"Reviews file not found: {REVIEWS_FILE}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Clean scraped mobile and review data")
+    parser.add_argument("--stream", action="store_true",
+                        help="process the inputs in chunks with bounded memory")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only clean rows added since the last incremental run and append them")
+    parser.add_argument("--workers", type=int, nargs="?", const=WORKERS, default=1,
+                        help=f"clean in a pool of processes (default {WORKERS}, the CPU count)")
+    parser.add_argument("--chunksize", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.workers > 1 and (args.stream or args.incremental):
+        parser.error("--workers only applies to a full in-memory run, not --stream / --incremental")
+    main(stream=args.stream, incremental=args.incremental, chunksize=args.chunksize,
+         workers=args.workers)
\ No newline at end of file
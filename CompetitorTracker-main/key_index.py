@@ -0,0 +1,126 @@
+#key_index.py
+# On-disk set of row keys for deduplicating data that is processed chunk by
+# chunk (see ingestion.py). A key is a tuple of column values, stored as a
+# 128-bit hash (two vectorised pandas hashes with different seeds) in a small
+# SQLite file, so memory use does not grow with the number of rows seen.
+
+import os
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+# ---------------- CONFIG ----------------
+INDEX_PATH = os.path.join("data", "ingestion_keys.db")
+HASH_KEYS = ("competitor-key-1", "competitor-key-2")   # 16-char pandas hash seeds
+
+def key_hashes(df, columns):
+    """(h1, h2) int64 arrays identifying each row's key"""
+    keys = df[columns].astype(str)
+    return tuple(pd.util.hash_pandas_object(keys, index=False, hash_key=k).to_numpy().view(np.int64)
+                 for k in HASH_KEYS)
+
+class KeyIndex:
+    """Keys already seen, one named set per table in the index file"""
+
+    def __init__(self, name, path=INDEX_PATH, share=None):
+        """share: another KeyIndex whose connection (and so transactions) this one uses"""
+        self.name = name
+        self.owner = share is None
+        if share is not None:
+            self.conn = share.conn
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(path)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (h1 INTEGER, h2 INTEGER, pos INTEGER,"
+                          f" PRIMARY KEY (h1, h2)) WITHOUT ROWID")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS index_state (name TEXT PRIMARY KEY, value TEXT)")
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS chunk (i INTEGER, h1 INTEGER, h2 INTEGER, pos INTEGER)")
+
+    def _load_chunk(self, h1, h2, pos=None):
+        self.conn.execute("DELETE FROM chunk")
+        pos = np.full(len(h1), -1, dtype=np.int64) if pos is None else pos
+        self.conn.executemany("INSERT INTO chunk VALUES (?, ?, ?, ?)",
+                              zip(range(len(h1)), h1.tolist(), h2.tolist(), pos.tolist()))
+
+    def _matching_rows(self, where=""):
+        q = (f"SELECT c.i FROM chunk c JOIN {self.name} k ON k.h1 = c.h1 AND k.h2 = c.h2 {where}")
+        return np.fromiter((i for (i,) in self.conn.execute(q)), dtype=np.int64)
+
+    def add_new(self, df, columns, commit=True):
+        """Mark rows whose key was never seen (first occurrence wins) and remember their keys.
+
+        With commit=False the new keys become durable with the next commit(),
+        e.g. together with put() state.
+        """
+        if df.empty:
+            return np.zeros(0, dtype=bool)
+        h1, h2 = key_hashes(df, columns)
+        keep = ~pd.DataFrame({"h1": h1, "h2": h2}).duplicated().to_numpy()
+        self._load_chunk(h1, h2)
+        keep[self._matching_rows()] = False
+        self.conn.execute(f"INSERT OR IGNORE INTO {self.name} (h1, h2, pos) SELECT h1, h2, pos FROM chunk")
+        if commit:
+            self.conn.commit()
+        return keep
+
+    def contains(self, df, columns):
+        """Mark rows whose key is in the index (nothing is added)"""
+        if df.empty:
+            return np.zeros(0, dtype=bool)
+        h1, h2 = key_hashes(df, columns)
+        self._load_chunk(h1, h2)
+        found = np.zeros(len(df), dtype=bool)
+        found[self._matching_rows()] = True
+        self.conn.commit()   # end the read, as in is_last
+        return found
+
+    def set_last(self, df, columns, positions):
+        """Remember the position of each key's last occurrence (call in row order)"""
+        if df.empty:
+            return
+        h1, h2 = key_hashes(df, columns)
+        self._load_chunk(h1, h2, np.asarray(positions, dtype=np.int64))
+        self.conn.execute(f"INSERT OR REPLACE INTO {self.name} (h1, h2, pos) "
+                          f"SELECT h1, h2, pos FROM chunk ORDER BY i")
+        self.conn.commit()
+
+    def is_last(self, df, columns, positions):
+        """Mark rows that are their key's last occurrence, as recorded by set_last"""
+        if df.empty:
+            return np.zeros(0, dtype=bool)
+        h1, h2 = key_hashes(df, columns)
+        self._load_chunk(h1, h2, np.asarray(positions, dtype=np.int64))
+        keep = np.zeros(len(df), dtype=bool)
+        keep[self._matching_rows("WHERE k.pos = c.pos")] = True
+        self.conn.commit()   # end the read, or a later write here fails on a stale WAL snapshot
+        return keep
+
+    def get(self, key, default=None):
+        """State stored next to the keys (e.g. an ingestion watermark)"""
+        row = self.conn.execute("SELECT value FROM index_state WHERE name = ?",
+                                (f"{self.name}:{key}",)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def put(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO index_state VALUES (?, ?)",
+                          (f"{self.name}:{key}", json.dumps(value)))
+
+    def commit(self):
+        self.conn.commit()
+
+    def clear(self):
+        """Forget every key and all state of this index"""
+        self.conn.execute(f"DELETE FROM {self.name}")
+        self.conn.execute("DELETE FROM index_state WHERE name LIKE ?", (f"{self.name}:%",))
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def close(self):
+        if self.owner:
+            self.conn.close()
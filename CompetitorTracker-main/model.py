@@ -7,6 +7,7 @@ from datetime import datetime, timedelta
 import numpy as np
 from textblob import TextBlob
 from sklearn.linear_model import LinearRegression
+import schema
 
 # ---------------- Streamlit Page Config ----------------
 st.set_page_config(
@@ -26,56 +27,89 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ---------------- Review Sentiment ----------------
+def sentiment_labels(polarity):
+    """positive / negative / neutral for TextBlob polarities (same cut-offs as analyze_sentiment)"""
+    return np.select([polarity > 0.1, polarity < -0.1], ["positive", "negative"], "neutral")
+
+def score_reviews(reviews_df):
+    """Add polarity and sentiment columns; TextBlob runs once per distinct review text.
+
+    A polarity column already in the file (precomputed) is used as is.
+    """
+    if "polarity" not in reviews_df.columns:
+        codes, texts = pd.factorize(reviews_df["review_text"].astype(object), use_na_sentinel=False)
+        polarity = np.array([TextBlob(str(t)).sentiment.polarity for t in texts], dtype="float32")
+        reviews_df["polarity"] = polarity[codes]
+    reviews_df["sentiment"] = pd.Categorical(sentiment_labels(reviews_df["polarity"].to_numpy()),
+                                             categories=["positive", "neutral", "negative"])
+    return reviews_df
+
+def sentiment_summary(reviews_df):
+    """Per product: review count, average polarity and count of each sentiment label"""
+    g = reviews_df.groupby("product_name", observed=True)
+    summary = g.agg(total_reviews=("polarity", "size"), average_sentiment_score=("polarity", "mean"))
+    counts = g["sentiment"].value_counts().unstack(fill_value=0)
+    summary = summary.join(counts)
+    summary.index = summary.index.astype(str)
+    return summary
+
+@st.cache_data(show_spinner="Loading and scoring reviews...")
+def load_tables(products_file, reviews_file, mtimes):
+    """(products, scored reviews, sentiment summary); cached until a file changes (mtimes)"""
+    products_df = schema.read_csv(products_file)
+    # Rename columns to internal standard
+    products_df.rename(columns={
+        "mobilename": "product_name",
+        "sellingprice": "price",
+        "discountoffering": "discount",
+        "rating": "rating",
+        "productid": "product_id",
+        "source": "source"
+    }, inplace=True)
+
+    reviews_df = schema.read_csv(reviews_file)
+    reviews_df.rename(columns={
+        "mobilename": "product_name",
+        "review": "review_text",
+        "rating": "rating",
+        "reviewdate": "date",
+        "productid": "product_id",
+        "source": "source"
+    }, inplace=True)
+
+    # Clean/convert data
+    products_df["price"] = pd.to_numeric(
+        products_df["price"], errors="coerce")
+    products_df["discount"] = pd.to_numeric(
+        products_df["discount"], errors="coerce").fillna(0)
+    products_df["rating"] = pd.to_numeric(
+        products_df["rating"], errors="coerce").fillna(0)
+    reviews_df["date"] = pd.to_datetime(
+        reviews_df["date"], errors="coerce")
+
+    reviews_df = score_reviews(reviews_df)
+    return products_df, reviews_df, sentiment_summary(reviews_df)
+
 # ---------------- Competitor Analyzer ----------------
 class CompetitorAnalyzer:
     def _init_(self):
         self.products_df = None
         self.reviews_df = None
+        self.sentiment_summary = None
 
     def load_data(self,
                   products_file="data/cleaned_mobile.csv",
                   reviews_file="data/cleaned_reviews.csv") -> bool:
-        """Load cleaned product & review data"""
+        """Load cleaned product & review data; review sentiment is scored here, once"""
         try:
-            if os.path.exists(products_file):
-                self.products_df = pd.read_csv(products_file)
-                # Rename columns to internal standard
-                self.products_df.rename(columns={
-                    "mobilename": "product_name",
-                    "sellingprice": "price",
-                    "discountoffering": "discount",
-                    "rating": "rating",
-                    "productid": "product_id",
-                    "source": "source"
-                }, inplace=True)
-            else:
-                st.error(f"Missing {products_file}")
-                return False
-
-            if os.path.exists(reviews_file):
-                self.reviews_df = pd.read_csv(reviews_file)
-                self.reviews_df.rename(columns={
-                    "mobilename": "product_name",
-                    "review": "review_text",
-                    "rating": "rating",
-                    "reviewdate": "date",
-                    "productid": "product_id",
-                    "source": "source"
-                }, inplace=True)
-            else:
-                st.error(f"Missing {reviews_file}")
-                return False
-
-            # Clean/convert data
-            self.products_df["price"] = pd.to_numeric(
-                self.products_df["price"], errors="coerce")
-            self.products_df["discount"] = pd.to_numeric(
-                self.products_df["discount"], errors="coerce").fillna(0)
-            self.products_df["rating"] = pd.to_numeric(
-                self.products_df["rating"], errors="coerce").fillna(0)
-            self.reviews_df["date"] = pd.to_datetime(
-                self.reviews_df["date"], errors="coerce")
-
+            for path in (products_file, reviews_file):
+                if not os.path.exists(path):
+                    st.error(f"Missing {path}")
+                    return False
+            mtimes = (os.path.getmtime(products_file), os.path.getmtime(reviews_file))
+            self.products_df, self.reviews_df, self.sentiment_summary = load_tables(
+                products_file, reviews_file, mtimes)
             return True
         except Exception as e:
             st.error(f"Error loading data: {e}")
@@ -93,20 +127,17 @@ class CompetitorAnalyzer:
             return "neutral", p
 
     def get_sentiment_analysis(self, product_name):
-        df = self.reviews_df[
-            self.reviews_df["product_name"] == product_name].copy()
-        if df.empty:
+        """Precomputed sentiment of a product's reviews (no NLP here)"""
+        if product_name not in self.sentiment_summary.index:
             return None
-        sentiments = []
-        for r in df["review_text"]:
-            s, sc = self.analyze_sentiment(r)
-            sentiments.append({"sentiment": s, "score": sc})
-        s_df = pd.DataFrame(sentiments)
+        row = self.sentiment_summary.loc[product_name]
+        counts = {s: int(row[s]) for s in ("positive", "neutral", "negative")
+                  if s in row.index and row[s] > 0}
         return {
-            "total_reviews": len(df),
-            "sentiment_distribution": s_df["sentiment"].value_counts().to_dict(),
-            "average_sentiment_score": s_df["score"].mean(),
-            "reviews_data": df
+            "total_reviews": int(row["total_reviews"]),
+            "sentiment_distribution": dict(sorted(counts.items(), key=lambda kv: -kv[1])),
+            "average_sentiment_score": float(row["average_sentiment_score"]),
+            "reviews_data": self.reviews_df[self.reviews_df["product_name"] == product_name]
         }
     
 # ---------------- Dashboard Sections ----------------
@@ -137,10 +168,9 @@ def product_analysis(analyzer, product_name):
                       f"{sdata['average_sentiment_score']:.2f}")
         st.markdown("### Recent Reviews")
         for _, r in sdata["reviews_data"].head(5).iterrows():
-            sent, sc = analyzer.analyze_sentiment(r["review_text"])
             with st.expander(f"{r['userid']} - Rating: {r['rating']}"):
                 st.write(r["review_text"])
-                st.write(f"Sentiment: *{sent}* (score {sc:.2f})")
+                st.write(f"Sentiment: *{r['sentiment']}* (score {r['polarity']:.2f})")
     else:
         st.info("No reviews available.")
 
@@ -218,15 +248,9 @@ def competitor_comparison(analyzer, product_name):
             "price >= @lower_bound and price <= @upper_bound"
         ).copy()
 
-        # 3️⃣ Add average sentiment score for each product
-        sentiment_scores = []
-        for prod in nearby_products["product_name"]:
-            sentiment_info = analyzer.get_sentiment_analysis(prod)
-            if sentiment_info:
-                sentiment_scores.append(sentiment_info["average_sentiment_score"])
-            else:
-                sentiment_scores.append(np.nan)
-        nearby_products["avg_sentiment"] = sentiment_scores
+        # 3️⃣ Add average sentiment score for each product (precomputed per product)
+        nearby_products["avg_sentiment"] = nearby_products["product_name"].astype(str).map(
+            analyzer.sentiment_summary["average_sentiment_score"])
 
         # 4️⃣ Sort by high sentiment first
         nearby_products.sort_values(by="avg_sentiment", ascending=False, inplace=True)
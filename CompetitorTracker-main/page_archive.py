@@ -0,0 +1,140 @@
+#page_archive.py
+# Content-addressed archive of raw fetched pages. Each page body is stored
+# once as a zstd blob named by its sha256; index.jsonl records every capture
+# (url, sha, fetch time) so parsers can be re-run offline with --replay.
+#
+#   data/html_archive/index.jsonl
+#   data/html_archive/objects/ab/cdef....zst
+
+import os
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+
+import zstandard as zstd
+
+# ---------------- CONFIG ----------------
+ARCHIVE_DIR = os.path.join("data", "html_archive")
+ZSTD_LEVEL = 10
+
+# ---------------- ARCHIVE ----------------
+
+class PageArchive:
+    """Stores and looks up raw HTML captures; safe to share between threads"""
+
+    def __init__(self, root=ARCHIVE_DIR, level=ZSTD_LEVEL):
+        self.root = root
+        self.level = level
+        self.index_path = os.path.join(root, "index.jsonl")
+        self.lock = threading.Lock()
+        self.stats = {"pages": 0, "new_blobs": 0, "raw_bytes": 0, "stored_bytes": 0}
+        os.makedirs(os.path.join(root, "objects"), exist_ok=True)
+
+    def _blob_path(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], sha[2:] + ".zst")
+
+    def put(self, url, html, fetched_at=None):
+        """Archive one page; returns its content hash"""
+        data = html.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(sha)
+        stored = 0
+        if not os.path.exists(path):
+            blob = zstd.ZstdCompressor(level=self.level).compress(data)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+            stored = len(blob)
+
+        entry = {"url": url, "sha": sha, "fetched_at": fetched_at or datetime.now().isoformat()}
+        with self.lock:
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+            self.stats["pages"] += 1
+            self.stats["raw_bytes"] += len(data)
+            if stored:
+                self.stats["new_blobs"] += 1
+                self.stats["stored_bytes"] += stored
+        return sha
+
+    def get(self, sha):
+        with open(self._blob_path(sha), "rb") as f:
+            return zstd.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+    def entries(self):
+        """Yield every index entry in capture order"""
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def latest(self, until=None):
+        """{url: entry} of the newest capture of each URL, optionally up to an ISO time"""
+        pages = {}
+        for entry in self.entries():
+            if until is None or entry["fetched_at"] <= until:
+                pages[entry["url"]] = entry
+        return pages
+
+def print_archive_stats(archive):
+    s = archive.stats
+    if not s["pages"]:
+        return
+    print(f"🗄 Archived {s['pages']} pages ({s['raw_bytes'] / 2**20:.1f} MB raw), "
+          f"{s['new_blobs']} new blobs ({s['stored_bytes'] / 2**20:.1f} MB compressed)")
+
+# ---------------- REPLAY ----------------
+
+class ReplaySource:
+    """Serves the newest archived capture of each URL; missing URLs return None"""
+
+    def __init__(self, archive, until=None):
+        self.archive = archive
+        self.pages = archive.latest(until)
+        self.stats = {"requests": 0, "errors": 0, "fallbacks": 0, "bytes": 0}
+        self.started = time.perf_counter()
+        print(f"⏪ Replaying {len(self.pages)} archived URLs from {archive.root}")
+
+    def load(self, url):
+        entry = self.pages.get(url)
+        if entry is None:
+            self.stats["errors"] += 1
+            return None
+        html = self.archive.get(entry["sha"])
+        self.stats["requests"] += 1
+        self.stats["bytes"] += len(html)
+        return html
+
+    def fetched_at(self, url):
+        entry = self.pages.get(url)
+        return entry["fetched_at"] if entry else None
+
+    def pages_per_sec(self):
+        elapsed = time.perf_counter() - self.started
+        return self.stats["requests"] / elapsed if elapsed else 0.0
+
+class ReplayFetcher(ReplaySource):
+    """Drop-in for fetcher.Fetcher that reads pages from the archive"""
+
+    total = 1    # pages come from disk, one worker is enough
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        pass
+
+    async def get(self, url, marker=None):
+        return self.load(url)
+
+class ReplayDriver(ReplaySource):
+    """Stand-in for a Selenium driver; browser.load_page reads from the archive"""
+
+    def quit(self):
+        pass
@@ -0,0 +1,221 @@
+#payload_store.py
+# Content-addressed storage for the raw / promotions payloads of snapshots.
+# Each payload is serialised as canonical JSON, hashed (128-bit blake2b) and stored
+# once in payload_blobs, zstd-compressed with a dictionary trained on our own
+# payloads; ProductSnapshot rows only keep the hash. A product whose listing
+# did not change since the last scrape adds no new blob.
+#
+#   python payload_store.py train      # (re)train the dictionary and recompress
+#   python payload_store.py migrate    # move legacy raw/promotions JSON into blobs
+#   python payload_store.py stats
+
+import sys
+import json
+import random
+import hashlib
+import threading
+
+import zstandard as zstd
+from sqlalchemy import select, update, func, bindparam, null
+from sqlalchemy.dialects.sqlite import insert
+
+from db import ReadSession, ProductSnapshot, PayloadBlob, PayloadDict, write
+
+# ---------------- CONFIG ----------------
+LEVEL = 10
+DICT_SIZE = 16 * 1024        # bytes
+TRAIN_SAMPLES = 5000         # payloads sampled to train a dictionary
+MIN_TRAIN_SAMPLES = 100
+MIGRATE_BATCH = 1000
+
+_local = threading.local()   # zstd (de)compressors are not thread-safe
+_dicts = {}                  # dict_id -> ZstdCompressionDict
+_current = {"id": None, "loaded": False}
+_lock = threading.Lock()
+
+# ---------------- ENCODING ----------------
+
+def canonical(payload):
+    """The JSON bytes a payload is hashed and stored as"""
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False,
+                      default=str).encode("utf-8")
+
+def payload_hash(data):
+    # 32 hex chars: two of these sit in every snapshot row, so shorter than sha256
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+def _dictionary(dict_id):
+    if dict_id not in _dicts:
+        with ReadSession() as s:
+            data = s.get(PayloadDict, dict_id).data
+        _dicts[dict_id] = zstd.ZstdCompressionDict(data)
+    return _dicts[dict_id]
+
+def current_dict_id():
+    """Newest trained dictionary, or None before one has been trained"""
+    with _lock:
+        if not _current["loaded"]:
+            with ReadSession() as s:
+                _current["id"] = s.execute(select(func.max(PayloadDict.id))).scalar()
+            _current["loaded"] = True
+        return _current["id"]
+
+def _codec(kind, dict_id):
+    cache = _local.__dict__.setdefault(kind, {})
+    if dict_id not in cache:
+        d = _dictionary(dict_id) if dict_id is not None else None
+        cache[dict_id] = (zstd.ZstdCompressor(level=LEVEL, dict_data=d) if kind == "c"
+                          else zstd.ZstdDecompressor(dict_data=d))
+    return cache[dict_id]
+
+def pack(payloads):
+    """Hash and compress payloads (None stays None).
+
+    Returns (hashes in input order, {hash: PayloadBlob row values}); identical
+    payloads are compressed once.
+    """
+    dict_id = current_dict_id()
+    hashes, blobs = [], {}
+    for payload in payloads:
+        if payload is None:
+            hashes.append(None)
+            continue
+        data = canonical(payload)
+        h = payload_hash(data)
+        if h not in blobs:
+            blobs[h] = {"hash": h, "dict_id": dict_id, "size": len(data),
+                        "data": _codec("c", dict_id).compress(data)}
+        hashes.append(h)
+    return hashes, blobs
+
+def save_blobs(session, blobs):
+    """Insert packed blobs inside the caller's transaction; known hashes are left alone"""
+    if blobs:
+        session.execute(insert(PayloadBlob).on_conflict_do_nothing(), list(blobs.values()))
+
+def unpack(dict_id, data):
+    return json.loads(_codec("d", dict_id).decompress(data))
+
+def load(hashes):
+    """{hash: payload} for the given hashes"""
+    wanted = list({h for h in hashes if h})
+    found = {}
+    with ReadSession() as s:
+        for start in range(0, len(wanted), 500):
+            q = (select(PayloadBlob.hash, PayloadBlob.dict_id, PayloadBlob.data)
+                 .where(PayloadBlob.hash.in_(wanted[start:start + 500])))
+            for h, dict_id, data in s.execute(q):
+                found[h] = unpack(dict_id, data)
+    return found
+
+# ---------------- MAINTENANCE ----------------
+
+def _sample_payloads(n):
+    with ReadSession() as s:
+        total = s.execute(select(func.count()).select_from(PayloadBlob)).scalar()
+        q = select(PayloadBlob.dict_id, PayloadBlob.data)
+        if total > n:
+            q = q.order_by(func.random()).limit(n)
+        samples = [_codec("d", d).decompress(data) for d, data in s.execute(q)]
+        if len(samples) < n:   # not migrated yet: fall back on the legacy JSON columns
+            q = (select(ProductSnapshot.raw, ProductSnapshot.promotions)
+                 .where(ProductSnapshot.raw.is_not(None)).limit(n - len(samples)))
+            for raw, promotions in s.execute(q):
+                samples += [canonical(p) for p in (raw, promotions) if p is not None]
+    random.shuffle(samples)
+    return samples
+
+def train_dictionary(samples=TRAIN_SAMPLES, dict_size=DICT_SIZE, recompress=True):
+    """Train a dictionary on stored payloads and make it current; returns its id.
+
+    With recompress, existing blobs are rewritten with the new dictionary.
+    """
+    data = _sample_payloads(samples)
+    if len(data) < MIN_TRAIN_SAMPLES:
+        print(f"⚠ Only {len(data)} payloads stored, need {MIN_TRAIN_SAMPLES} to train a dictionary")
+        return current_dict_id()
+    trained = zstd.train_dictionary(dict_size, data)
+
+    def job(session):
+        row = PayloadDict(data=trained.as_bytes(), samples=len(data))
+        session.add(row)
+        session.flush()
+        return row.id
+    dict_id = write(job)
+    with _lock:
+        _current.update(id=dict_id, loaded=True)
+    print(f"📚 Trained payload dictionary {dict_id} ({len(trained.as_bytes())} bytes, {len(data)} samples)")
+    if recompress:
+        recompress_blobs(dict_id)
+    return dict_id
+
+def recompress_blobs(dict_id, batch=MIGRATE_BATCH):
+    """Rewrite blobs compressed with another (or no) dictionary"""
+    done = 0
+    last = ""
+    while True:
+        with ReadSession() as s:
+            rows = s.execute(select(PayloadBlob.hash, PayloadBlob.dict_id, PayloadBlob.data)
+                             .where(PayloadBlob.hash > last).order_by(PayloadBlob.hash)
+                             .limit(batch)).all()
+        if not rows:
+            break
+        last = rows[-1][0]
+        values = [{"h": h, "d": _codec("c", dict_id).compress(_codec("d", old).decompress(data))}
+                  for h, old, data in rows if old != dict_id]
+        if values:
+            write(lambda session: session.connection().execute(
+                update(PayloadBlob.__table__).where(PayloadBlob.__table__.c.hash == bindparam("h"))
+                .values(data=bindparam("d"), dict_id=dict_id), values))
+        done += len(values)
+    print(f"♻ Recompressed {done} payload blobs with dictionary {dict_id}")
+    return done
+
+def migrate_legacy(batch=MIGRATE_BATCH):
+    """Move raw/promotions JSON of old snapshots into blobs; returns snapshots migrated"""
+    migrated = 0
+    while True:
+        with ReadSession() as s:
+            rows = s.execute(select(ProductSnapshot.id, ProductSnapshot.raw, ProductSnapshot.promotions)
+                             .where((ProductSnapshot.raw.is_not(None))
+                                    | (ProductSnapshot.promotions.is_not(None)))
+                             .order_by(ProductSnapshot.id).limit(batch)).all()
+        if not rows:
+            break
+        raw_hashes, raw_blobs = pack(r.raw for r in rows)
+        promo_hashes, promo_blobs = pack(r.promotions for r in rows)
+
+        def job(session):
+            save_blobs(session, {**raw_blobs, **promo_blobs})
+            # Core executemany; null() so the JSON columns become SQL NULL, not 'null'
+            session.connection().execute(
+                update(ProductSnapshot.__table__)
+                .where(ProductSnapshot.__table__.c.id == bindparam("snapshot_id"))
+                .values(raw=null(), promotions=null(), raw_hash=bindparam("raw_h"),
+                        promotions_hash=bindparam("promo_h")),
+                [{"snapshot_id": r.id, "raw_h": raw_h, "promo_h": promo_h}
+                 for r, raw_h, promo_h in zip(rows, raw_hashes, promo_hashes)])
+        write(job)
+        migrated += len(rows)
+    print(f"📦 Moved payloads of {migrated} snapshots into payload_blobs (VACUUM to reclaim space)")
+    return migrated
+
+def print_payload_stats():
+    with ReadSession() as s:
+        blobs, raw_bytes, stored = s.execute(select(func.count(), func.sum(PayloadBlob.size),
+                                                    func.sum(func.length(PayloadBlob.data)))).one()
+        refs = s.execute(select(func.count(ProductSnapshot.raw_hash)
+                                + func.count(ProductSnapshot.promotions_hash))).scalar()
+    if not blobs:
+        print("📦 No payload blobs stored")
+        return
+    print(f"📦 Payloads: {refs} references -> {blobs} blobs, {raw_bytes / 1e6:.2f} MB JSON "
+          f"stored as {stored / 1e6:.2f} MB (dictionary {current_dict_id()})")
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if command == "train":
+        train_dictionary()
+    elif command == "migrate":
+        migrate_legacy()
+    print_payload_stats()
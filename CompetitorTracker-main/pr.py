@@ -1,175 +1,273 @@
 import os
-import time, re
+import asyncio
+import argparse
 import pandas as pd
-from bs4 import BeautifulSoup
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
 from datetime import datetime
+from itertools import groupby
 
 import ingestion
+import price_rollups
+import snapshot_store
+from extractors import BASE_URL, parse_listing, parse_review_link, parse_reviews
+from fetcher import Fetcher, PER_HOST_CONCURRENCY
+from sqlalchemy import create_engine
+from crawl_frontier import CrawlFrontier, print_frontier_stats
+from page_archive import PageArchive, ReplayFetcher, print_archive_stats
+from rate_limiter import AdaptiveRateLimiter, print_limiter_stats
+from recrawl_scheduler import PAGE_BUDGET, RecrawlScheduler, print_schedule_stats, record_snapshots
+from review_watermarks import ReviewWatermarks, recent_first
 # ------------------------------
 # CONFIG
 # ------------------------------
-SEARCH_URL = "https://www.flipkart.com/search?q=mobiles&page={}"
+SEARCH_PATH = "/search?q=mobiles&page={}"
+SEARCH_URL = BASE_URL + SEARCH_PATH
 LISTING_PAGES = 3      # how many search pages
 REVIEW_PAGES  = 2     # review pages per product
-WAIT = 3                # seconds to wait for JS to load
-
-
-# Selenium setup
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-options.add_argument("--disable-gpu")
-options.add_experimental_option('excludeSwitches', ['enable-logging'])
-driver = webdriver.Chrome(options=options)
-
-mobile_rows = []
-review_rows = []
-
-def clean_price(txt):
-    return re.sub(r"[^\d]", "", txt) if txt else None
+MOBILE_COLUMNS = ["source", "productid", "mobilename", "sellingprice", "mrp",
+                  "discountoffering", "rating", "url", "scraped_at"]
+REVIEW_COLUMNS = ["source", "productid", "mobilename", "userid", "review", "rating", "reviewdate"]
+REPLAY_REVIEWS = "review.replay.csv"   # --replay output; review.csv holds the live history
+REPLAY_STORE = os.path.join("data", "replay_snapshots")   # --replay listings, kept out of the live store
 
 # ------------------------------
 # Step 1: Collect Product Listing Data
 # ------------------------------
-product_links = set()
-scraped_at = datetime.now().isoformat()
-
-for page in range(1, LISTING_PAGES + 1):
-    print(f"📄 Listing Page {page}")
-    driver.get(SEARCH_URL.format(page))
-    time.sleep(WAIT)
-
-    soup = BeautifulSoup(driver.page_source, "lxml")
-    products = soup.find_all("div", {"class": "tUxRFH"})
-
-    for p in products:
-        title_tag = p.find("div", {"class": "KzDlHZ"})
-        mobilename = title_tag.get_text(strip=True) if title_tag else "Unknown"
-
-        price_tag = p.find("div", {"class": "Nx9bqj _4b5DiR"})
-        sellingprice = clean_price(price_tag.get_text()) if price_tag else None
-
-        mrp_tag = p.find("div", {"class": "yRaY8j"})
-        mrp = mrp_tag.get_text(strip=True).replace("₹","").replace(",","") if mrp_tag else None
-
-        discount_tag = p.find("div", {"class": "UkUFwK"})
-        discountoffering = discount_tag.get_text(strip=True) if discount_tag else None
-        
-        # Discount
-        # discount_tag = p.find("div", {"class": "UkUFwK"})
-        # discount = discount_tag.get_text(strip=True).replace("% off","") if discount_tag else None
-
-        rating_tag = p.find("div", {"class": "XQDdHH"})
-        rating = rating_tag.get_text(strip=True) if rating_tag else None
-
-        link_tag = p.find("a", {"class": "CGtC98"})
-        url = "https://www.flipkart.com" + link_tag["href"] if link_tag else None
-
-        pid_match = re.search(r"/p/itm([0-9a-z]+)", url) if url else None
-        productid = pid_match.group(1) if pid_match else None
-
-        if url:
-            product_links.add((productid, mobilename, url))
-
-        mobile_rows.append({
-            "source": "flipkart",
-            "productid": productid,
-            "mobilename": mobilename,
-            "sellingprice": sellingprice,
-            "mrp": mrp,
-            "discountoffering": discountoffering,
-            "rating": rating,
-            "url": url,
-            "scraped_at": scraped_at
-        })
-
-# Save mobile.csv (append if exists)
-mobile_df_new = pd.DataFrame(mobile_rows)
-try:
-    mobile_df_existing = pd.read_csv("mobile.csv")
-    mobile_df = pd.concat([mobile_df_existing, mobile_df_new], ignore_index=True)
-    mobile_df = mobile_df.drop_duplicates(subset=["productid", "scraped_at"], keep="last")
-except FileNotFoundError:
-    mobile_df = mobile_df_new
-
-
-
-os.makedirs("data", exist_ok=True)
-mobile_df.to_csv("mobile.csv", index=False, encoding="utf-8-sig")
-print(f"✅ Saved {len(mobile_df_new)} new products (total {len(mobile_df)}) to mobile.csv")
+async def crawl_listing_page(fetcher, frontier, base_url, item):
+    """Parse one search page into the frontier and queue its products"""
+    url_id, url, payload = item
+    html = await fetcher.get(url, marker="tUxRFH")
+    print(f"📄 Listing {url}")
+    if not html:
+        frontier.failed(url_id, "listing page did not load")
+        return
+    scraped_at = payload["scraped_at"]
+    if isinstance(fetcher, ReplayFetcher):
+        scraped_at = fetcher.fetched_at(url)
+    rows = parse_listing(html, scraped_at, base_url)
+    products = {row["url"]: {"productid": row["productid"], "mobilename": row["mobilename"]}
+                for row in rows if row["url"]}
+    frontier.add(list(products), "product", payload=products.get)
+    frontier.done(url_id, [("mobile", row) for row in rows])
+
+async def crawl_listings(fetcher, frontier, base_url, listing_pages, scraped_at):
+    """Fetch the pending search pages concurrently (retrying failed ones)"""
+    urls = [base_url + SEARCH_PATH.format(page) for page in range(1, listing_pages + 1)]
+    frontier.add(urls, "listing", payload={"scraped_at": scraped_at})
+    while True:
+        items = frontier.claim("listing")
+        if not items:
+            return
+        await asyncio.gather(*(crawl_listing_page(fetcher, frontier, base_url, item)
+                               for item in items))
 
 # ------------------------------
 # Step 2: Collect Reviews
 # ------------------------------
-for productid, mobilename, url in product_links:
-    if not url:
-        continue
-    try:
-        driver.get(url)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.CLASS_NAME, "VU-ZEz"))
-        )
-        soup = BeautifulSoup(driver.page_source, "lxml")
-        all_reviews_tag = soup.find("a", href=re.compile("/product-reviews/"))
-        if not all_reviews_tag:
+async def crawl_product_reviews(fetcher, base_url, productid, mobilename, url, review_pages,
+                                watermarks=None):
+    """Fetch one product page and walk its review pages in order.
+
+    With watermarks, pages are read newest-first and the walk stops at the
+    first review already collected on an earlier run.
+    """
+    html = await fetcher.get(url, marker="VU-ZEz")
+    if not html:
+        raise RuntimeError("product page did not load")
+    reviews_base = parse_review_link(html, base_url)
+    if not reviews_base:
+        return []
+    if watermarks is not None:
+        reviews_base = recent_first(reviews_base)
+
+    print(f"💬 Reviews for: {mobilename}")
+
+    rows = []
+    for rpage in range(1, review_pages + 1):
+        rhtml = await fetcher.get(f"{reviews_base}&page={rpage}")
+        if not rhtml or "cPHDOP" not in rhtml:
+            break
+        page_rows = parse_reviews(rhtml, productid, mobilename)
+        if watermarks is None:
+            rows.extend(page_rows)
+            continue
+        fresh, reached = watermarks.filter_new(productid, page_rows)
+        rows.extend(fresh)
+        if reached:
+            break
+    return rows
+
+async def product_worker(fetcher, frontier, base_url, review_pages, watermarks):
+    """Claim product URLs one at a time until none are pending"""
+    while True:
+        items = frontier.claim("product", limit=1)
+        if not items:
+            return
+        url_id, url, payload = items[0]
+        try:
+            rows = await crawl_product_reviews(fetcher, base_url, payload["productid"],
+                                               payload["mobilename"], url, review_pages,
+                                               watermarks)
+        except Exception as e:
+            print(f"⚠ Error scraping reviews for {payload['mobilename']}: {e}")
+            frontier.failed(url_id, e)
             continue
-        reviews_base = "https://www.flipkart.com" + all_reviews_tag["href"]
-
-        print(f"💬 Reviews for: {mobilename}")
-
-        for rpage in range(1, REVIEW_PAGES + 1):
-            review_url = f"{reviews_base}&page={rpage}"
-            driver.get(review_url)
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CLASS_NAME, "cPHDOP"))
-                )
-            except TimeoutException:
-                break
-
-            rsoup = BeautifulSoup(driver.page_source, "lxml")
-            containers = rsoup.find_all("div", {"class": "cPHDOP"})
-
-            for c in containers:
-                user_tag = c.find("p", {"class": "_2NsDsF AwS1CA"})
-                userid = user_tag.get_text(strip=True) if user_tag else "Anonymous"
-
-                rating_tag = c.find("div", {"class": "_3LWZlK"})
-                rrating = rating_tag.get_text(strip=True) if rating_tag else None
-
-                text_tag = c.find("div", {"class": "ZmyHeo"})
-                review_text = text_tag.get_text(strip=True).replace("READ MORE", "") if text_tag else ""
-
-                date_tag = c.find("p", {"class": "_2NsDsF", "style": False})
-                reviewdate = ""
-                if date_tag:
-                    all_p = c.find_all("p", {"class": "_2NsDsF"})
-                    if len(all_p) > 1:
-                        reviewdate = all_p[-1].get_text(strip=True)
-
-                if review_text:
-                    review_rows.append({
-                        "source": "flipkart",
-                        "productid": productid,
-                        "mobilename": mobilename,
-                        "userid": userid,
-                        "review": review_text,
-                        "rating": rrating,
-                        "reviewdate": reviewdate
-                    })
-            time.sleep(2)
-
-    except Exception as e:
-        print(f"⚠ Error scraping reviews for {mobilename}: {e}")
-
-driver.quit()
-
-# Save review.csv
-review_df = pd.DataFrame(review_rows)
-review_df.to_csv("review.csv", index=False, encoding="utf-8-sig")
-print(f"✅ Saved {len(review_df)} reviews to review.csv")
-ingestion.main()
\ No newline at end of file
+        frontier.done(url_id, [("review", row) for row in rows])
+
+def plan_products(frontier, scheduler, pages_used):
+    """Skip the queued products the scheduler does not pick for this run"""
+    product_counts = frontier.counts(kind="product")
+    if product_counts.get("done") or product_counts.get("skipped"):
+        return   # planned before the crawl was interrupted
+    pending = frontier.items("product")
+    selected = set(scheduler.select([p["productid"] for _, _, p in pending], pages_used))
+    frontier.skip([url_id for url_id, _, p in pending if p["productid"] not in selected])
+
+async def crawl(frontier, base_url=BASE_URL, listing_pages=LISTING_PAGES,
+                review_pages=REVIEW_PAGES, per_host=PER_HOST_CONCURRENCY,
+                selenium_fallback=True, limiter=None, watermarks=None, archive=None,
+                replay=None, scheduler=None):
+    """Run (or resume) the listing + review crawl; rows are stored in the frontier.
+
+    Pages are saved to archive when given; with replay (a ReplayFetcher) they
+    are read from an archive instead of the network. With a scheduler
+    (recrawl_scheduler.RecrawlScheduler) only the products it picks are
+    visited. Returns the fetcher stats.
+    """
+    scraped_at = datetime.now().isoformat()
+    source = replay or Fetcher(per_host=per_host, selenium_fallback=selenium_fallback,
+                               limiter=limiter, archive=archive)
+    async with source as fetcher:
+        await crawl_listings(fetcher, frontier, base_url, listing_pages, scraped_at)
+        if scheduler is not None:
+            plan_products(frontier, scheduler, fetcher.stats["requests"])
+        await asyncio.gather(*(product_worker(fetcher, frontier, base_url, review_pages, watermarks)
+                               for _ in range(fetcher.total)))
+        stats = dict(fetcher.stats, pages_per_sec=fetcher.pages_per_sec())
+    return stats
+
+def review_counts(frontier):
+    """{productid: reviews stored} for every product visited in this crawl"""
+    counts = {payload["productid"]: 0 for _, _, payload in frontier.items("product", "done")}
+    for row in frontier.iter_rows("review"):
+        counts[row["productid"]] = counts.get(row["productid"], 0) + 1
+    return counts
+
+def advance_watermarks(watermarks, frontier):
+    """Move the watermarks past every stored review, including ones from an interrupted run"""
+    for productid, rows in groupby(frontier.iter_rows("review"), key=lambda r: r["productid"]):
+        watermarks.advance(productid, list(rows))
+
+# ------------------------------
+# Step 3: Save
+# ------------------------------
+def save_mobile(mobile_rows):
+    # Append this run's listing rows to the snapshot store (history is never rewritten;
+    # ingestion drops duplicate productid + scraped_at rows on read)
+    snapshot_store.import_csv("mobile", ingestion.MOBILE_FILE)
+    written = snapshot_store.append("mobile", mobile_rows)
+    print(f"✅ Saved {written} products to {snapshot_store.STORE_DIR}/mobile")
+
+def save_reviews(review_rows, append=False):
+    # Save review.csv (append only the new rows on incremental runs)
+    review_df = pd.DataFrame(review_rows)
+    if append and os.path.exists("review.csv"):
+        if not review_df.empty:
+            review_df.to_csv("review.csv", mode="a", header=False, index=False, encoding="utf-8")
+        print(f"✅ Appended {len(review_df)} new reviews to review.csv")
+    else:
+        review_df.to_csv("review.csv", index=False, encoding="utf-8-sig")
+        print(f"✅ Saved {len(review_df)} reviews to review.csv")
+
+def export_reviews(frontier, append=False, path="review.csv"):
+    # Stream the stored review rows into review.csv
+    written = frontier.export_csv("review", path, REVIEW_COLUMNS, append=append)
+    verb = "Appended" if append else "Saved"
+    print(f"✅ {verb} {written} reviews to {path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Flipkart listing + review scraper")
+    parser.add_argument("--full", action="store_true",
+                        help="ignore review watermarks and rewrite review.csv")
+    parser.add_argument("--restart", action="store_true",
+                        help="drop an interrupted crawl instead of resuming it")
+    parser.add_argument("--archive", action="store_true",
+                        help="store every fetched page in the raw HTML archive")
+    parser.add_argument("--budget", type=int, default=PAGE_BUDGET,
+                        help="page loads per run; products are picked by the recrawl scheduler")
+    parser.add_argument("--all", action="store_true",
+                        help="visit every listed product instead of only the ones due")
+    parser.add_argument("--replay", nargs="?", const="", metavar="UNTIL",
+                        help="re-parse the archive (newest captures, optionally up to an ISO "
+                             f"time) with no network; listings go to {REPLAY_STORE} and reviews "
+                             f"to {REPLAY_REVIEWS}, live data and cleaned files are not touched; "
+                             "pass --full if the pages were captured with --full")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        replay_main(args)
+        return
+
+    frontier = CrawlFrontier("pr")
+    if args.restart:
+        frontier.clear()
+    counts = frontier.resume()
+    if counts:
+        print(f"🔁 Resuming interrupted crawl: {counts}")
+
+    watermarks = None
+    if not args.full:
+        watermarks = ReviewWatermarks()
+        watermarks.seed_from_csv("review.csv")
+
+    # new-review counts only make sense as a velocity on incremental runs
+    scheduler = None
+    if watermarks is not None:
+        scheduler = RecrawlScheduler(page_budget=args.budget, review_pages=REVIEW_PAGES)
+
+    archive = PageArchive() if args.archive else None
+    limiter = AdaptiveRateLimiter()
+    stats = asyncio.run(crawl(frontier, limiter=limiter, watermarks=watermarks, archive=archive,
+                              scheduler=None if args.all else scheduler))
+    print(f"⏱ {stats['requests']} pages fetched at {stats['pages_per_sec']:.1f} pages/sec "
+          f"({stats['fallbacks']} Selenium fallbacks)")
+    print_limiter_stats(limiter)
+    print_frontier_stats(frontier)
+    if scheduler is not None and not args.all:
+        print_schedule_stats(scheduler)
+    if archive is not None:
+        print_archive_stats(archive)
+    limiter.export()
+    mobile_rows = list(frontier.iter_rows("mobile"))
+    save_mobile(mobile_rows)
+    print(f"📈 Recorded {record_snapshots(mobile_rows)} price snapshots")
+    print(f"📊 Rolled up {price_rollups.rollup()} snapshots into hourly/daily/weekly prices")
+    # the frontier records review.csv's size first, so a rerun after a crash before
+    # frontier.clear() rewrites this export instead of appending it again
+    export_reviews(frontier, append=watermarks is not None)
+    if watermarks is not None:
+        advance_watermarks(watermarks, frontier)
+        watermarks.save()
+        scheduler.record_crawl(review_counts(frontier))
+    frontier.clear()
+    # review.csv was only appended to, so clean just what this crawl added
+    ingestion.main(incremental=watermarks is not None)
+
+def replay_main(args):
+    # Re-run the parsers over archived pages. Nothing live is touched: the listings go
+    # to their own snapshot store (their scraped_at is new, so appending them to the
+    # live store would duplicate history), the reviews to their own file (an
+    # incremental archive only holds the newest review pages), and ingestion is not
+    # run, since it would rebuild the cleaned files from the live data
+    frontier = CrawlFrontier("pr-replay", engine=create_engine("sqlite://"))
+    # an empty in-memory watermark set keeps the newest-first review URLs without filtering
+    watermarks = None if args.full else ReviewWatermarks(path=None)
+    replay = ReplayFetcher(PageArchive(), until=args.replay or None)
+    stats = asyncio.run(crawl(frontier, watermarks=watermarks, replay=replay))
+    print(f"⏱ {stats['requests']} archived pages parsed at {stats['pages_per_sec']:.1f} pages/sec "
+          f"({stats['errors']} URLs not in the archive)")
+    written = snapshot_store.append("mobile", list(frontier.iter_rows("mobile")), root=REPLAY_STORE)
+    print(f"✅ Saved {written} replayed products to {REPLAY_STORE}/mobile")
+    export_reviews(frontier, path=REPLAY_REVIEWS)
+
+if __name__ == "__main__":
+    main()
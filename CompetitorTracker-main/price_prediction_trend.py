@@ -3,22 +3,33 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
 from sklearn.linear_model import LinearRegression
+import price_rollups
+import storage
 
-# Load your product data
-file_path = "flipkart_product_details.csv"
-df = pd.read_csv(file_path)
-df = df.fillna(0)
+# Price history: one row per product and year (its mean weekly close), from
+# the rollups (see price_rollups.py)
+product_ids = storage.latest_states("flipkart")['product_id']
+history = price_rollups.price_series(product_ids, start="2020-01-01", period="week")
+if not history.empty:
+    history['Year'] = pd.to_datetime(history['bucket_start']).dt.year
+    df = (history.groupby(['product_id', 'Year'])['close'].mean()
+          .rename('Price (₹)').reset_index())
+else:
+    # No snapshot history yet: fall back on the product details file
+    file_path = "flipkart_product_details.csv"
+    df = pd.read_csv(file_path)
+    df = df.fillna(0)
 
-# Check if 'Price (₹)' column exists
-if 'Price (₹)' not in df.columns:
-    print("⚠️ 'Price (₹)' column not found in dataset.")
-    exit()
+    # Check if 'Price (₹)' column exists
+    if 'Price (₹)' not in df.columns:
+        print("⚠️ 'Price (₹)' column not found in dataset.")
+        exit()
 
-# Step 1: Simulate a 'Year' column if missing
-# We'll assume the data spans from 2020 onward
-df['Year'] = 2020 + (df.index % 6)  # Cycles through 2020–2025
+    # Step 1: Simulate a 'Year' column if missing
+    # We'll assume the data spans from 2020 onward
+    df['Year'] = 2020 + (df.index % 6)  # Cycles through 2020–2025
 
-# Step 2: Group by year and calculate average price
+# Step 2: Group by year and calculate average price across products
 price_by_year = df.groupby('Year')['Price (₹)'].mean().reset_index()
 
 # Step 3: Train a linear regression model
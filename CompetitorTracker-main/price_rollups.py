@@ -0,0 +1,213 @@
+#price_rollups.py
+# Hourly, daily and weekly OHLC price rollups of product_snapshots.
+# rollup() folds in only the snapshots added since the last run (an id
+# watermark), merging them into existing buckets, so it can run after every
+# scrape. compact() then drops raw snapshots that are rolled up and older
+# than the retention window; long-range charts and forecasts read the rollups
+# through price_series().
+#
+#   python price_rollups.py            # roll up new snapshots
+#   python price_rollups.py compact    # roll up, then apply retention
+
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import select, delete, func, case, union
+from sqlalchemy.dialects.sqlite import insert
+
+from db import ReadSession, ProductSnapshot, PriceRollup, RollupWatermark, PayloadBlob, write
+
+# ---------------- CONFIG ----------------
+PERIODS = ("hour", "day", "week")
+BATCH = 50_000               # snapshots read per rollup step
+RAW_RETENTION_DAYS = 90      # raw snapshots kept after they are rolled up
+HOURLY_RETENTION_DAYS = 365  # hourly rollups kept; daily and weekly are kept forever
+WATERMARK = "product_snapshots"
+
+# ranges up to this long are drawn from the finer source
+SERIES_SOURCES = ((timedelta(days=2), "raw"), (timedelta(days=30), "hour"),
+                  (timedelta(days=400), "day"))
+
+ROLLUP_COLUMNS = ["platform", "product_id", "period", "bucket_start", "open", "high", "low",
+                  "close", "min_discount", "count", "open_at", "close_at"]
+
+# ---------------- ROLLUP ----------------
+
+def bucket_starts(scraped_at, period):
+    if period == "hour":
+        return scraped_at.dt.floor("h")
+    if period == "day":
+        return scraped_at.dt.floor("D")
+    return (scraped_at - pd.to_timedelta(scraped_at.dt.weekday, unit="D")).dt.floor("D")  # Monday
+
+def aggregate(snapshots):
+    """Rollup rows (all periods) of a snapshot DataFrame with scraped_at / price / discount_pct"""
+    snaps = snapshots.dropna(subset=["price", "scraped_at"])
+    if snaps.empty:
+        return []
+    snaps = snaps.assign(scraped_at=pd.to_datetime(snaps["scraped_at"])).sort_values("scraped_at")
+    out = []
+    for period in PERIODS:
+        g = snaps.assign(bucket_start=bucket_starts(snaps["scraped_at"], period)) \
+                 .groupby(["platform", "product_id", "bucket_start"], sort=False)
+        agg = g.agg(open=("price", "first"), high=("price", "max"), low=("price", "min"),
+                    close=("price", "last"), min_discount=("discount_pct", "min"),
+                    count=("price", "size"), open_at=("scraped_at", "first"),
+                    close_at=("scraped_at", "last")).reset_index()
+        agg["period"] = period
+        out.append(agg)
+    rows = pd.concat(out, ignore_index=True)[ROLLUP_COLUMNS]
+    rows = rows.astype(object).where(rows.notna(), None)
+    for col in ("bucket_start", "open_at", "close_at"):
+        rows[col] = [ts.to_pydatetime() for ts in rows[col]]
+    return rows.to_dict("records")
+
+def _greatest(a, b):
+    # SQLite's max()/min() return NULL if either side is NULL
+    return func.max(func.coalesce(a, b), func.coalesce(b, a))
+
+def _least(a, b):
+    return func.min(func.coalesce(a, b), func.coalesce(b, a))
+
+def _merge(session, rows):
+    """Upsert rollup rows, combining them with buckets that already exist"""
+    stmt = insert(PriceRollup)
+    new, old = stmt.excluded, PriceRollup
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["platform", "product_id", "period", "bucket_start"],
+        set_={
+            "open": case((new.open_at < old.open_at, new.open), else_=old.open),
+            "open_at": _least(old.open_at, new.open_at),
+            "close": case((new.close_at >= old.close_at, new.close), else_=old.close),
+            "close_at": _greatest(old.close_at, new.close_at),
+            "high": _greatest(old.high, new.high),
+            "low": _least(old.low, new.low),
+            "min_discount": _least(old.min_discount, new.min_discount),
+            "count": old.count + new.count,
+        })
+    for start in range(0, len(rows), 1000):
+        session.execute(stmt, rows[start:start + 1000])
+
+def watermark():
+    with ReadSession() as s:
+        return s.execute(select(RollupWatermark.last_id)
+                         .where(RollupWatermark.name == WATERMARK)).scalar() or 0
+
+def rollup(batch=BATCH):
+    """Fold snapshots added since the last run into the rollups; returns snapshots processed"""
+    processed = 0
+    last_id = watermark()
+    P = ProductSnapshot
+    while True:
+        with ReadSession() as s:
+            chunk = s.execute(select(P.id, P.platform, P.product_id, P.price, P.discount_pct,
+                                     P.scraped_at)
+                              .where(P.id > last_id).order_by(P.id).limit(batch)).all()
+        if not chunk:
+            break
+        snaps = pd.DataFrame(chunk, columns=["id", "platform", "product_id", "price",
+                                             "discount_pct", "scraped_at"])
+        rows = aggregate(snaps)
+        last_id = int(snaps["id"].iloc[-1])
+
+        def job(session, rows=rows, last_id=last_id):
+            # rollups and watermark move together, so a crash never double counts
+            _merge(session, rows)
+            wm = insert(RollupWatermark).values(name=WATERMARK, last_id=last_id)
+            session.execute(wm.on_conflict_do_update(index_elements=["name"],
+                                                     set_={"last_id": wm.excluded.last_id}))
+        write(job)
+        processed += len(snaps)
+    return processed
+
+# ---------------- RETENTION ----------------
+
+def compact(raw_days=RAW_RETENTION_DAYS, hourly_days=HOURLY_RETENTION_DAYS, now=None):
+    """Delete rolled-up raw snapshots and hourly buckets past retention; returns counts.
+
+    Only snapshots at or below the watermark are removed, so nothing is lost
+    that the rollups do not cover. The snapshot with the highest id is always
+    kept: SQLite hands out MAX(id) + 1 to the next insert, so deleting it would
+    let new snapshots reuse ids at or below the watermark and never be rolled
+    up. Payload blobs no snapshot refers to any more are dropped too.
+    """
+    rollup()
+    now = now or datetime.now()
+    last_id = watermark()
+    P = ProductSnapshot
+
+    def job(session):
+        newest = session.execute(select(func.max(P.id))).scalar() or 0
+        raw = session.execute(delete(P).where(P.id <= min(last_id, newest - 1),
+                                              P.scraped_at < now - timedelta(days=raw_days))).rowcount
+        hourly = session.execute(delete(PriceRollup).where(
+            PriceRollup.period == "hour",
+            PriceRollup.bucket_start < now - timedelta(days=hourly_days))).rowcount
+        used = union(select(P.raw_hash).where(P.raw_hash.is_not(None)),
+                     select(P.promotions_hash).where(P.promotions_hash.is_not(None)))
+        blobs = session.execute(delete(PayloadBlob).where(PayloadBlob.hash.not_in(used))).rowcount
+        return {"snapshots": raw, "hourly_rollups": hourly, "payload_blobs": blobs}
+    removed = write(job)
+    print(f"🧹 Retention removed {removed['snapshots']} raw snapshots (> {raw_days} days), "
+          f"{removed['hourly_rollups']} hourly rollups, {removed['payload_blobs']} payload blobs")
+    return removed
+
+# ---------------- READ ----------------
+
+def load_rollups(period="day", platform=None, product_ids=None, start=None, end=None):
+    """Rollup rows of one period as a DataFrame, oldest bucket first"""
+    R = PriceRollup
+    q = select(*(getattr(R, c) for c in ROLLUP_COLUMNS)).where(R.period == period)
+    if platform is not None:
+        q = q.where(R.platform == platform)
+    if product_ids is not None:
+        q = q.where(R.product_id.in_(list(product_ids)))
+    if start is not None:
+        first = bucket_starts(pd.Series([pd.Timestamp(start)]), period)[0]
+        q = q.where(R.bucket_start >= first.to_pydatetime())
+    if end is not None:
+        q = q.where(R.bucket_start <= pd.Timestamp(end).to_pydatetime())
+    with ReadSession() as s:
+        rows = s.execute(q.order_by(R.product_id, R.bucket_start)).all()
+    return pd.DataFrame(rows, columns=ROLLUP_COLUMNS)
+
+def price_series(product_ids, start, end=None, platform="flipkart", period=None):
+    """Price history of products between start and end at a resolution that suits the range.
+
+    Short ranges come from the raw snapshots, longer ones from hourly, daily
+    or weekly rollups (or pass period). Columns are those of the rollups.
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end or datetime.now())
+    if period is None:
+        period = next((p for span, p in SERIES_SOURCES if end - start <= span), "week")
+    if period != "raw":
+        return load_rollups(period, platform, product_ids, start, end)
+    P = ProductSnapshot
+    q = (select(P.platform, P.product_id, P.price, P.discount_pct, P.scraped_at)
+         .where(P.platform == platform, P.product_id.in_(list(product_ids)),
+                P.scraped_at >= start.to_pydatetime(), P.scraped_at <= end.to_pydatetime(),
+                P.price.is_not(None))
+         .order_by(P.product_id, P.scraped_at))
+    with ReadSession() as s:
+        raw = pd.DataFrame(s.execute(q).all(),
+                           columns=["platform", "product_id", "price", "discount_pct", "scraped_at"])
+    return raw.assign(period="raw", bucket_start=raw["scraped_at"], open=raw["price"],
+                      high=raw["price"], low=raw["price"], close=raw["price"],
+                      min_discount=raw["discount_pct"], count=1, open_at=raw["scraped_at"],
+                      close_at=raw["scraped_at"])[ROLLUP_COLUMNS]
+
+def print_rollup_stats():
+    with ReadSession() as s:
+        counts = dict(s.execute(select(PriceRollup.period, func.count())
+                                .group_by(PriceRollup.period)).all())
+        pending = s.execute(select(func.count()).where(ProductSnapshot.id > watermark())).scalar()
+    print("📊 Rollups: " + ", ".join(f"{p} {counts.get(p, 0)}" for p in PERIODS)
+          + f" ({pending} snapshots not rolled up yet)")
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "compact":
+        compact()
+    else:
+        print(f"📊 Rolled up {rollup()} new snapshots")
+    print_rollup_stats()
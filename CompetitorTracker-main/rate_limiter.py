@@ -0,0 +1,152 @@
+#rate_limiter.py
+
+import os
+import json
+import time
+import asyncio
+import threading
+from urllib.parse import urlparse
+
+# ---------------- CONFIG ----------------
+START_RATE = 2.0         # requests/sec per host at start
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+RATE_STEP = 0.5          # additive increase per fast response (req/sec)
+BACKOFF = 0.5            # multiplicative decrease on 429 / 5xx / timeout
+START_CONCURRENCY = 2    # in-flight requests per host at start
+MAX_CONCURRENCY = 16
+FAST_LATENCY = 2.0       # responses faster than this (sec) count as "fast"
+RATE_FILE = "data/rate_limiter.json"
+
+# ---------------- PER-HOST STATE ----------------
+
+class HostLimiter:
+    """Token bucket plus AIMD concurrency window for one host"""
+
+    def __init__(self, rate=START_RATE, concurrency=START_CONCURRENCY, max_rate=MAX_RATE):
+        self.rate = rate
+        self.max_rate = max_rate
+        self.window = float(concurrency)
+        self.tokens = 1.0
+        self.updated = time.monotonic()
+        self.in_flight = 0
+        self.requests = 0
+        self.throttled = 0
+        self.recent = []        # start times of the last requests, for the observed rate
+
+    def _refill(self, now):
+        burst = max(1.0, self.rate)
+        self.tokens = min(burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_acquire(self):
+        """Take a token and a slot; returns 0 on success or seconds to wait"""
+        now = time.monotonic()
+        self._refill(now)
+        if self.in_flight >= int(self.window):
+            return 0.05
+        if self.tokens < 1.0:
+            return (1.0 - self.tokens) / self.rate
+        self.tokens -= 1.0
+        self.in_flight += 1
+        self.requests += 1
+        self.recent.append(now)
+        if len(self.recent) > 50:
+            self.recent.pop(0)
+        return 0
+
+    def release(self, status, latency):
+        self.in_flight -= 1
+        if status is None or status == 429 or status >= 500:
+            # multiplicative decrease; drop queued tokens so the next request waits
+            self.throttled += 1
+            self.rate = max(MIN_RATE, self.rate * BACKOFF)
+            self.window = max(1.0, self.window * BACKOFF)
+            self.tokens = min(self.tokens, 0.0)
+        elif status < 400 and latency <= FAST_LATENCY:
+            # additive increase
+            self.rate = min(self.max_rate, self.rate + RATE_STEP)
+            self.window = min(MAX_CONCURRENCY, self.window + 1.0 / self.window)
+
+    def observed_rate(self):
+        if len(self.recent) < 2:
+            return 0.0
+        span = time.monotonic() - self.recent[0]
+        return (len(self.recent) - 1) / span if span else 0.0
+
+# ---------------- LIMITER ----------------
+
+class AdaptiveRateLimiter:
+    """Per-host token-bucket limiter with AIMD rate and concurrency control.
+
+    Shared by threads (``wait``) and asyncio tasks (``wait_async``). Every
+    acquired slot must be handed back with ``done(url, status, latency)``;
+    pass ``status=None`` for timeouts and network errors.
+    """
+
+    def __init__(self, rate=START_RATE, concurrency=START_CONCURRENCY, max_rate=MAX_RATE):
+        self.start_rate = rate
+        self.start_concurrency = concurrency
+        self.max_rate = max_rate
+        self.hosts = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlparse(url).netloc
+        if host not in self.hosts:
+            self.hosts[host] = HostLimiter(self.start_rate, self.start_concurrency, self.max_rate)
+        return self.hosts[host]
+
+    def _try(self, url):
+        with self.lock:
+            return self._host(url).try_acquire()
+
+    def wait(self, url):
+        """Block the calling thread until a request to url may start"""
+        while True:
+            delay = self._try(url)
+            if not delay:
+                return time.monotonic()
+            time.sleep(delay)
+
+    async def wait_async(self, url):
+        """Async version of wait()"""
+        while True:
+            delay = self._try(url)
+            if not delay:
+                return time.monotonic()
+            await asyncio.sleep(delay)
+
+    def done(self, url, status, latency):
+        """Report the outcome of a request started with wait()/wait_async()"""
+        with self.lock:
+            self._host(url).release(status, latency)
+
+    def current_rate(self, url):
+        """Allowed request rate (req/sec) for url's host"""
+        with self.lock:
+            return self._host(url).rate
+
+    def snapshot(self):
+        """Current limiter state per host"""
+        with self.lock:
+            return {host: {"rate": round(h.rate, 2),
+                           "observed_rate": round(h.observed_rate(), 2),
+                           "concurrency": int(h.window),
+                           "in_flight": h.in_flight,
+                           "requests": h.requests,
+                           "throttled": h.throttled}
+                    for host, h in self.hosts.items()}
+
+    def export(self, path=RATE_FILE):
+        """Write snapshot() to a JSON file for dashboards / monitoring"""
+        snap = self.snapshot()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"updated_at": time.time(), "hosts": snap}, f, indent=2)
+        return snap
+
+def print_limiter_stats(limiter):
+    for host, s in limiter.snapshot().items():
+        print(f"🚦 {host}: {s['rate']} req/sec allowed, {s['observed_rate']} observed, "
+              f"concurrency {s['concurrency']}, {s['requests']} requests, {s['throttled']} throttled")
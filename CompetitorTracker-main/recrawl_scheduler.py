@@ -0,0 +1,163 @@
+#recrawl_scheduler.py
+# Decides which products get their product + review pages crawled on a run.
+# Each product's recrawl interval comes from how often its price, discount
+# and reviews changed recently (ProductSnapshot history in db.py); due
+# products are then taken in priority order until the run's page budget is
+# spent. Listing pages are always crawled, so every run still snapshots the
+# price of every listed product.
+
+import re
+import math
+from datetime import datetime, timedelta
+
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert
+
+from db import ReadSession, ProductSnapshot, ProductSchedule, write
+from storage import save_snapshots_to_db
+
+# ---------------- CONFIG ----------------
+PLATFORM = "flipkart"
+HISTORY_DAYS = 30            # snapshot history used for volatility
+MIN_INTERVAL_HOURS = 6
+MAX_INTERVAL_HOURS = 24 * 14
+REVIEWS_PER_CHANGE = 10      # a page worth of new reviews counts as one change
+VELOCITY_SMOOTHING = 0.5     # weight of the latest run in the review velocity
+REVIEWS_PER_PAGE = 10
+PAGE_BUDGET = 300            # product + review page loads per run (listing pages included)
+
+# ---------------- SNAPSHOTS ----------------
+
+def _num(text):
+    digits = re.sub(r"[^\d.]", "", str(text)) if text is not None else ""
+    return float(digits) if digits else None
+
+def record_snapshots(rows, platform=PLATFORM):
+    """Store one ProductSnapshot per listing row; returns the number written"""
+    # scraped_at has its own column; leaving it out of raw lets an unchanged
+    # listing reuse the payload blob of the previous run
+    return save_snapshots_to_db(
+        (platform, row["productid"], {"title": row["mobilename"], "price": _num(row["sellingprice"]),
+                                      "list_price": _num(row["mrp"]),
+                                      "discount_pct": _num(row["discountoffering"]),
+                                      "scraped_at": datetime.fromisoformat(row["scraped_at"]),
+                                      "raw": {k: v for k, v in row.items() if k != "scraped_at"}})
+        for row in rows if row.get("productid"))
+
+def load_history(product_ids, platform=PLATFORM, days=HISTORY_DAYS, now=None):
+    """Recent (product_id, price, discount_pct, scraped_at) snapshots as a DataFrame"""
+    since = (now or datetime.now()) - timedelta(days=days)
+    q = (select(ProductSnapshot.product_id, ProductSnapshot.price,
+                ProductSnapshot.discount_pct, ProductSnapshot.scraped_at)
+         .where(ProductSnapshot.platform == platform,
+                ProductSnapshot.product_id.in_(list(product_ids)),
+                ProductSnapshot.scraped_at >= since))
+    with ReadSession() as s:
+        rows = s.execute(q).all()
+    return pd.DataFrame(rows, columns=["product_id", "price", "discount_pct", "scraped_at"])
+
+def change_rates(history):
+    """Price and discount changes per day for each product in the history"""
+    if history.empty:
+        return pd.DataFrame(columns=["price_changes_per_day", "discount_changes_per_day"])
+    h = history.sort_values(["product_id", "scraped_at"])
+    g = h.groupby("product_id")
+    h = h.assign(price_changed=g["price"].diff().fillna(0).ne(0),
+                 discount_changed=g["discount_pct"].diff().fillna(0).ne(0))
+    g = h.groupby("product_id")
+    span_days = ((g["scraped_at"].max() - g["scraped_at"].min()).dt.total_seconds() / 86400).clip(lower=1)
+    return pd.DataFrame({
+        "price_changes_per_day": g["price_changed"].sum() / span_days,
+        "discount_changes_per_day": g["discount_changed"].sum() / span_days,
+    })
+
+def interval_hours(changes_per_day):
+    """Recrawl about once per expected change, within the configured bounds"""
+    if changes_per_day <= 0:
+        return MAX_INTERVAL_HOURS
+    return min(max(24 / changes_per_day, MIN_INTERVAL_HOURS), MAX_INTERVAL_HOURS)
+
+# ---------------- SCHEDULER ----------------
+
+class RecrawlScheduler:
+    """Plans which products to visit this run and learns from what each visit found"""
+
+    def __init__(self, platform=PLATFORM, page_budget=PAGE_BUDGET, review_pages=2, now=None):
+        self.platform = platform
+        self.page_budget = page_budget
+        self.review_pages = review_pages
+        self.now = now or datetime.now()
+        self.intervals = {}
+        self.stats = {"products": 0, "due": 0, "selected": 0, "planned_pages": 0}
+
+    def _schedules(self, product_ids):
+        q = (select(ProductSchedule.product_id, ProductSchedule.last_crawled,
+                    ProductSchedule.review_velocity)
+             .where(ProductSchedule.platform == self.platform,
+                    ProductSchedule.product_id.in_(list(product_ids))))
+        with ReadSession() as s:
+            return {pid: (last, velocity or 0.0) for pid, last, velocity in s.execute(q)}
+
+    def plan(self, product_ids):
+        """Interval, priority and estimated page cost of every product"""
+        product_ids = list(dict.fromkeys(product_ids))
+        rates = change_rates(load_history(product_ids, self.platform, now=self.now))
+        schedules = self._schedules(product_ids)
+        plans = []
+        for pid in product_ids:
+            last, velocity = schedules.get(pid, (None, 0.0))
+            price_rate = rates["price_changes_per_day"].get(pid, 0.0)
+            discount_rate = rates["discount_changes_per_day"].get(pid, 0.0)
+            interval = interval_hours(price_rate + discount_rate + velocity / REVIEWS_PER_CHANGE)
+            if last is None:
+                overdue = math.inf
+                review_pages = self.review_pages
+            else:
+                hours = (self.now - last).total_seconds() / 3600
+                overdue = hours / interval
+                expected = velocity * hours / 24
+                review_pages = min(self.review_pages, max(1, math.ceil(expected / REVIEWS_PER_PAGE)))
+            plans.append({"product_id": pid, "interval_hours": interval, "overdue": overdue,
+                          "pages": 1 + review_pages})
+        return pd.DataFrame(plans, columns=["product_id", "interval_hours", "overdue", "pages"])
+
+    def select(self, product_ids, pages_used=0):
+        """Due products, most overdue first, that fit in what is left of the page budget"""
+        plans = self.plan(product_ids)
+        due = plans[plans["overdue"] >= 1].sort_values("overdue", ascending=False, kind="stable")
+        selected = []
+        budget = self.page_budget - pages_used
+        for pid, pages in zip(due["product_id"], due["pages"]):
+            if pages <= budget:
+                selected.append(pid)
+                budget -= pages
+        self.intervals = dict(zip(plans["product_id"], plans["interval_hours"]))
+        self.stats.update(products=len(plans), due=len(due), selected=len(selected),
+                          planned_pages=self.page_budget - pages_used - budget)
+        return selected
+
+    def record_crawl(self, new_reviews):
+        """Update last-crawl time and review velocity from {product_id: new review count}"""
+        if not new_reviews:
+            return
+        schedules = self._schedules(new_reviews)
+        values = []
+        for pid, count in new_reviews.items():
+            last, velocity = schedules.get(pid, (None, 0.0))
+            if last is not None:
+                days = max((self.now - last).total_seconds() / 86400, 1 / 24)
+                velocity = VELOCITY_SMOOTHING * count / days + (1 - VELOCITY_SMOOTHING) * velocity
+            values.append({"platform": self.platform, "product_id": pid,
+                           "last_crawled": self.now, "review_velocity": velocity,
+                           "interval_hours": self.intervals.get(pid)})
+        stmt = insert(ProductSchedule).values(values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["platform", "product_id"],
+            set_={c: stmt.excluded[c] for c in ("last_crawled", "review_velocity", "interval_hours")})
+        write(lambda s: s.execute(stmt))
+
+def print_schedule_stats(scheduler):
+    s = scheduler.stats
+    print(f"🗓 Scheduler: {s['due']}/{s['products']} products due, {s['selected']} selected "
+          f"(~{s['planned_pages']} pages of a {scheduler.page_budget}-page budget)")
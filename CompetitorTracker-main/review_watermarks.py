@@ -0,0 +1,81 @@
+#review_watermarks.py
+# Per-product record of the newest reviews already collected, so the review
+# paginator can stop as soon as it reaches reviews from an earlier run.
+
+import os
+import json
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+
+# ---------------- CONFIG ----------------
+WATERMARK_FILE = os.path.join("data", "review_watermarks.json")
+KEEP_HASHES = 200          # newest review hashes remembered per product
+RECENT_SORT = "sortOrder=MOST_RECENT"   # review pages must be newest-first for early stop
+
+# ---------------- FUNCTIONS ----------------
+
+def review_hash(productid, userid, review):
+    """Stable id for a review; relative dates are left out because they drift daily"""
+    key = f"{productid}\x1f{userid}\x1f{str(review).strip()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+def recent_first(reviews_url):
+    """Add the newest-first sort to a product-reviews URL"""
+    if RECENT_SORT in reviews_url:
+        return reviews_url
+    return reviews_url + ("&" if "?" in reviews_url else "?") + RECENT_SORT
+
+class ReviewWatermarks:
+    """JSON-backed {productid: newest review hashes} store (path=None keeps it in memory)"""
+
+    def __init__(self, path=WATERMARK_FILE):
+        self.path = path
+        self.marks = {}
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.marks = json.load(f)
+
+    def known(self, productid):
+        return set(self.marks.get(str(productid), {}).get("hashes", []))
+
+    def filter_new(self, productid, rows):
+        """Split one newest-first review page at the first already-known review.
+
+        Returns (new_rows, reached) where reached is True once the page hit
+        the watermark and pagination should stop.
+        """
+        known = self.known(productid)
+        if not known:
+            return rows, False
+        for i, row in enumerate(rows):
+            if review_hash(productid, row["userid"], row["review"]) in known:
+                return rows[:i], True
+        return rows, False
+
+    def advance(self, productid, new_rows):
+        """Move the watermark past new_rows (newest first)"""
+        if not new_rows:
+            return
+        fresh = [review_hash(productid, r["userid"], r["review"]) for r in new_rows]
+        old = self.marks.get(str(productid), {}).get("hashes", [])
+        merged = list(dict.fromkeys(fresh + old))[:KEEP_HASHES]
+        self.marks[str(productid)] = {"hashes": merged, "updated_at": datetime.now().isoformat()}
+
+    def seed_from_csv(self, review_file):
+        """Build watermarks from an existing review.csv (later rows = newer)"""
+        if self.marks or not os.path.exists(review_file):
+            return
+        df = pd.read_csv(review_file, usecols=["productid", "userid", "review"], dtype=str)
+        for productid, group in df.groupby("productid", sort=False):
+            rows = group.iloc[::-1].head(KEEP_HASHES).to_dict("records")
+            self.advance(productid, rows)
+        print(f"🔖 Seeded review watermarks for {len(self.marks)} products from {review_file}")
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.marks, f)
+        os.replace(tmp, self.path)
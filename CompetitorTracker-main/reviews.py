@@ -1,97 +1,148 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException
-from bs4 import BeautifulSoup
+import os
+import argparse
 import pandas as pd
 
-print("--- Starting Review Scraper ---")
+from browser import make_driver, load_page, print_transfer_stats
+from sqlalchemy import create_engine
+from crawl_frontier import CrawlFrontier, print_frontier_stats
+from page_archive import PageArchive, ReplayDriver, print_archive_stats
+from extractors import parse_product_links, parse_product_details, parse_review_link, parse_review_details
+from rate_limiter import AdaptiveRateLimiter, print_limiter_stats
 
-# --- Setup Selenium Webdriver ---
-options = webdriver.ChromeOptions()
-options.add_argument("--headless")
-options.add_argument("--log-level=3")
-options.add_experimental_option('excludeSwitches', ['enable-logging'])
-driver = webdriver.Chrome(options=options)
+SEARCH_URL = "https://www.flipkart.com/search?q=mobiles&page={}"
+SEARCH_PAGES = 3
+REVIEW_PAGES = 3     # review pages per product
+REVIEW_COLUMNS = ["ProductName", "ReviewerName", "Rating", "Title", "ReviewText"]
 
-# --- Step 1: Get UNIQUE product links from the first 3 search pages ---
-product_links = set() # Using a set to automatically avoid duplicate product links
-for page_number in range(1, 4):
-    search_url = f"https://www.flipkart.com/search?q=mobiles&page={page_number}"
-    print(f" Getting product links from search page {page_number}...")
-    driver.get(search_url)
+def crawl_search_page(driver, frontier, item, limiter=None, archive=None):
+    """Step 1: Queue the product links of one search page"""
+    url_id, url, _ = item
+    print(f" Getting product links from {url}...")
+    html = load_page(driver, url, "CGtC98", limiter=limiter, archive=archive)
+    if html is None:
+        print(f"Could not find product links on {url}. Will retry.")
+        frontier.failed(url_id, "search page did not load")
+        return
+    frontier.add(parse_product_links(html, strip_query=False), "product")
+    frontier.done(url_id)
 
-    try:
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CLASS_NAME, "CGtC98")))
-    except TimeoutException:
-        print(f"Could not find product links on page {page_number}. Moving on.")
-        continue
+def crawl_product_page(driver, frontier, item, limiter=None, archive=None):
+    """Step 2: Find a product's 'All reviews' link and queue its first review page"""
+    url_id, link, _ = item
+    html = load_page(driver, link, "VU-ZEz", limiter=limiter, archive=archive)
+    if html is None:
+        frontier.failed(url_id, "product page did not load")
+        return
+    all_reviews_url = parse_review_link(html)
+    if all_reviews_url:
+        product_name = parse_product_details(html, link)["Product"]
+        print(f"\nScraping reviews for: {product_name}")
+        frontier.add([f"{all_reviews_url}&page=1"], "review_page",
+                     payload={"product_name": product_name, "reviews_url": all_reviews_url,
+                              "page": 1})
+    else:
+        print(f"Could not find an 'All reviews' link for a product. Skipping.")
+    frontier.done(url_id)
 
-    soup = BeautifulSoup(driver.page_source, "lxml")
-    products = soup.find_all("div", {"class": "_75nlfW"}) 
-    for product in products:
-        link_tag = product.find("a", {"class": "CGtC98"})
-        if link_tag and 'href' in link_tag.attrs:
-            product_links.add("https://www.flipkart.com" + link_tag['href'])
+def crawl_review_page(driver, frontier, item, limiter=None, archive=None):
+    """Step 3: Store one page of reviews and queue the next page"""
+    url_id, url, payload = item
+    page_html = load_page(driver, url, "cPHDOP", limiter=limiter, archive=archive)
+    if page_html is None:
+        print(f"  -> No more reviews found on page {payload['page']}.")
+        frontier.done(url_id)
+        return
+    rows = parse_review_details(page_html, payload["product_name"])
+    if payload["page"] < REVIEW_PAGES:
+        next_page = payload["page"] + 1
+        frontier.add([f"{payload['reviews_url']}&page={next_page}"], "review_page",
+                     payload=dict(payload, page=next_page))
+    frontier.done(url_id, [("review_details", row) for row in rows])
 
-print(f"\nFound {len(product_links)} unique products to scrape reviews from.")
+STEPS = {"search": crawl_search_page, "product": crawl_product_page,
+         "review_page": crawl_review_page}
 
-# --- Step 2: Iterate through each unique link and scrape reviews ---
-all_reviews_data = []
-for link in product_links:
-    try:
-        driver.get(link)
-        wait = WebDriverWait(driver, 10)
-        product_name_tag = wait.until(EC.visibility_of_element_located((By.CLASS_NAME, "VU-ZEz")))
-        product_name = product_name_tag.text.strip()
-        print(f"\nScraping reviews for: {product_name}")
-        
-        all_reviews_link_tag = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "a[href*='/product-reviews/']")))
-        all_reviews_url = all_reviews_link_tag.get_attribute('href')
-        
-        # Scrape the first 3 pages of reviews for each product
-        for page_num in range(1, 4):
-            review_page_url = f"{all_reviews_url}&page={page_num}"
-            driver.get(review_page_url)
-            
+def crawl(driver, frontier, limiter=None, archive=None):
+    """Run (or resume) the crawl; every parsed row is checkpointed in the frontier"""
+    frontier.add([SEARCH_URL.format(page) for page in range(1, SEARCH_PAGES + 1)], "search")
+    for kind, step in STEPS.items():
+        while True:
+            items = frontier.claim(kind, limit=1)
+            if not items:
+                break
             try:
-                wait.until(EC.presence_of_element_located((By.CLASS_NAME, "cPHDOP")))
-            except TimeoutException:
-                print(f"  -> No more reviews found on page {page_num}.")
-                break 
-            
-            review_page_soup = BeautifulSoup(driver.page_source, "lxml")
-            review_containers = review_page_soup.find_all("div", {"class": "cPHDOP"})
-            
-            for review in review_containers:
-                name_tag = review.find("p", {"class": "_2sc7ZR"})
-                reviewer_name = name_tag.get_text(strip=True) if name_tag else "Anonymous"
-                rating_tag = review.find("div", {"class": "_3LWZlK"})
-                rating = rating_tag.get_text(strip=True) if rating_tag else None
-                title_tag = review.find("p", {"class": "_2-N8zT"})
-                review_title = title_tag.get_text(strip=True) if title_tag else ""
-                text_tag = review.find("div", {"class": "ZmyHeo"})
-                review_text = text_tag.get_text(strip=True).replace("READ MORE", "").strip() if text_tag else ""
-                
-                if review_text:
-                    all_reviews_data.append({
-                        "ProductName": product_name, "ReviewerName": reviewer_name,
-                        "Rating": rating, "Title": review_title, "ReviewText": review_text
-                    })
-    except TimeoutException:
-        print(f"Could not find an 'All reviews' link for a product. Skipping.")
-    except Exception as e:
-        print(f"An unexpected error occurred: {e}")
+                step(driver, frontier, items[0], limiter, archive)
+            except Exception as e:
+                print(f"An unexpected error occurred: {e}")
+                frontier.failed(items[0][0], e)
+        if kind == "search":
+            products = frontier.counts(kind="product").get("pending", 0)
+            print(f"\nFound {products} unique products to scrape reviews from.")
 
-driver.quit()
+def save_reviews(all_reviews_data, append=False):
+    """Step 3: Save the collected review data to a CSV file (merged with the old file if append)"""
+    save_path = "flipkart_reviews_unique.csv"
+    if all_reviews_data:
+        df = pd.DataFrame(all_reviews_data)
+        if append and os.path.exists(save_path):
+            df = pd.concat([pd.read_csv(save_path), df], ignore_index=True)
+        df.drop_duplicates(subset=['ProductName', 'ReviewText'], inplace=True)
+        df.to_csv(save_path, index=False, encoding="utf-8-sig")
+        print(f"\n✅ REVIEW SCRAPING COMPLETE. Scraped {len(df)} unique reviews. Saved to {save_path}")
+    else:
+        print("\nNo reviews were scraped.")
 
-# --- Step 3: Save the collected review data to a CSV file ---
-if all_reviews_data:
-    df = pd.DataFrame(all_reviews_data)
-    df.drop_duplicates(subset=['ProductName', 'ReviewText'], inplace=True)
+def export_reviews(frontier):
+    """Stream the checkpointed reviews into the CSV, de-duplicated"""
     save_path = "flipkart_reviews_unique.csv"
-    df.to_csv(save_path, index=False, encoding="utf-8-sig")
-    print(f"\n✅ REVIEW SCRAPING COMPLETE. Scraped {len(df)} unique reviews. Saved to {save_path}")
-else:
-    print("\nNo reviews were scraped.")
\ No newline at end of file
+    written = frontier.export_csv("review_details", save_path, REVIEW_COLUMNS,
+                                  dedupe=["ProductName", "ReviewText"])
+    print(f"\n✅ REVIEW SCRAPING COMPLETE. Scraped {written} unique reviews. Saved to {save_path}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Flipkart review scraper")
+    parser.add_argument("--restart", action="store_true",
+                        help="drop an interrupted crawl instead of resuming it")
+    parser.add_argument("--archive", action="store_true",
+                        help="store every loaded page in the raw HTML archive")
+    parser.add_argument("--replay", nargs="?", const="", metavar="UNTIL",
+                        help="rebuild the CSV from the archive (newest captures, optionally "
+                             "up to an ISO time) with no browser")
+    args = parser.parse_args()
+
+    if args.replay is not None:
+        print("--- Replaying Review Scraper from the page archive ---")
+        frontier = CrawlFrontier("reviews-replay", engine=create_engine("sqlite://"))
+        driver = ReplayDriver(PageArchive(), until=args.replay or None)
+        crawl(driver, frontier)
+        print(f"⏱ {driver.stats['requests']} archived pages parsed at "
+              f"{driver.pages_per_sec():.1f} pages/sec")
+        export_reviews(frontier)
+        return
+
+    print("--- Starting Review Scraper ---")
+    frontier = CrawlFrontier("reviews")
+    if args.restart:
+        frontier.clear()
+    counts = frontier.resume()
+    if counts:
+        print(f"🔁 Resuming interrupted crawl: {counts}")
+
+    driver = make_driver()
+    limiter = AdaptiveRateLimiter()
+    archive = PageArchive() if args.archive else None
+    try:
+        crawl(driver, frontier, limiter, archive)
+    finally:
+        driver.quit()
+    print_limiter_stats(limiter)
+    print_transfer_stats([driver.transfer_stats])
+    print_frontier_stats(frontier)
+    if archive is not None:
+        print_archive_stats(archive)
+    limiter.export()
+    export_reviews(frontier)
+    frontier.clear()
+
+if __name__ == "__main__":
+    main()
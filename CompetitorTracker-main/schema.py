@@ -0,0 +1,81 @@
+#schema.py
+# Column dtypes shared by everything that loads our CSVs. Names, ids and
+# sources repeat on every row, so they are read as categoricals (one copy of
+# each distinct string); free text is stored as Arrow-backed strings instead
+# of Python objects; ratings, discounts and scores are downcast (float32, or
+# the smallest integer type for whole numbers). Money columns stay float64:
+# float32 keeps about 7 significant digits, so a price above ₹1,00,000 would
+# lose its paise.
+#
+#   df = schema.read_csv("data/cleaned_reviews.csv")
+#   df = schema.apply(df)     # a frame loaded some other way
+
+import pandas as pd
+
+# ---------------- CONFIG ----------------
+CATEGORY_COLUMNS = ["source", "platform", "productid", "product_id", "mobilename", "ProductName",
+                    "Product", "Product Name", "product_name", "Category", "Brand", "sentiment"]
+TEXT_COLUMNS = ["review", "ReviewText", "review_text", "userid", "url", "URL", "Image_URL", "title"]
+# prices (sellingprice, mrp, price, list_price, Price (₹), Predicted Price) are left as read
+NUMBER_COLUMNS = ["discountoffering", "rating", "Rating", "discount_pct", "Discount (%)",
+                  "sentiment_score"]
+
+TEXT_DTYPE = "string[pyarrow]"
+NUMBER_DTYPE = "float32"
+
+def dtypes(columns, text=True):
+    """read_csv dtype= for the known columns among columns"""
+    out = {c: "category" for c in columns if c in CATEGORY_COLUMNS}
+    if text:
+        out.update({c: TEXT_DTYPE for c in columns if c in TEXT_COLUMNS})
+    return out
+
+def downcast(df):
+    """Known rating / discount / score columns that parsed as numbers -> float32, or the
+    smallest int type for whole numbers (prices and columns that did not parse are left as read)"""
+    for c in df.columns.intersection(NUMBER_COLUMNS):
+        if pd.api.types.is_bool_dtype(df[c]) or not pd.api.types.is_numeric_dtype(df[c]):
+            continue
+        if pd.api.types.is_integer_dtype(df[c]):
+            df[c] = pd.to_numeric(df[c], downcast="integer")
+        else:
+            df[c] = df[c].astype(NUMBER_DTYPE)
+    return df
+
+def read_csv(path, text=True, numbers=True, **kwargs):
+    """pd.read_csv with the shared dtypes.
+
+    text=False keeps free text as Python strings (for code that edits it row
+    by row); numbers=False skips the float32 downcast.
+    """
+    columns = pd.read_csv(path, nrows=0, encoding=kwargs.get("encoding")).columns
+    kwargs.setdefault("dtype", dtypes(columns, text))
+    df = pd.read_csv(path, **kwargs)
+    if isinstance(df, pd.DataFrame) and numbers:   # not for chunksize= readers
+        downcast(df)
+    return df
+
+def apply(df, text=True, numbers=True):
+    """Convert a loaded DataFrame to the shared dtypes in place"""
+    for c, dtype in dtypes(df.columns, text).items():
+        if df[c].dtype != dtype:
+            df[c] = df[c].astype(dtype)
+    if numbers:
+        downcast(df)
+    return df
+
+def map_text(values, func):
+    """func (a Series string operation) applied like func(values.astype(str)).
+
+    For a categorical only the distinct values are transformed and the result
+    stays categorical. Missing values turn into whatever astype(str) makes of
+    them in this pandas version ("nan" before 3.0, still missing after).
+    """
+    if not isinstance(values.dtype, pd.CategoricalDtype):
+        return func(values.astype(str))
+    missing = pd.Series([float("nan")], dtype=object).astype(str).iloc[0]
+    # code -1 (missing) picks the entry appended last
+    names = pd.Series(list(values.cat.categories.astype(str)) + [missing], dtype=object)
+    codes, uniques = pd.factorize(func(names))
+    return pd.Series(pd.Categorical.from_codes(codes[values.cat.codes.to_numpy()], uniques),
+                     index=values.index, name=values.name)
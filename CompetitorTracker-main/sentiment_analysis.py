@@ -1,6 +1,11 @@
-from transformers import pipeline
 import pandas as pd
 import os
+import argparse
+from sentiment_cache import SentimentCache, normalize, cache_id, CACHE_PATH, MODEL_MAX_LENGTH
+# sentiment_engine (torch / transformers) is imported only when a review misses the cache
+
+MODEL_ID = "cardiffnlp/twitter-roberta-base-sentiment"
+ENGINE_BACKENDS = ["onnx", "torch"]   # sentiment_engine.BACKENDS
 
 # Define label mapping for the CardiffNLP sentiment model
 label_map = {
@@ -9,7 +14,16 @@ label_map = {
     'LABEL_2': 'Positive'
 }
 
-def analyze_sentiment(review_file="data/flipkart_reviews_unique.csv", output_file="data/reviews_with_sentiment.csv"):
+def analyze_sentiment(review_file="data/flipkart_reviews_unique.csv", output_file="data/reviews_with_sentiment.csv",
+                      cache_path=CACHE_PATH, batch_size=None, max_length=MODEL_MAX_LENGTH, threads=None,
+                      backend="torch"):
+    """Label every review; only reviews not in the sentiment cache go through the model.
+
+    The model runs in length-sorted batches (sentiment_engine.py); reviews
+    longer than max_length tokens are truncated. backend="onnx" runs the
+    int8-quantized ONNX export instead of PyTorch. batch_size and threads
+    default to sentiment_engine's BATCH_SIZE and THREADS.
+    """
     # Check if the input file exists
     if not os.path.exists(review_file):
         raise FileNotFoundError(f"❌ File not found: {review_file}")
@@ -21,15 +35,32 @@ def analyze_sentiment(review_file="data/flipkart_reviews_unique.csv", output_fil
     if "ReviewText" not in df.columns:
         raise ValueError("❌ 'ReviewText' column not found in input file.")
 
-    # Load the sentiment analysis model
-    sentiment_model = pipeline("sentiment-analysis", model="cardiffnlp/twitter-roberta-base-sentiment")
+    # Look reviews up in the cache (keyed by model + normalised text)
+    cache = SentimentCache(cache_id(MODEL_ID, max_length, backend), cache_path)
+    texts = [normalize(t) for t in df["ReviewText"]]
+    keys = [cache.key(t) for t in texts]
+    results = cache.get_many(keys)
+    missing = {k: t for k, t in zip(keys, texts) if k not in results}
 
-    # Apply sentiment analysis in batch
-    results = sentiment_model(df["ReviewText"].tolist(), batch_size=32)
+    # Score only the misses, in length-sorted batches; without any, torch and the model are not even imported
+    if missing:
+        import sentiment_engine
+        engine = sentiment_engine.BACKENDS[backend](
+            MODEL_ID, batch_size=batch_size or sentiment_engine.BATCH_SIZE, max_length=max_length,
+            threads=threads or sentiment_engine.THREADS)
+        scored = engine(list(missing.values()))
+        engine.print_stats()
+        new = {k: (r["label"], r["score"]) for k, r in zip(missing, scored)}
+        cache.put_many(new)
+        results.update(new)
+    evicted = cache.evict()
+    cache.close()
+    print(f"🧠 {len(missing)} new reviews scored, {len(df) - sum(k in missing for k in keys)} "
+          f"from the sentiment cache ({evicted} old entries evicted)")
 
     # Extract sentiment label and score
-    df["sentiment"] = [label_map[r["label"]] for r in results]
-    df["sentiment_score"] = [r["score"] for r in results]
+    df["sentiment"] = [label_map[results[k][0]] for k in keys]
+    df["sentiment_score"] = [results[k][1] for k in keys]
 
     # Save the full DataFrame with readable sentiment labels and scores
     df.to_csv(output_file, index=False, encoding="utf-8-sig")
@@ -38,5 +69,10 @@ def analyze_sentiment(review_file="data/flipkart_reviews_unique.csv", output_fil
     return df
 
 if __name__ == "__main__":
-    result_df = analyze_sentiment()
+    parser = argparse.ArgumentParser(description="Label reviews with the CardiffNLP sentiment model")
+    parser.add_argument("--backend", choices=ENGINE_BACKENDS, default="torch",
+                        help="onnx: int8-quantized ONNX model on onnxruntime (faster on CPU)")
+    parser.add_argument("--max-length", type=int, default=MODEL_MAX_LENGTH, help="truncate reviews to this many tokens")
+    args = parser.parse_args()
+    result_df = analyze_sentiment(backend=args.backend, max_length=args.max_length)
     print(result_df[["ReviewText", "sentiment", "sentiment_score"]].head())
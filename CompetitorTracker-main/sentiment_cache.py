@@ -0,0 +1,88 @@
+#sentiment_cache.py
+# On-disk cache of sentiment model results, so a review is scored once per
+# model. Entries are keyed by a 128-bit hash of the model id and the
+# normalised review text, kept in a small SQLite file, and evicted least
+# recently used first once the cache holds more than max_entries.
+
+import os
+import re
+import time
+import sqlite3
+import hashlib
+import unicodedata
+
+# ---------------- CONFIG ----------------
+CACHE_PATH = os.path.join("data", "sentiment_cache.db")
+MAX_ENTRIES = 2_000_000
+BATCH = 500                  # keys per SQL statement
+PAGE_CACHE_MB = 64           # keys are random, so lookups touch pages all over the file
+MODEL_MAX_LENGTH = 512       # tokens the sentiment model reads (RoBERTa's limit)
+_SPACES = re.compile(r"\s+")
+
+def cache_id(model_id, max_length=MODEL_MAX_LENGTH, backend="torch"):
+    """Model id for the sentiment cache; another backend or a shorter truncation can change results"""
+    out = model_id if backend == "torch" else f"{model_id}#{backend}"
+    return out if max_length >= MODEL_MAX_LENGTH else f"{out}@{max_length}"
+
+def normalize(text):
+    """The text that is scored and cached: NFC unicode, whitespace runs collapsed"""
+    return _SPACES.sub(" ", unicodedata.normalize("NFC", str(text))).strip()
+
+class SentimentCache:
+    """(label, score) per review text for one model"""
+
+    def __init__(self, model_id, path=CACHE_PATH, max_entries=MAX_ENTRIES):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(f"PRAGMA cache_size=-{PAGE_CACHE_MB * 1024}")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS sentiment (key BLOB PRIMARY KEY, label TEXT,"
+                          " score REAL, used_at INTEGER) WITHOUT ROWID")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS sentiment_used_at ON sentiment (used_at)")
+        self.today = int(time.time() // 86400)   # LRU resolution: a day
+
+    def key(self, text):
+        """Cache key of an already normalize()d text"""
+        data = f"{self.model_id}\0{text}".encode("utf-8")
+        return hashlib.blake2b(data, digest_size=16).digest()
+
+    def get_many(self, keys):
+        """{key: (label, score)} for the keys in the cache; marks them as used today"""
+        wanted = list(set(keys))
+        found = {}
+        for start in range(0, len(wanted), BATCH):
+            part = wanted[start:start + BATCH]
+            marks = ",".join("?" * len(part))
+            rows = self.conn.execute(f"SELECT key, label, score, used_at FROM sentiment "
+                                     f"WHERE key IN ({marks})", part).fetchall()
+            found.update((k, (label, score)) for k, label, score, _ in rows)
+            stale = [(self.today, k) for k, _, _, used in rows if used < self.today]
+            self.conn.executemany("UPDATE sentiment SET used_at = ? WHERE key = ?", stale)
+        self.conn.commit()
+        return found
+
+    def put_many(self, results):
+        """Store {key: (label, score)}"""
+        self.conn.executemany("INSERT OR REPLACE INTO sentiment VALUES (?, ?, ?, ?)",
+                              ((k, label, float(score), self.today)
+                               for k, (label, score) in results.items()))
+        self.conn.commit()
+
+    def evict(self):
+        """Drop least recently used entries beyond max_entries; returns how many"""
+        extra = len(self) - self.max_entries
+        if extra <= 0:
+            return 0
+        self.conn.execute("DELETE FROM sentiment WHERE key IN "
+                          "(SELECT key FROM sentiment ORDER BY used_at LIMIT ?)", (extra,))
+        self.conn.commit()
+        return extra
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM sentiment").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,139 @@
+#sentiment_engine.py
+# Batched CPU inference for the sentiment model. Reviews are tokenized once,
+# sorted by token length and cut into batches of similar length, so a batch
+# is only padded to its own longest review instead of the longest in file
+# order; results are put back in input order. Runs under torch.inference_mode
+# with a fixed number of intra-op threads.
+#
+# OnnxSentimentEngine is an optional faster backend: the model is exported
+# to ONNX once, its weights quantized to int8, and run with onnxruntime
+# (only needed for that backend).
+#
+#   python sentiment_engine.py export    # write the int8 ONNX model ahead of time
+
+import os
+import sys
+import time
+
+import numpy as np
+import torch
+from transformers import AutoConfig, AutoTokenizer, AutoModelForSequenceClassification
+
+from sentiment_cache import MODEL_MAX_LENGTH
+
+# ---------------- CONFIG ----------------
+BATCH_SIZE = 32
+MAX_LENGTH = MODEL_MAX_LENGTH   # tokens; lower it to trade long-review accuracy for speed
+THREADS = os.cpu_count() or 1
+ONNX_DIR = os.path.join("data", "onnx")
+ONNX_OPSET = 17
+
+class SentimentEngine:
+    """Drop-in for pipeline("sentiment-analysis", model=model_id) on a list of texts"""
+
+    def __init__(self, model_id, batch_size=BATCH_SIZE, max_length=MAX_LENGTH, threads=THREADS):
+        self.model_id = model_id
+        self.batch_size = batch_size
+        self.max_length = max_length
+        self.threads = threads
+        torch.set_num_threads(threads)
+        try:
+            torch.set_num_interop_threads(1)   # one model call at a time; only allowed once per process
+        except RuntimeError:
+            pass
+        self.tokenizer = AutoTokenizer.from_pretrained(model_id)
+        self.labels = AutoConfig.from_pretrained(model_id).id2label
+        self.stats = {}
+        self._load()
+
+    def _load(self):
+        self.model = AutoModelForSequenceClassification.from_pretrained(self.model_id).eval()
+
+    def _logits(self, batch):
+        with torch.inference_mode():
+            return self.model(**batch).logits
+
+    def __call__(self, texts):
+        """[{"label", "score"}] per text, in input order"""
+        start = time.perf_counter()
+        encoded = self.tokenizer(list(texts), truncation=True, max_length=self.max_length)
+        lengths = np.array([len(ids) for ids in encoded["input_ids"]])
+        order = np.argsort(lengths, kind="stable")
+        results = [None] * len(lengths)
+        padded = 0
+        for first in range(0, len(order), self.batch_size):
+            idx = order[first:first + self.batch_size]
+            batch = self.tokenizer.pad({k: [encoded[k][i] for i in idx] for k in encoded.keys()},
+                                       return_tensors="pt")
+            padded += batch["input_ids"].numel()
+            probs = torch.softmax(self._logits(batch), dim=-1)
+            scores, labels = probs.max(dim=-1)
+            for i, label, score in zip(idx, labels.tolist(), scores.tolist()):
+                results[i] = {"label": self.labels[label], "score": score}
+        elapsed = time.perf_counter() - start
+        self.stats = {"reviews": len(results), "seconds": elapsed,
+                      "reviews_per_sec": len(results) / elapsed if elapsed else 0.0,
+                      "tokens": int(lengths.sum()), "padded_tokens": padded}
+        return results
+
+    def print_stats(self):
+        s = self.stats
+        if not s:
+            return
+        print(f"⚡ Scored {s['reviews']} reviews in {s['seconds']:.1f} s "
+              f"({s['reviews_per_sec']:.1f} reviews/sec on {self.threads} CPU threads, "
+              f"{s['tokens'] / max(s['padded_tokens'], 1):.0%} of batch tokens were real)")
+
+# ---------------- ONNX ----------------
+
+def export_onnx(model_id, folder=ONNX_DIR):
+    """Export model_id to ONNX with int8 weights (once); returns the model path"""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    path = os.path.join(folder, model_id.replace("/", "--"))
+    quantized = os.path.join(path, "model.int8.onnx")
+    if os.path.exists(quantized):
+        return quantized
+    os.makedirs(path, exist_ok=True)
+    model = AutoModelForSequenceClassification.from_pretrained(model_id).eval()
+    sample = AutoTokenizer.from_pretrained(model_id)(["export"], return_tensors="pt")
+    fp32 = os.path.join(path, "model.onnx")
+    axes = {0: "batch", 1: "tokens"}
+    torch.onnx.export(model, (sample["input_ids"], sample["attention_mask"]), fp32,
+                      input_names=["input_ids", "attention_mask"], output_names=["logits"],
+                      dynamic_axes={"input_ids": axes, "attention_mask": axes, "logits": {0: "batch"}},
+                      opset_version=ONNX_OPSET)
+    tmp = os.path.join(path, "model.int8.tmp.onnx")
+    quantize_dynamic(fp32, tmp, weight_type=QuantType.QInt8)
+    os.replace(tmp, quantized)
+    print(f"📦 Exported {model_id} to {quantized} "
+          f"({os.path.getsize(fp32) / 1e6:.0f} MB fp32 -> {os.path.getsize(quantized) / 1e6:.0f} MB int8)")
+    return quantized
+
+class OnnxSentimentEngine(SentimentEngine):
+    """SentimentEngine on the int8 ONNX export, run by onnxruntime on CPU"""
+
+    def __init__(self, model_id, batch_size=BATCH_SIZE, max_length=MAX_LENGTH, threads=THREADS,
+                 folder=ONNX_DIR):
+        self.folder = folder
+        super().__init__(model_id, batch_size, max_length, threads)
+
+    def _load(self):
+        import onnxruntime as ort
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.threads
+        options.inter_op_num_threads = 1
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(export_onnx(self.model_id, self.folder), options,
+                                            providers=["CPUExecutionProvider"])
+
+    def _logits(self, batch):
+        logits = self.session.run(["logits"], {"input_ids": batch["input_ids"].numpy(),
+                                               "attention_mask": batch["attention_mask"].numpy()})[0]
+        return torch.from_numpy(logits)
+
+BACKENDS = {"torch": SentimentEngine, "onnx": OnnxSentimentEngine}
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        import sentiment_analysis
+        export_onnx(sentiment_analysis.MODEL_ID)
@@ -0,0 +1,213 @@
+#snapshot_store.py
+# Append-only Parquet store for scraped snapshots, hive-partitioned by
+# platform and scrape date:
+#
+#   data/snapshots/mobile/platform=flipkart/date=2024-05-01/part-....parquet
+#
+# Every write adds new files (nothing is rewritten), each dataset has a fixed
+# Arrow schema, and reads only open the partitions and columns they need.
+# read() is meant as a drop-in for pd.read_csv on the scraped history.
+
+import os
+import uuid
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# ---------------- CONFIG ----------------
+STORE_DIR = os.path.join("data", "snapshots")
+COMPRESSION = "zstd"
+
+# platform / time say which columns feed the platform= and date= partitions
+DATASETS = {
+    "mobile": {   # listing rows written by pr.py (was mobile.csv)
+        "schema": pa.schema([
+            ("source", pa.string()), ("productid", pa.string()), ("mobilename", pa.string()),
+            ("sellingprice", pa.float64()), ("mrp", pa.float64()),
+            ("discountoffering", pa.string()), ("rating", pa.float64()), ("url", pa.string()),
+            ("scraped_at", pa.timestamp("us")),
+        ]),
+        "platform": "source", "time": "scraped_at",
+    },
+    "snapshots": {   # storage.append_to_store (was append_to_csv)
+        "schema": pa.schema([
+            ("platform", pa.string()), ("product_id", pa.string()), ("title", pa.string()),
+            ("price", pa.float64()), ("list_price", pa.float64()), ("discount_pct", pa.float64()),
+            ("promotions", pa.string()), ("scraped_at", pa.timestamp("us")), ("raw", pa.string()),
+        ]),
+        "platform": "platform", "time": "scraped_at",
+    },
+}
+PARTITIONING = ds.partitioning(pa.schema([("platform", pa.string()), ("date", pa.string())]),
+                               flavor="hive")
+
+# ---------------- WRITE ----------------
+
+def _dataset_dir(dataset, root):
+    return os.path.join(root, dataset)
+
+def to_table(dataset, rows):
+    """Rows (list of dicts or DataFrame) cast to the dataset's schema"""
+    schema = DATASETS[dataset]["schema"]
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame(list(rows))
+    df = df.reindex(columns=schema.names)
+    for field in schema:
+        col = df[field.name]
+        if pa.types.is_floating(field.type):
+            df[field.name] = pd.to_numeric(col, errors="coerce")
+        elif pa.types.is_timestamp(field.type):
+            # isoformat() drops ".ffffff" when microsecond == 0, so one batch can mix precisions
+            df[field.name] = pd.to_datetime(col, errors="coerce", format="ISO8601")
+        else:
+            df[field.name] = col.astype("string")
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+def append(dataset, rows, root=STORE_DIR):
+    """Write rows as new Parquet files, one per (platform, date); returns rows written"""
+    table = to_table(dataset, rows)
+    if table.num_rows == 0:
+        return 0
+    spec = DATASETS[dataset]
+    df = table.to_pandas()
+    platforms = df[spec["platform"]].fillna("unknown")
+    dates = df[spec["time"]].dt.strftime("%Y-%m-%d").fillna("unknown")
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")   # file names sort in write order
+    for (platform, date), idx in df.groupby([platforms, dates]).groups.items():
+        folder = os.path.join(_dataset_dir(dataset, root), f"platform={platform}", f"date={date}")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"part-{stamp}-{uuid.uuid4().hex[:8]}.parquet")
+        pq.write_table(table.take(pa.array(df.index.get_indexer(idx))), path + ".tmp",
+                       compression=COMPRESSION)
+        os.replace(path + ".tmp", path)
+    return table.num_rows
+
+def has_data(dataset, root=STORE_DIR):
+    folder = _dataset_dir(dataset, root)
+    return os.path.isdir(folder) and any(f.endswith(".parquet") for _, _, files in os.walk(folder)
+                                         for f in files)
+
+def import_csv(dataset, csv_path, root=STORE_DIR, chunksize=100_000):
+    """One-time move of a legacy CSV history into the store; no-op once the store has data"""
+    if has_data(dataset, root) or not os.path.exists(csv_path):
+        return 0
+    written = sum(append(dataset, chunk, root) for chunk in pd.read_csv(csv_path, chunksize=chunksize))
+    print(f"📦 Imported {written} rows from {csv_path} into {_dataset_dir(dataset, root)}")
+    return written
+
+# ---------------- READ ----------------
+
+def _scan(dataset, platform=None, start=None, end=None, filter=None, root=STORE_DIR):
+    """(pyarrow dataset, filter expression) for a pruned read"""
+    spec = DATASETS[dataset]
+    data = ds.dataset(_dataset_dir(dataset, root), format="parquet", partitioning=PARTITIONING,
+                      schema=pa.unify_schemas([spec["schema"], PARTITIONING.schema]))
+    expr = None
+    def _and(e):
+        return e if expr is None else expr & e
+    if platform is not None:
+        expr = _and(ds.field("platform") == platform)
+    if start is not None:
+        start = pd.Timestamp(start)
+        expr = _and((ds.field("date") >= start.strftime("%Y-%m-%d"))
+                    & (ds.field(spec["time"]) >= pa.scalar(start.to_pydatetime(), pa.timestamp("us"))))
+    if end is not None:
+        end = pd.Timestamp(end)
+        expr = _and((ds.field("date") <= end.strftime("%Y-%m-%d"))
+                    & (ds.field(spec["time"]) <= pa.scalar(end.to_pydatetime(), pa.timestamp("us"))))
+    if filter is not None:
+        expr = _and(filter)
+    return data, expr
+
+def read(dataset, columns=None, platform=None, start=None, end=None, filter=None, root=STORE_DIR):
+    """Load a dataset as a DataFrame, reading only the partitions and columns needed.
+
+    platform and the start/end dates (inclusive, anything pd.Timestamp accepts)
+    prune whole partitions before any file is opened; filter is an extra
+    pyarrow.dataset expression, e.g. ds.field("productid") == "abc".
+    """
+    schema = DATASETS[dataset]["schema"]
+    if not has_data(dataset, root):
+        return schema.empty_table().to_pandas()
+    data, expr = _scan(dataset, platform, start, end, filter, root)
+    return data.to_table(columns=columns or schema.names, filter=expr).to_pandas()
+
+def iter_batches(dataset, batch_size=100_000, columns=None, root=STORE_DIR, **filters):
+    """Same rows as read(), as DataFrames of at most batch_size rows"""
+    if not has_data(dataset, root):
+        return
+    data, expr = _scan(dataset, root=root, **filters)
+    for batch in data.to_batches(columns=columns or DATASETS[dataset]["schema"].names,
+                                 filter=expr, batch_size=batch_size):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def files(dataset, after=None, root=STORE_DIR):
+    """Paths of a dataset's Parquet files (relative to the dataset folder) in write order.
+
+    File names sort in write order, so the name of the last file processed
+    works as a watermark: after= lists only the files written since.
+    """
+    folder = _dataset_dir(dataset, root)
+    paths = [os.path.relpath(os.path.join(d, f), folder)
+             for d, _, names in os.walk(folder) for f in names
+             if f.endswith(".parquet") and (after is None or f > after)]
+    return sorted(paths, key=os.path.basename)
+
+def read_order(dataset, root=STORE_DIR):
+    """Paths of a dataset's Parquet files (relative to the dataset folder) in the order read() returns their rows"""
+    if not has_data(dataset, root):
+        return []
+    folder = _dataset_dir(dataset, root)
+    return [os.path.relpath(f, folder) for f in _scan(dataset, root=root)[0].files]
+
+def read_files(dataset, paths, root=STORE_DIR):
+    """Rows of some files from files() / read_order(), in the order given, as one DataFrame"""
+    schema = DATASETS[dataset]["schema"]
+    folder = _dataset_dir(dataset, root)
+    tables = [pq.ParquetFile(os.path.join(folder, p)).read(columns=schema.names) for p in paths]
+    return (pa.concat_tables(tables) if tables else schema.empty_table()).to_pandas()
+
+def iter_file(dataset, path, batch_size=100_000, root=STORE_DIR):
+    """Rows of one file from files(), as DataFrames of at most batch_size rows"""
+    columns = DATASETS[dataset]["schema"].names
+    parquet = pq.ParquetFile(os.path.join(_dataset_dir(dataset, root), path))
+    for batch in parquet.iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+def compact(dataset, root=STORE_DIR):
+    """Merge the small files of each partition into one; returns partitions compacted.
+
+    The merged file takes the name of the newest file it replaces, so a
+    files(after=) watermark only sees it again if it holds rows written
+    after the watermark.
+    """
+    compacted = 0
+    for folder, _, files in os.walk(_dataset_dir(dataset, root)):
+        parts = sorted(f for f in files if f.endswith(".parquet"))
+        if len(parts) < 2:
+            continue
+        table = pa.concat_tables([pq.ParquetFile(os.path.join(folder, f)).read() for f in parts])
+        path = os.path.join(folder, parts[-1])
+        pq.write_table(table, path + ".tmp", compression=COMPRESSION)
+        os.replace(path + ".tmp", path)
+        for f in parts[:-1]:
+            os.remove(os.path.join(folder, f))
+        compacted += 1
+    return compacted
+
+def read_table(source, columns=None, **filters):
+    """pd.read_csv replacement: a store dataset by name, otherwise a CSV path"""
+    if source in DATASETS:
+        return read(source, columns=columns, **filters)
+    return pd.read_csv(source, usecols=columns)
+
+def print_store_stats(dataset, root=STORE_DIR):
+    folder = _dataset_dir(dataset, root)
+    files = [os.path.join(d, f) for d, _, names in os.walk(folder) for f in names if f.endswith(".parquet")]
+    partitions = {os.path.dirname(f) for f in files}
+    size = sum(os.path.getsize(f) for f in files)
+    print(f"📦 Snapshot store {dataset}: {len(files)} files in {len(partitions)} partitions, "
+          f"{size / 1e6:.1f} MB")
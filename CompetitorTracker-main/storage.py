@@ -0,0 +1,243 @@
+import json
+import time
+import queue
+import threading
+from itertools import islice
+import pandas as pd
+from datetime import datetime
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from db import ProductSnapshot, LatestProductState, ReadSession, submit, write
+import snapshot_store
+import payload_store
+import os
+
+# ---------------- CONFIG ----------------
+BATCH_SIZE = 1000         # rows per executemany
+FLUSH_INTERVAL = 2.0      # seconds a background writer waits before flushing a partial batch
+
+SNAPSHOT_FIELDS = ("title", "price", "list_price", "discount_pct")
+PAYLOAD_FIELDS = ("promotions", "raw")    # stored as payload_blobs, referenced by <field>_hash
+LATEST_FIELDS = ("platform", "product_id", "title", "price", "list_price", "discount_pct",
+                 "currency", "scraped_at")
+
+def snapshot_values(platform: str, product_id: str, snapshot: dict) -> dict:
+    """Column values of one ProductSnapshot row"""
+    values = {"platform": platform, "product_id": product_id,
+              "currency": snapshot.get("currency", "INR")}
+    for field in SNAPSHOT_FIELDS:
+        values[field] = snapshot.get(field)
+    values["scraped_at"] = snapshot.get("scraped_at") or datetime.now()
+    return values
+
+def save_snapshots_to_db(snapshots, batch_size: int = BATCH_SIZE, return_ids: bool = False,
+                         commit_each: bool = False):
+    """Insert (platform, product_id, snapshot) tuples in one transaction, batch_size at a time.
+
+    snapshots may be any iterable (e.g. a generator); it is read one batch at
+    a time, so only a batch is held in memory. The whole call is one write
+    job on the single writer thread (WAL mode): every executemany insert,
+    its payload blobs and the latest_product_state upserts commit together
+    or not at all.
+    With commit_each, each batch is its own write job and commits on its
+    own; the payloads of the next batch are compressed while the previous
+    one is written. A failure then leaves the earlier batches saved.
+    Returns the new ids in input order when return_ids is set, otherwise the
+    number of rows written.
+    """
+    snapshots = iter(snapshots)
+    if commit_each:
+        return _save_each(snapshots, batch_size, return_ids)
+
+    def job(session):
+        ids, written = [], 0
+        while True:
+            batch = list(islice(snapshots, batch_size))
+            if not batch:
+                return ids if return_ids else written
+            ids.extend(_batch_job(batch, return_ids)(session))
+            written += len(batch)
+    return write(job)
+
+def _save_each(snapshots, batch_size, return_ids):
+    """save_snapshots_to_db with one commit per batch, packing the next batch meanwhile"""
+    ids, written, pending = [], 0, None
+    while True:
+        batch = list(islice(snapshots, batch_size))
+        if not batch:
+            break
+        job = _batch_job(batch, return_ids)
+        if pending is not None:
+            ids.extend(pending.result())
+        pending = submit(job)
+        written += len(batch)
+    if pending is not None:
+        ids.extend(pending.result())
+    return ids if return_ids else written
+
+def _batch_job(snapshots, return_ids):
+    """Write job for one batch; payloads are packed when this is called"""
+    rows = [snapshot_values(platform, product_id, snapshot)
+            for platform, product_id, snapshot in snapshots]
+    blobs = {}
+    for field in PAYLOAD_FIELDS:
+        hashes, packed = payload_store.pack([snapshot.get(field) for _, _, snapshot in snapshots])
+        blobs.update(packed)
+        for row, h in zip(rows, hashes):
+            row[f"{field}_hash"] = h
+
+    def job(session):
+        payload_store.save_blobs(session, blobs)
+        ids = _insert_batch(session, rows, return_ids)
+        _upsert_latest(session, rows)
+        return ids
+    return job
+
+def _insert_batch(session, rows, return_ids):
+    if return_ids:
+        stmt = insert(ProductSnapshot).returning(ProductSnapshot.id, sort_by_parameter_order=True)
+        return list(session.scalars(stmt, rows))
+    session.execute(insert(ProductSnapshot), rows)
+    return []
+
+def _upsert_latest(session, rows):
+    # newest row per product in this batch, then only overwrite older state
+    newest = {}
+    for row in rows:
+        key = (row["platform"], row["product_id"])
+        if key not in newest or row["scraped_at"] >= newest[key]["scraped_at"]:
+            newest[key] = row
+    values = [{c: row[c] for c in LATEST_FIELDS} for row in newest.values()]
+    stmt = sqlite_insert(LatestProductState)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["platform", "product_id"],
+        set_={c: stmt.excluded[c] for c in LATEST_FIELDS[2:]},
+        where=stmt.excluded.scraped_at >= LatestProductState.scraped_at)
+    session.execute(stmt, values)
+
+def latest_states(platform: str = None, product_ids=None) -> pd.DataFrame:
+    """Current state of products straight from latest_product_state"""
+    q = select(*(getattr(LatestProductState, c) for c in LATEST_FIELDS))
+    if platform is not None:
+        q = q.where(LatestProductState.platform == platform)
+    if product_ids is not None:
+        q = q.where(LatestProductState.product_id.in_(list(product_ids)))
+    with ReadSession() as s:
+        return pd.DataFrame(s.execute(q).all(), columns=list(LATEST_FIELDS))
+
+def load_payloads(snapshot_ids) -> dict:
+    """{snapshot id: {"raw": ..., "promotions": ...}}, from blobs or the legacy JSON columns"""
+    P = ProductSnapshot
+    with ReadSession() as s:
+        rows = s.execute(select(P.id, P.raw_hash, P.promotions_hash, P.raw, P.promotions)
+                         .where(P.id.in_(list(snapshot_ids)))).all()
+    blobs = payload_store.load([h for r in rows for h in (r.raw_hash, r.promotions_hash)])
+    return {r.id: {"raw": blobs.get(r.raw_hash, r.raw),
+                   "promotions": blobs.get(r.promotions_hash, r.promotions)} for r in rows}
+
+def save_snapshot_to_db(platform: str, product_id: str, snapshot: dict) -> int:
+    return save_snapshots_to_db([(platform, product_id, snapshot)], return_ids=True)[0]
+
+class SnapshotWriter:
+    """Background thread that collects snapshots and writes them in batches.
+
+    add() only queues the row; the thread flushes whenever batch_size rows are
+    waiting or flush_interval seconds have passed. Use as a context manager
+    (or call close()) so the last partial batch is written.
+    """
+
+    def __init__(self, batch_size: int = BATCH_SIZE, flush_interval: float = FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.written = 0
+        self.error = None
+        self._stop = object()
+        self.thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+        self.thread.start()
+
+    def add(self, platform: str, product_id: str, snapshot: dict):
+        if self.error is not None:
+            raise RuntimeError("snapshot writer failed") from self.error
+        self.queue.put((platform, product_id, snapshot))
+
+    def flush(self):
+        """Block until everything queued so far is written"""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        self.queue.put(self._stop)
+        self.thread.join()
+        if self.error is not None:
+            raise RuntimeError("snapshot writer failed") from self.error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _write(self, batch):
+        if not batch:
+            return
+        try:
+            self.written += save_snapshots_to_db(batch, batch_size=self.batch_size)
+        except Exception as e:
+            self.error = e
+            print(f"⚠ Snapshot writer dropped {len(batch)} rows: {e}")
+
+    def _run(self):
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                item = None
+            if item is self._stop:
+                self._write(batch)
+                return
+            if isinstance(item, threading.Event):
+                self._write(batch)
+                batch = []
+                item.set()
+                continue
+            if item is not None:
+                batch.append(item)
+            if len(batch) >= self.batch_size or time.monotonic() >= deadline:
+                self._write(batch)
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+
+def append_to_store(snapshots) -> int:
+    """Append (platform, product_id, snapshot) tuples to the Parquet snapshot store in one write"""
+    now = pd.Timestamp.now()
+    return snapshot_store.append("snapshots", [{
+        "platform": platform,
+        "product_id": product_id,
+        "title": snapshot.get("title"),
+        "price": snapshot.get("price"),
+        "list_price": snapshot.get("list_price"),
+        "discount_pct": snapshot.get("discount_pct"),
+        "promotions": json.dumps(snapshot.get("promotions")),
+        "scraped_at": snapshot.get("scraped_at") or now,
+        "raw": json.dumps(snapshot.get("raw"))
+    } for platform, product_id, snapshot in snapshots])
+
+def append_to_csv(out_csv: str, platform: str, product_id: str, snapshot: dict):
+    # one file open per row; prefer append_to_store for anything in a loop
+    df = pd.DataFrame([{
+        "platform": platform,
+        "product_id": product_id,
+        "title": snapshot.get("title"),
+        "price": snapshot.get("price"),
+        "list_price": snapshot.get("list_price"),
+        "discount_pct": snapshot.get("discount_pct"),
+        "promotions": json.dumps(snapshot.get("promotions")),
+        "scraped_at": pd.Timestamp.now().isoformat(),
+        "raw": json.dumps(snapshot.get("raw"))
+    }])
+    header = not os.path.exists(out_csv)
+    df.to_csv(out_csv, mode="a", header=header, index=False)